@@ -0,0 +1,265 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import json
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from langchain_core.messages import HumanMessage
+from checkpointing import open_checkpointer
+from report_streaming import REPORT_DELTA
+from mcp_resilience import tool_metrics
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# 서비스할 에이전트: "data_analysis"(상권 분석) 또는 "market_report"(시장 조사 + 보고서 작성)
+AGENT_SERVICE_AGENT = os.getenv("AGENT_SERVICE_AGENT", "data_analysis")
+AGENT_SERVICE_HOST = os.getenv("AGENT_SERVICE_HOST", "127.0.0.1")
+AGENT_SERVICE_PORT = int(os.getenv("AGENT_SERVICE_PORT", "8100"))
+
+# 동시에 실행하는 그래프 수 / 서비스 전체에서 대기+실행 중일 수 있는 최대 요청 수
+AGENT_MAX_CONCURRENT_RUNS = int(os.getenv("AGENT_MAX_CONCURRENT_RUNS", "8"))
+AGENT_MAX_PENDING = int(os.getenv("AGENT_MAX_PENDING", "64"))
+
+# 대화(thread)마다 대기할 수 있는 최대 요청 수 / 요청이 없으면 세션을 정리할 때까지의 시간(초)
+AGENT_SESSION_QUEUE_SIZE = int(os.getenv("AGENT_SESSION_QUEUE_SIZE", "4"))
+AGENT_SESSION_IDLE_SECONDS = float(os.getenv("AGENT_SESSION_IDLE_SECONDS", "600"))
+
+# 스트리밍 요청마다 클라이언트에 아직 보내지 못한 보고서 조각을 쌓아둘 수 있는 최대 개수
+# (가득 차면 클라이언트가 읽어갈 때까지 그래프 실행이 기다림)
+AGENT_STREAM_BUFFER_SIZE = int(os.getenv("AGENT_STREAM_BUFFER_SIZE", "256"))
+
+
+### 3. 에이전트 그래프 생성 함수 정의
+
+@asynccontextmanager
+async def open_agent(name: str) -> AsyncIterator[Any]:
+    """에이전트 그래프를 한 번만 컴파일하고, 모든 대화가 같은 그래프와 체크포인터를 공유하도록 합니다."""
+    if name == "data_analysis":
+        from data_analysis_langgraph import build_graph
+        async with open_checkpointer(os.path.join(folder_path, "agent_checkpoint.sqlite")) as memory:
+            yield build_graph().compile(checkpointer=memory)
+    elif name == "market_report":
+        from multiserver_client import build_graph, open_tool_map
+        async with open_checkpointer(os.path.join(folder_path, "mcp_agent.sqlite")) as memory, \
+                open_tool_map() as tool_map:
+            yield build_graph(tool_map).compile(checkpointer=memory)
+    else:
+        raise ValueError(f"알 수 없는 에이전트입니다: {name}")
+
+
+### 4. 세션 / 대기열 관리 클래스 정의
+
+class ServiceOverloaded(Exception):
+    """대기열이 가득 차 요청을 받을 수 없을 때 발생하는 예외 (status_code: 응답 HTTP 상태 코드)"""
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+class AgentRun:
+    """사용자 메시지 1건의 실행 요청. 실행 결과(보고서 조각, 최종 결과)는 events 큐로 전달됩니다."""
+    def __init__(self, message: str, stream: bool):
+        self.message = message
+        self.stream = stream
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=AGENT_STREAM_BUFFER_SIZE)
+        self.task: asyncio.Task | None = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """결과를 받을 클라이언트가 사라진 요청을 취소합니다. (대기 중이면 건너뛰고, 실행 중이면 중단)"""
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+class Session:
+    """대화(thread) 1개의 요청 대기열. 같은 대화의 요청은 도착 순서대로 하나씩 실행됩니다."""
+    def __init__(self, thread_id: str, queue_size: int):
+        self.thread_id = thread_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.worker: asyncio.Task | None = None
+
+class SessionManager:
+    """
+    여러 대화의 요청을 하나의 컴파일된 그래프로 동시에 처리합니다.
+    - 서로 다른 대화는 최대 max_concurrent_runs개까지 동시에 실행
+    - 같은 대화는 체크포인트가 엇갈리지 않도록 순서대로 실행
+    - 서비스 전체 대기 요청이 max_pending을 넘으면 503, 대화별 대기열이 가득 차면 429로 즉시 거절
+    """
+    def __init__(self, agent: Any, max_concurrent_runs: int = AGENT_MAX_CONCURRENT_RUNS,
+                 max_pending: int = AGENT_MAX_PENDING, session_queue_size: int = AGENT_SESSION_QUEUE_SIZE):
+        self.agent = agent
+        self.max_pending = max_pending
+        self.session_queue_size = session_queue_size
+        self.sessions: Dict[str, Session] = {}
+        self._run_slots = asyncio.Semaphore(max_concurrent_runs)
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, thread_id: str, message: str, stream: bool = False) -> AgentRun:
+        """요청을 대화별 대기열에 넣습니다. 받을 수 없으면 ServiceOverloaded를 발생시킵니다."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceOverloaded(f"서비스가 혼잡합니다. (대기 중인 요청 {self.pending}건) 잠시 후 다시 시도해주세요.", 503)
+        session = self.sessions.get(thread_id)
+        if session is None:
+            session = self.sessions[thread_id] = Session(thread_id, self.session_queue_size)
+        run = AgentRun(message, stream)
+        try:
+            session.queue.put_nowait(run)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ServiceOverloaded("이 대화의 이전 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.", 429)
+        self.pending += 1
+        if session.worker is None or session.worker.done():
+            session.worker = asyncio.create_task(self._session_worker(session))
+        return run
+
+    async def _session_worker(self, session: Session) -> None:
+        while True:
+            try:
+                run = await asyncio.wait_for(session.queue.get(), timeout=AGENT_SESSION_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                # 한동안 요청이 없던 대화는 메모리에서 정리 (대화 기록은 체크포인터에 남아 있음)
+                if session.queue.empty():
+                    self.sessions.pop(session.thread_id, None)
+                    return
+                continue
+            try:
+                if not run.cancelled:
+                    async with self._run_slots:
+                        self.running += 1
+                        run.task = asyncio.create_task(self._execute(session.thread_id, run))
+                        try:
+                            await run.task
+                        except asyncio.CancelledError:
+                            # 클라이언트가 연결을 끊어 취소된 실행이면 다음 요청을 계속 처리
+                            if not run.cancelled:
+                                raise
+                        finally:
+                            self.running -= 1
+            finally:
+                self.pending -= 1
+                self.completed += 1
+
+    async def _execute(self, thread_id: str, run: AgentRun) -> None:
+        config = {"configurable": {"thread_id": thread_id}}
+        final_state: Dict[str, Any] = {}
+        try:
+            async for mode, chunk in self.agent.astream(
+                {"messages": [HumanMessage(content=run.message)]}, config=config, stream_mode=["custom", "values"]
+            ):
+                if mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == REPORT_DELTA:
+                    if run.stream:
+                        await run.events.put({"type": REPORT_DELTA, "text": chunk["text"]})
+                elif mode == "values":
+                    final_state = chunk
+            messages = final_state.get("messages") or []
+            answer = messages[-1].content if messages else ""
+            await run.events.put({"type": "final", "result": {"thread_id": thread_id, "answer": answer}})
+        except Exception as e:
+            await run.events.put({"type": "final", "error": f"에이전트 실행 중 오류가 발생했습니다: {e}"})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self.sessions), "pending": self.pending, "running": self.running,
+            "completed": self.completed, "rejected": self.rejected,
+        }
+
+
+### 5. HTTP 엔드포인트 정의
+
+async def create_thread(request: Request) -> JSONResponse:
+    """새 대화 ID를 발급합니다."""
+    return JSONResponse({"result": {"thread_id": str(uuid.uuid4())}})
+
+async def post_message(request: Request) -> Any:
+    """
+    대화에 메시지를 보내고 결과를 반환합니다.
+    - 요청 본문: {"message": "...", "stream": false}
+    - stream=true면 보고서 조각과 최종 결과를 한 줄에 하나씩 JSON(NDJSON)으로 스트리밍
+    """
+    manager: SessionManager = request.app.state.manager
+    thread_id = request.path_params["thread_id"]
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        return JSONResponse({"error": "요청 본문이 올바른 JSON이 아닙니다."}, status_code=400)
+    if not isinstance(body, dict):
+        return JSONResponse({"error": "요청 본문은 JSON 객체여야 합니다. (예: {\"message\": \"...\"})"}, status_code=400)
+    message = str(body.get("message", "")).strip()
+    if not message:
+        return JSONResponse({"error": "message 필드가 비어 있습니다."}, status_code=400)
+
+    try:
+        run = manager.submit(thread_id, message, stream=bool(body.get("stream")))
+    except ServiceOverloaded as e:
+        return JSONResponse({"error": str(e)}, status_code=e.status_code, headers={"Retry-After": "1"})
+
+    if run.stream:
+        async def event_lines():
+            finished = False
+            try:
+                while True:
+                    event = await run.events.get()
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+                    if event["type"] == "final":
+                        finished = True
+                        return
+            finally:
+                # 최종 결과를 보내기 전에 스트림이 닫히면(클라이언트 연결 종료) 실행을 취소
+                if not finished:
+                    run.cancel()
+        return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+    event = await run.events.get()
+    if "error" in event:
+        return JSONResponse({"error": event["error"]}, status_code=500)
+    return JSONResponse({"result": event["result"]})
+
+async def health(request: Request) -> JSONResponse:
+    """현재 세션 수, 대기/실행 중인 요청 수 등 서비스 상태를 반환합니다."""
+    return JSONResponse({"result": {"agent": AGENT_SERVICE_AGENT, **request.app.state.manager.stats()}})
+
+async def metrics(request: Request) -> JSONResponse:
+    """전문가 도구별 지연 시간 분포(p50/p90/p99/max), 오류 / 마감 초과 / 헤지 수와 서버별 회로 차단기 상태를 반환합니다."""
+    return JSONResponse({"result": tool_metrics()})
+
+
+### 6. 앱 생성 함수 정의
+
+def create_app(agent_name: str = AGENT_SERVICE_AGENT) -> Starlette:
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        # 서비스가 실행되는 동안 그래프와 체크포인터를 하나만 열어두고 모든 대화가 공유
+        async with open_agent(agent_name) as agent:
+            app.state.manager = SessionManager(agent)
+            yield
+
+    return Starlette(
+        routes=[
+            Route("/threads", create_thread, methods=["POST"]),
+            Route("/threads/{thread_id}/messages", post_message, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+### 7. 서비스 실행
+if __name__ == "__main__":
+    import uvicorn
+    print(f"에이전트 서비스 [{AGENT_SERVICE_AGENT}]: http://{AGENT_SERVICE_HOST}:{AGENT_SERVICE_PORT} "
+          f"(동시 실행 {AGENT_MAX_CONCURRENT_RUNS}건, 대기열 {AGENT_MAX_PENDING}건, 대화별 대기열 {AGENT_SESSION_QUEUE_SIZE}건)")
+    # 그래프와 체크포인터(SQLite 파일)를 공유해야 하므로 워커는 1개로 실행
+    uvicorn.run(create_app(), host=AGENT_SERVICE_HOST, port=AGENT_SERVICE_PORT)
@@ -0,0 +1,65 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import json
+import asyncio
+import httpx
+
+
+### 2. 환경 설정
+
+# 에이전트 서비스 주소 (agent_service.py 실행 주소)
+AGENT_SERVICE_URL = os.getenv("AGENT_SERVICE_URL", "http://127.0.0.1:8100")
+
+
+### 3. 서비스 호출 함수 정의
+
+async def send_message(client: httpx.AsyncClient, thread_id: str, message: str) -> None:
+    """메시지를 보내고, 보고서 조각은 도착하는 즉시 출력합니다."""
+    async with client.stream(
+        "POST", f"/threads/{thread_id}/messages", json={"message": message, "stream": True}
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            print(f"AI 에이전트: {response.json().get('error', response.text)}")
+            return
+        streamed = False
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "report_delta":
+                if not streamed:
+                    print("\n" + "="*25 + " 실시간 보고서 " + "="*25)
+                    streamed = True
+                print(event["text"], end="", flush=True)
+            elif "error" in event:
+                print(f"\n[CRITICAL] {event['error']}")
+            elif streamed:
+                print("\n" + "="*62)
+            else:
+                print(f"\nAI 에이전트: {event['result']['answer']}")
+
+
+### 4. 메인 함수 정의
+async def main():
+    async with httpx.AsyncClient(base_url=AGENT_SERVICE_URL, timeout=None) as client:
+        thread_id = (await client.post("/threads")).json()["result"]["thread_id"]
+        print(f"에이전트 서비스({AGENT_SERVICE_URL})에 연결했습니다. 대화 ID: {thread_id[:8]}")
+        print("분석하고 싶은 내용을 질문해주세요. (종료하려면 '종료' 또는 'exit' 입력)")
+        while True:
+            user_input = await asyncio.to_thread(input, "\n사용자: ")
+            if user_input.lower() in ["exit", "종료"]:
+                print("AI 에이전트: 프로그램을 종료합니다.")
+                break
+            try:
+                await send_message(client, thread_id, user_input)
+            except httpx.HTTPError as e:
+                print(f"[CRITICAL] 서비스 호출 중 오류가 발생했습니다: {e}")
+
+
+### 5. 애플리케이션 실행
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n프로그램 실행이 중단되었습니다.")
@@ -0,0 +1,67 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import statistics
+import httpx
+
+
+### 2. 벤치마크 설정
+
+# 에이전트 서비스 주소 (먼저 python agent_service.py 로 서비스를 실행)
+AGENT_SERVICE_URL = os.getenv("AGENT_SERVICE_URL", "http://127.0.0.1:8100")
+
+# 동시에 대화하는 세션 수 단계 / 세션마다 이어서 보내는 메시지 수
+SESSION_LEVELS = [1, 4, 16, 64]
+MESSAGES_PER_SESSION = 2
+
+QUESTIONS = [
+    "2024년 1분기 매출 상위 5개 상권을 알려줘",
+    "그 중 커피-음료 업종 매출이 가장 높은 곳은?",
+]
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def run_session(client: httpx.AsyncClient, latencies: list, rejected: list, failed: list) -> None:
+    """새 대화를 만들고 MESSAGES_PER_SESSION개의 메시지를 순서대로 보냅니다."""
+    thread_id = (await client.post("/threads")).json()["result"]["thread_id"]
+    for i in range(MESSAGES_PER_SESSION):
+        start = time.perf_counter()
+        response = await client.post(
+            f"/threads/{thread_id}/messages", json={"message": QUESTIONS[i % len(QUESTIONS)]}
+        )
+        if response.status_code in (429, 503):
+            rejected.append(response.status_code)
+        elif response.status_code != 200:
+            failed.append(response.status_code)
+        else:
+            latencies.append(time.perf_counter() - start)
+
+async def run_level(client: httpx.AsyncClient, sessions: int) -> None:
+    latencies, rejected, failed = [], [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(client, latencies, rejected, failed) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    p50 = statistics.median(latencies) if latencies else 0.0
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 2 else p50
+    print(f"{sessions:>6} | {elapsed:>8.2f} | {len(latencies) / elapsed:>13.2f} | "
+          f"{p50:>7.2f} | {p95:>7.2f} | {len(rejected):>4} | {len(failed):>4}")
+
+async def run_benchmark(levels: list):
+    async with httpx.AsyncClient(base_url=AGENT_SERVICE_URL, timeout=None) as client:
+        health = (await client.get("/health")).json()["result"]
+        print(f"에이전트 서비스 [{health['agent']}] 동시 세션 부하 테스트 (세션당 메시지 {MESSAGES_PER_SESSION}개)")
+        print(f"{'세션':>6} | {'경과(s)':>8} | {'처리량(msg/s)':>13} | {'p50(s)':>7} | {'p95(s)':>7} | {'거절':>4} | {'실패':>4}")
+        print("-" * 72)
+        for sessions in levels:
+            await run_level(client, sessions)
+        print(f"서비스 상태: {(await client.get('/health')).json()['result']}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/agent_service_load.py [동시 세션 수 ...]
+    levels = [int(arg) for arg in sys.argv[1:]] or SESSION_LEVELS
+    asyncio.run(run_benchmark(levels))
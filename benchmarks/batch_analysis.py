@@ -0,0 +1,64 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import asyncio
+from fastmcp import Client
+
+# 프로젝트 루트 폴더 경로
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+### 2. 벤치마크 설정
+
+# 보고 작업에서 자주 보내는 분석 질문 예시
+QUESTIONS = [
+    "2024년 1분기 매출 상위 5개 상권을 알려줘",
+    "2024년 2분기 커피-음료 업종의 주말 매출이 가장 높은 상권은?",
+    "2024년 3분기 점심시간 매출이 가장 높은 업종 5개를 알려줘",
+    "2024년 4분기 여성 매출 비중이 높은 상권 상위 5개는?",
+    "2025년 1분기 30대 매출이 가장 높은 업종은?",
+    "2024년 분기별 한식음식점 매출 추이를 보여줘",
+    "2024년 1분기 저녁시간 매출 상위 5개 상권은?",
+    "2024년 2분기 편의점 매출 건수가 가장 많은 상권은?",
+]
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def count_errors(response_text: str) -> int:
+    """도구 응답(JSON 문자열)에서 실패한 질문 수를 계산합니다."""
+    data = json.loads(response_text)
+    if "error" in data:
+        return 1
+    return data["result"].get("failed", 0)
+
+async def run_benchmark(repeat: int):
+    questions = QUESTIONS * repeat
+    async with Client(os.path.join(folder_path, "data_analysis_server.py")) as client:
+        # 1. 기존 방식: 질문마다 도구를 한 번씩 순서대로 호출
+        start = time.perf_counter()
+        loop_errors = 0
+        for q in questions:
+            result = await client.call_tool("analyze_commercial_district", {"input_data": {"query": q}})
+            loop_errors += count_errors(result.content[0].text)
+        loop_elapsed = time.perf_counter() - start
+
+        # 2. 배치 방식: 모든 질문을 한 번의 도구 호출로 처리
+        start = time.perf_counter()
+        result = await client.call_tool("analyze_commercial_district_batch", {"input_data": {"queries": questions}})
+        batch_elapsed = time.perf_counter() - start
+        batch_errors = count_errors(result.content[0].text)
+
+    print(f"질문 수: {len(questions)}")
+    print(f"{'방식':<10} | {'경과(s)':>8} | {'처리량(q/s)':>11} | {'실패':>4}")
+    print("-" * 44)
+    print(f"{'순차 호출':<10} | {loop_elapsed:>8.2f} | {len(questions) / loop_elapsed:>11.2f} | {loop_errors:>4}")
+    print(f"{'배치 호출':<10} | {batch_elapsed:>8.2f} | {len(questions) / batch_elapsed:>11.2f} | {batch_errors:>4}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/batch_analysis.py [반복 횟수]
+    asyncio.run(run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1))
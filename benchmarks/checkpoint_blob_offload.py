@@ -0,0 +1,121 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import statistics
+from typing import Annotated, List, Dict
+from pydantic import BaseModel, Field
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from blob_store import put_json, get_json
+
+
+### 2. 벤치마크 설정
+
+# 조회 결과 행 수 단계 / 한 스레드에서 이어지는 대화 턴 수
+ROW_COUNTS = [100, 1000, 5000]
+TURNS = 5
+
+
+def make_rows(count: int) -> List[Dict]:
+    """quarterly_sales 조회 결과와 비슷한 모양의 가짜 행을 생성합니다."""
+    return [
+        {
+            "year_quarter": f"2024{q % 4 + 1}",
+            "district_name": f"상권_{q:05d}",
+            "service_category_name": "커피-음료",
+            "total_sales_amount": 1_000_000 + q * 37,
+            "weekend_sales_amount": 300_000 + q * 11,
+        }
+        for q in range(count)
+    ]
+
+
+### 3. 비교용 그래프 정의 (상태에 원본을 넣는 방식 vs 참조만 넣는 방식)
+
+class InlineState(BaseModel):
+    messages: Annotated[List[BaseMessage], add_messages]
+    sql_result: List[Dict] = Field(default_factory=list)
+
+class RefState(BaseModel):
+    messages: Annotated[List[BaseMessage], add_messages]
+    sql_result_ref: str = ""
+    sql_row_count: int = 0
+
+
+def build_benchmark_graph(use_ref: bool, rows: List[Dict]):
+    """SQL 실행 -> 보고서 생성 두 단계로 이루어진 최소 그래프를 구성합니다."""
+    async def execute_node(state):
+        if use_ref:
+            return {"sql_result_ref": await asyncio.to_thread(put_json, rows), "sql_row_count": len(rows)}
+        return {"sql_result": rows}
+
+    async def report_node(state):
+        result = get_json(state.sql_result_ref, []) if use_ref else state.sql_result
+        return {"messages": [AIMessage(content=f"{len(result)}개 행을 분석했습니다.")]}
+
+    workflow = StateGraph(RefState if use_ref else InlineState)
+    workflow.add_node("execute_sql", execute_node)
+    workflow.add_node("generate_report", report_node)
+    workflow.set_entry_point("execute_sql")
+    workflow.add_edge("execute_sql", "generate_report")
+    workflow.add_edge("generate_report", END)
+    return workflow
+
+
+class TimedSaver(AsyncSqliteSaver):
+    """체크포인트 저장(aput)에 걸린 시간을 기록하는 체크포인터"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.put_times: List[float] = []
+
+    async def aput(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().aput(*args, **kwargs)
+        finally:
+            self.put_times.append(time.perf_counter() - start)
+
+
+### 4. 벤치마크 실행 함수 정의
+
+async def run_case(use_ref: bool, rows: List[Dict]) -> tuple[float, float]:
+    """TURNS번 대화를 실행하고 (체크포인트 파일 크기(KB), 저장 1회당 평균 시간(ms))를 반환합니다."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "checkpoint.sqlite")
+        async with TimedSaver.from_conn_string(db_file) as saver:
+            agent = build_benchmark_graph(use_ref, rows).compile(checkpointer=saver)
+            config = {"configurable": {"thread_id": "benchmark"}}
+            for turn in range(TURNS):
+                await agent.ainvoke({"messages": [HumanMessage(content=f"질문 {turn + 1}")]}, config=config)
+            put_ms = statistics.mean(saver.put_times) * 1000
+        size_kb = sum(
+            os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)
+        ) / 1024
+    return size_kb, put_ms
+
+async def run_benchmark():
+    print(f"대화 {TURNS}턴 기준 체크포인트 크기 / 저장 시간 비교")
+    print(f"{'행 수':>6} | {'방식':>6} | {'체크포인트(KB)':>14} | {'저장 1회(ms)':>12}")
+    print("-" * 50)
+    for count in ROW_COUNTS:
+        rows = make_rows(count)
+        for use_ref in (False, True):
+            size_kb, put_ms = await run_case(use_ref, rows)
+            label = "ref" if use_ref else "inline"
+            print(f"{count:>6} | {label:>6} | {size_kb:>14.1f} | {put_ms:>12.2f}")
+
+
+### 5. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/checkpoint_blob_offload.py
+    asyncio.run(run_benchmark())
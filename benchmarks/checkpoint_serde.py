@@ -0,0 +1,111 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import sqlite3
+import statistics
+from typing import Any, List
+from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from checkpoint_serde import CompressedSerializer, train_dictionary, ZSTD_SUFFIX
+
+
+### 2. 벤치마크 데이터 준비
+
+# 체크포인트 DB를 지정하지 않았을 때 생성할 가짜 대화 수 / 대화당 턴 수
+SYNTHETIC_THREADS = 20
+SYNTHETIC_TURNS = 6
+
+REPORT_TEMPLATE = """## {district} 상권 분석 보고서
+
+### 1. 요약
+- 2024년 {quarter}분기 {district}의 커피-음료 업종 월평균 매출은 {sales:,}원입니다.
+- 전 분기 대비 매출은 {growth:.1f}% 변화했으며, 주말 매출 비중은 {weekend:.1f}%입니다.
+
+### 2. 세부 분석
+| 구분 | 매출 금액(원) | 비중(%) |
+|---|---|---|
+| 점심시간(11~14시) | {lunch:,} | {lunch_ratio:.1f} |
+| 저녁시간(17~21시) | {dinner:,} | {dinner_ratio:.1f} |
+
+### 3. 시사점
+점심시간 직장인 수요가 매출의 중심이며, 저녁시간 매출 확대를 위한 전략이 필요합니다.
+"""
+
+def make_synthetic_checkpoints() -> List[Any]:
+    """대화가 길어질수록 메시지가 쌓이는 체크포인트 스냅샷을 생성합니다."""
+    checkpoints = []
+    for thread in range(SYNTHETIC_THREADS):
+        messages = []
+        for turn in range(SYNTHETIC_TURNS):
+            district = f"상권_{thread:02d}_{turn}"
+            messages.append(HumanMessage(content=f"2024년 {turn % 4 + 1}분기 {district} 커피 매출 분석해줘"))
+            sales = 10_000_000 + thread * 123_457 + turn * 98_765
+            messages.append(AIMessage(content=REPORT_TEMPLATE.format(
+                district=district, quarter=turn % 4 + 1, sales=sales, growth=(thread - turn) * 1.7,
+                weekend=30 + turn * 1.3, lunch=sales // 3, lunch_ratio=33.3, dinner=sales // 4, dinner_ratio=25.0,
+            )))
+            checkpoints.append({
+                "v": 1,
+                "id": f"checkpoint-{thread}-{turn}",
+                "channel_values": {"messages": list(messages), "original_query": messages[-2].content},
+                "channel_versions": {"messages": turn + 1},
+            })
+    return checkpoints
+
+def load_checkpoints(db_files: List[str]) -> List[Any]:
+    """기존 체크포인트 DB에서 압축되지 않은 체크포인트를 읽어옵니다."""
+    serde = JsonPlusSerializer()
+    checkpoints = []
+    for db_file in db_files:
+        with sqlite3.connect(db_file) as conn:
+            rows = conn.execute("SELECT type, checkpoint FROM checkpoints").fetchall()
+        checkpoints.extend(serde.loads_typed((t, p)) for t, p in rows if "+" not in t)
+    return checkpoints
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def measure(serde, checkpoints: List[Any]) -> tuple[float, float, float]:
+    """(체크포인트당 평균 바이트, 직렬화 평균 시간(us), 역직렬화 평균 시간(us))를 반환합니다."""
+    sizes, dump_times, load_times = [], [], []
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        typed = serde.dumps_typed(checkpoint)
+        dump_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        serde.loads_typed(typed)
+        load_times.append(time.perf_counter() - start)
+        sizes.append(len(typed[1]))
+    return statistics.mean(sizes), statistics.mean(dump_times) * 1e6, statistics.mean(load_times) * 1e6
+
+def run_benchmark(db_files: List[str]):
+    checkpoints = load_checkpoints(db_files) if db_files else make_synthetic_checkpoints()
+    # 사전은 앞쪽 절반으로 학습하고, 전체 체크포인트로 측정
+    base = JsonPlusSerializer()
+    train_samples = [base.dumps_typed(c)[1] for c in checkpoints[: len(checkpoints) // 2]]
+    dict_data = train_dictionary(train_samples, dict_size=32 * 1024)
+
+    cases = [
+        ("기본(JsonPlus)", base),
+        ("msgpack" + ZSTD_SUFFIX, CompressedSerializer()),
+        ("msgpack+zstd+사전", CompressedSerializer(dict_data=dict_data)),
+    ]
+    print(f"체크포인트 {len(checkpoints)}개 기준")
+    print(f"{'직렬화 방식':<18} | {'평균 크기(B)':>12} | {'직렬화(us)':>10} | {'역직렬화(us)':>12}")
+    print("-" * 62)
+    for name, serde in cases:
+        size, dump_us, load_us = measure(serde, checkpoints)
+        print(f"{name:<18} | {size:>12,.0f} | {dump_us:>10.1f} | {load_us:>12.1f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/checkpoint_serde.py [agent_checkpoint.sqlite ...]
+    # DB 파일을 지정하지 않으면 가짜 대화 체크포인트로 측정
+    run_benchmark(sys.argv[1:])
@@ -0,0 +1,83 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import statistics
+from typing import Annotated, List
+from pydantic import BaseModel
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# 저장된 체크포인트 수를 확인할 수 있도록 보존 정책의 개수 제한은 끈다
+os.environ.setdefault("CHECKPOINT_KEEP_LAST", "0")
+
+from checkpointing import open_checkpointer
+
+
+### 2. 벤치마크 설정
+
+# 그래프의 노드 수 / 실행할 대화 턴 수
+NODE_COUNT = 5
+TURNS = 20
+
+
+class BenchmarkState(BaseModel):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+def build_benchmark_graph():
+    """LLM 호출 없이 메시지만 추가하는 노드 NODE_COUNT개를 일렬로 연결한 그래프 (체크포인트 비용만 측정)"""
+    workflow = StateGraph(BenchmarkState)
+    for i in range(NODE_COUNT):
+        async def node(state, i=i):
+            return {"messages": [AIMessage(content=f"단계 {i + 1} 완료: " + "분석 결과 " * 50)]}
+        workflow.add_node(f"step_{i}", node)
+        if i:
+            workflow.add_edge(f"step_{i - 1}", f"step_{i}")
+    workflow.set_entry_point("step_0")
+    workflow.add_edge(f"step_{NODE_COUNT - 1}", END)
+    return workflow
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def run_case(write_behind: bool) -> tuple[float, float, int]:
+    """(턴당 평균 시간(ms), 노드 1단계당 평균 시간(ms), 종료 후 저장된 체크포인트 수)를 반환합니다."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "checkpoint.sqlite")
+        turn_times = []
+        async with open_checkpointer(db_file, write_behind=write_behind) as saver:
+            agent = build_benchmark_graph().compile(checkpointer=saver)
+            config = {"configurable": {"thread_id": "benchmark"}}
+            for turn in range(TURNS):
+                start = time.perf_counter()
+                await agent.ainvoke({"messages": [HumanMessage(content=f"질문 {turn + 1}")]}, config=config)
+                turn_times.append(time.perf_counter() - start)
+        # 블록이 끝난 뒤(정상 종료) 모든 체크포인트가 기록되었는지 확인
+        async with open_checkpointer(db_file) as saver:
+            saved = len([c async for c in saver.alist({"configurable": {"thread_id": "benchmark"}})])
+    turn_ms = statistics.mean(turn_times) * 1000
+    # 입력 체크포인트 1개 + 노드마다 1개
+    return turn_ms, turn_ms / (NODE_COUNT + 1), saved
+
+async def run_benchmark():
+    print(f"노드 {NODE_COUNT}개 그래프, 대화 {TURNS}턴 기준")
+    print(f"{'체크포인트 기록':<14} | {'턴당(ms)':>9} | {'단계당(ms)':>10} | {'저장된 체크포인트':>16}")
+    print("-" * 60)
+    for write_behind in (False, True):
+        turn_ms, step_ms, saved = await run_case(write_behind)
+        label = "write-behind" if write_behind else "동기 기록"
+        print(f"{label:<14} | {turn_ms:>9.2f} | {step_ms:>10.2f} | {saved:>16}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/checkpoint_write_behind.py
+    asyncio.run(run_benchmark())
@@ -0,0 +1,55 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# 실제 클라이언트의 캐시를 건드리지 않도록 벤치마크 전용 캐시 파일 사용
+os.environ.setdefault("MCP_TOOL_CACHE", os.path.join(folder_path, "benchmarks", "mcp_tool_cache.bench.json"))
+
+from mcp_sessions import MCPSessionManager, MCP_TOOL_CACHE
+
+
+### 2. 벤치마크 설정
+
+# multiserver_client.py와 같은 전문가 서버 구성
+CONNECTIONS = {
+    name: {"command": sys.executable, "args": [os.path.join(folder_path, server_file)], "transport": "stdio"}
+    for name, server_file in [
+        ("DataAnalysisExpert", "data_analysis_server.py"),
+        ("MarketResearchExpert", "market_research_server.py"),
+        ("ReportWritingExpert", "report_writing_server.py"),
+    ]
+}
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def time_to_tools(lazy: bool) -> tuple[float, int]:
+    """세션 관리자를 열고 도구 목록을 받기까지의 시간과 도구 수를 반환합니다."""
+    start = time.perf_counter()
+    async with MCPSessionManager(CONNECTIONS, lazy=lazy) as mcp_sessions:
+        tools = await mcp_sessions.get_tools()
+        elapsed = time.perf_counter() - start
+    return elapsed, len(tools)
+
+async def run_benchmark():
+    if os.path.exists(MCP_TOOL_CACHE):
+        os.remove(MCP_TOOL_CACHE)
+    print(f"전문가 서버 {len(CONNECTIONS)}개, 사용자 입력을 받을 수 있을 때까지의 시간")
+    print(f"{'방식':<22} | {'시간(s)':>8} | {'도구 수':>6}")
+    print("-" * 44)
+    for label, lazy in [("모든 서버 즉시 실행", False), ("지연 실행(캐시 없음)", True), ("지연 실행(캐시 사용)", True)]:
+        elapsed, tool_count = await time_to_tools(lazy)
+        print(f"{label:<22} | {elapsed:>8.2f} | {tool_count:>6}")
+    os.remove(MCP_TOOL_CACHE)
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/mcp_lazy_startup.py
+    asyncio.run(run_benchmark())
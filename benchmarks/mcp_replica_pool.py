@@ -0,0 +1,69 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from mcp_sessions import MCPSessionManager
+
+
+### 2. 벤치마크 설정
+
+# 서버 이름 -> (서버 파일, 도구 이름, 도구 입력 값)
+SERVERS = {
+    "data_analysis": (
+        "data_analysis_server.py", "analyze_commercial_district",
+        {"input_data": {"query": "2024년 1분기 매출 상위 5개 상권을 알려줘"}},
+    ),
+    "report_writing": (
+        "report_writing_server.py", "write_final_report",
+        {"input_data": {"user_query": "커피 전문점 시장 보고서", "research_summary": "커피 전문점 수는 매년 증가하고 있다."}},
+    ),
+}
+
+# 비교할 복제본 수 / 동시에 보내는 호출 수
+REPLICA_COUNTS = [1, 2, 4]
+CONCURRENT_CALLS = 8
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def run_case(server_key: str, replicas: int) -> tuple[float, int]:
+    """복제본 replicas개로 동시 호출을 보내고 (경과 시간, 실패 수)를 반환합니다."""
+    server_file, tool_name, payload = SERVERS[server_key]
+    connections = {
+        server_key: {
+            "command": sys.executable,
+            "args": [os.path.join(folder_path, server_file)],
+            "transport": "stdio",
+        }
+    }
+    async with MCPSessionManager(connections, replicas=replicas) as mcp_sessions:
+        # 복제본마다 첫 호출(예열)을 한 번씩 실행
+        await asyncio.gather(*(mcp_sessions.call_tool(server_key, tool_name, payload) for _ in range(replicas)))
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(mcp_sessions.call_tool(server_key, tool_name, payload) for _ in range(CONCURRENT_CALLS)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, sum(isinstance(r, Exception) for r in results)
+
+async def run_benchmark(server_key: str):
+    print(f"[{server_key}] 동시 호출 {CONCURRENT_CALLS}건, 복제본 수별 비교 (CPU 코어 {os.cpu_count()}개)")
+    print(f"{'복제본':>6} | {'경과(s)':>8} | {'처리량(call/s)':>14} | {'실패':>4}")
+    print("-" * 44)
+    for replicas in REPLICA_COUNTS:
+        elapsed, failures = await run_case(server_key, replicas)
+        print(f"{replicas:>6} | {elapsed:>8.2f} | {CONCURRENT_CALLS / elapsed:>14.2f} | {failures:>4}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/mcp_replica_pool.py [data_analysis | report_writing]
+    target = sys.argv[1] if len(sys.argv) > 1 else "data_analysis"
+    asyncio.run(run_benchmark(target))
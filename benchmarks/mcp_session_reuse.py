@@ -0,0 +1,83 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import statistics
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from mcp_sessions import MCPSessionManager
+
+
+### 2. 벤치마크 설정
+
+# 서버 이름 -> (서버 파일, 도구 이름, 도구 입력 값)
+# greeting: API 키 없이 실행되는 가벼운 서버로 순수 호출 오버헤드를 측정
+SERVERS = {
+    "greeting": (
+        "tool_server_architecture.py", "create_greeting_message",
+        {"input_data": {"name": "박안정", "language": "한국어"}},
+    ),
+    "data_analysis": (
+        "data_analysis_server.py", "analyze_commercial_district",
+        {"input_data": {"query": "2024년 1분기 매출 상위 5개 상권을 알려줘"}},
+    ),
+}
+
+# 순차 호출 횟수 / 동시 호출 수
+SEQUENTIAL_CALLS = 10
+CONCURRENT_CALLS = 8
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def summarize(latencies: list) -> str:
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 2 else latencies[0]
+    return f"{statistics.mean(latencies) * 1000:>9.1f} | {p95 * 1000:>9.1f}"
+
+async def timed_calls(tool, payload: dict) -> tuple[list, float]:
+    """(순차 호출별 지연 시간 목록, 동시 호출 전체 경과 시간)을 반환합니다."""
+    latencies = []
+    for _ in range(SEQUENTIAL_CALLS):
+        start = time.perf_counter()
+        await tool.ainvoke(payload)
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    await asyncio.gather(*(tool.ainvoke(payload) for _ in range(CONCURRENT_CALLS)))
+    return latencies, time.perf_counter() - start
+
+async def run_benchmark(server_key: str):
+    server_file, tool_name, payload = SERVERS[server_key]
+    connections = {
+        server_key: {
+            "command": sys.executable,
+            "args": [os.path.join(folder_path, server_file)],
+            "transport": "stdio",
+        }
+    }
+    print(f"[{server_key}] 도구 '{tool_name}' 순차 {SEQUENTIAL_CALLS}회 / 동시 {CONCURRENT_CALLS}회 호출")
+    print(f"{'방식':<14} | {'평균(ms)':>9} | {'p95(ms)':>9} | {'동시 호출 전체(s)':>16}")
+    print("-" * 60)
+
+    # 1) 세션 재사용 없음: 호출할 때마다 서버 프로세스를 새로 실행
+    client = MultiServerMCPClient(connections)
+    tool = {t.name: t for t in await client.get_tools()}[tool_name]
+    latencies, concurrent_elapsed = await timed_calls(tool, payload)
+    print(f"{'호출마다 실행':<14} | {summarize(latencies)} | {concurrent_elapsed:>16.2f}")
+
+    # 2) 세션 재사용: 서버를 한 번만 실행하고 같은 세션으로 모든 호출을 처리
+    async with MCPSessionManager(connections) as mcp_sessions:
+        tool = {t.name: t for t in await mcp_sessions.get_tools()}[tool_name]
+        latencies, concurrent_elapsed = await timed_calls(tool, payload)
+    print(f"{'세션 재사용':<14} | {summarize(latencies)} | {concurrent_elapsed:>16.2f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/mcp_session_reuse.py [greeting | data_analysis]
+    target = sys.argv[1] if len(sys.argv) > 1 else "greeting"
+    asyncio.run(run_benchmark(target))
@@ -0,0 +1,94 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import socket
+import asyncio
+import subprocess
+import statistics
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from mcp_sessions import MCPSessionManager
+
+
+### 2. 벤치마크 설정
+
+# greeting: API 키 없이 즉시 응답하는 서버로, 도구 실행 시간이 아닌 전송 방식의 호출 오버헤드만 측정
+SERVER_FILE = os.path.join(folder_path, "tool_server_architecture.py")
+TOOL_NAME = "create_greeting_message"
+PAYLOAD = {"input_data": {"name": "박안정", "language": "한국어"}}
+
+# HTTP 방식에서 벤치마크용 서버를 띄울 주소
+HTTP_HOST = "127.0.0.1"
+HTTP_PORT = int(os.getenv("BENCH_MCP_PORT", "8765"))
+
+# 예열 호출 수 / 측정 호출 수
+WARMUP_CALLS = 20
+MEASURED_CALLS = 300
+
+# 비교할 전송 방식
+TRANSPORTS = {
+    "stdio": {"command": sys.executable, "args": [SERVER_FILE], "transport": "stdio"},
+    "streamable_http": {"url": f"http://{HTTP_HOST}:{HTTP_PORT}/mcp", "transport": "streamable_http"},
+    "in_process": {"transport": "in_process", "path": SERVER_FILE, "server": "mcp_server"},
+}
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def start_http_server() -> subprocess.Popen:
+    """greeting 서버를 streamable-HTTP로 실행하고 포트가 열릴 때까지 기다립니다."""
+    code = (
+        "import uvicorn, tool_server_architecture as server; from mcp_serving import build_http_app; "
+        f"uvicorn.run(build_http_app(server.mcp_server), host='{HTTP_HOST}', port={HTTP_PORT}, log_level='warning')"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=folder_path)
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            socket.create_connection((HTTP_HOST, HTTP_PORT), timeout=0.5).close()
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError("HTTP 서버를 시작하지 못했습니다.")
+            time.sleep(0.1)
+
+async def measure(connection: dict) -> tuple[list, float]:
+    """(순차 호출별 지연 시간 목록, 세션 연결 ~ 첫 응답 시간)을 반환합니다."""
+    start = time.perf_counter()
+    async with MCPSessionManager({"greeting": connection}, replicas=1, lazy=False) as mcp_sessions:
+        await mcp_sessions.call_tool("greeting", TOOL_NAME, PAYLOAD)
+        first_response = time.perf_counter() - start
+        for _ in range(WARMUP_CALLS):
+            await mcp_sessions.call_tool("greeting", TOOL_NAME, PAYLOAD)
+        latencies = []
+        for _ in range(MEASURED_CALLS):
+            call_start = time.perf_counter()
+            await mcp_sessions.call_tool("greeting", TOOL_NAME, PAYLOAD)
+            latencies.append(time.perf_counter() - call_start)
+    return latencies, first_response
+
+async def run_benchmark():
+    print(f"greeting 서버, 도구 '{TOOL_NAME}' 순차 {MEASURED_CALLS}회 호출 (예열 {WARMUP_CALLS}회 제외)")
+    print(f"{'전송 방식':<16} | {'첫 응답(ms)':>11} | {'p50(us)':>8} | {'p95(us)':>8} | {'p99(us)':>8}")
+    print("-" * 66)
+    http_server = start_http_server()
+    try:
+        for label, connection in TRANSPORTS.items():
+            latencies, first_response = await measure(connection)
+            p = statistics.quantiles(latencies, n=100)
+            print(f"{label:<16} | {first_response * 1000:>11.1f} | "
+                  f"{p[49] * 1e6:>8.0f} | {p[94] * 1e6:>8.0f} | {p[98] * 1e6:>8.0f}")
+    finally:
+        http_server.terminate()
+        http_server.wait()
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/mcp_transport_overhead.py
+    asyncio.run(run_benchmark())
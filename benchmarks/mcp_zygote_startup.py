@@ -0,0 +1,83 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import subprocess
+import statistics
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# 실제 클라이언트와 겹치지 않도록 벤치마크 전용 소켓 사용 / 도구 목록 캐시는 사용하지 않음
+os.environ.setdefault("MCP_ZYGOTE_SOCKET", os.path.join(folder_path, "benchmarks", ".mcp_zygote.bench.sock"))
+os.environ.setdefault("MCP_TOOL_CACHE", os.path.join(folder_path, "benchmarks", "mcp_tool_cache.bench.json"))
+
+from mcp_sessions import MCPSessionManager
+from mcp_zygote import MCP_ZYGOTE_SOCKET
+
+
+### 2. 벤치마크 설정
+
+# 측정할 전문가 서버
+SERVER_FILES = ["data_analysis_server.py", "market_research_server.py", "report_writing_server.py"]
+
+# 서버별 반복 측정 횟수
+REPEATS = 5
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def connection_for(server_file: str, use_zygote: bool) -> dict:
+    """직접 실행 / zygote 실행 방식의 stdio 연결 설정을 만듭니다."""
+    script_path = os.path.join(folder_path, server_file)
+    args = [os.path.join(folder_path, "mcp_zygote.py"), "run", script_path] if use_zygote else [script_path]
+    return {"command": sys.executable, "args": args, "transport": "stdio"}
+
+async def time_to_first_response(server_file: str, use_zygote: bool) -> float:
+    """서버 프로세스 실행부터 첫 응답(도구 목록 수신)까지의 시간을 반환합니다."""
+    start = time.perf_counter()
+    async with MCPSessionManager({"bench": connection_for(server_file, use_zygote)}, replicas=1, lazy=False) as mcp_sessions:
+        await mcp_sessions.get_tools()
+        return time.perf_counter() - start
+
+def start_zygote() -> subprocess.Popen:
+    """zygote를 실행하고 소켓이 만들어질 때까지 기다립니다."""
+    if os.path.exists(MCP_ZYGOTE_SOCKET):
+        os.unlink(MCP_ZYGOTE_SOCKET)
+    zygote = subprocess.Popen(
+        [sys.executable, os.path.join(folder_path, "mcp_zygote.py"), "serve"],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 120
+    while not os.path.exists(MCP_ZYGOTE_SOCKET):
+        if zygote.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("zygote를 시작하지 못했습니다.")
+        time.sleep(0.1)
+    return zygote
+
+async def run_benchmark():
+    zygote_start = time.perf_counter()
+    zygote = start_zygote()
+    print(f"zygote 준비 시간(공용 모듈 임포트, 1회): {time.perf_counter() - zygote_start:.2f}s")
+    print(f"서버별 {REPEATS}회, 프로세스 실행 ~ 첫 응답(도구 목록)까지의 시간")
+    print(f"{'서버':<28} | {'직접 실행(ms)':>13} | {'zygote(ms)':>10} | {'단축':>6}")
+    print("-" * 68)
+    try:
+        for server_file in SERVER_FILES:
+            medians = []
+            for use_zygote in (False, True):
+                samples = [await time_to_first_response(server_file, use_zygote) for _ in range(REPEATS)]
+                medians.append(statistics.median(samples) * 1000)
+            direct, forked = medians
+            print(f"{server_file:<28} | {direct:>13.0f} | {forked:>10.0f} | {direct / forked:>5.1f}x")
+    finally:
+        zygote.terminate()
+        zygote.wait()
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/mcp_zygote_startup.py
+    asyncio.run(run_benchmark())
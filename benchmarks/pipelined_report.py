@@ -0,0 +1,70 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import asyncio
+import uuid
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# research_fanout.py의 오프라인 문서(대체 검색 백엔드 설정 포함)를 그대로 사용
+# 서버 프로세스는 이 환경 변수를 물려받으므로 서버 실행 전에 설정 (검색 결과 캐시는 사용하지 않음)
+from research_fanout import TOPIC, build_corpus
+os.environ["SEARCH_CACHE_MODE"] = "off"
+os.environ["RESEARCH_MODE"] = "multi"
+
+from langchain_core.messages import HumanMessage
+from multiserver_client import open_tool_map, build_graph
+from report_streaming import REPORT_DELTA
+
+
+### 2. 벤치마크 설정
+
+QUERY = f"{TOPIC} 분석 보고서를 작성해줘"
+REPEATS = 3
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def run_once(agent_executor) -> tuple[float, float | None, int]:
+    """그래프를 한 번 실행하고 (전체 경과 시간, 보고서 첫 조각까지 걸린 시간, 보고서 글자 수)를 반환합니다."""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    inputs = {"messages": [HumanMessage(content=QUERY)]}
+    start, first_delta, final_state = time.perf_counter(), None, {}
+    async for mode, chunk in agent_executor.astream(inputs, config=config, stream_mode=["custom", "values"]):
+        if mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == REPORT_DELTA:
+            if first_delta is None:
+                first_delta = time.perf_counter() - start
+        elif mode == "values":
+            final_state = chunk
+    return time.perf_counter() - start, first_delta, len(final_state["messages"][-1].content)
+
+async def run_benchmark():
+    with open(os.environ["SEARCH_LOCAL_CORPUS"], "w", encoding="utf-8") as f:
+        for document in build_corpus():
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+    print(f"질문 '{QUERY}', {REPEATS}회 평균 (세부 조사 multi 모드, 오프라인 검색)")
+    print(f"{'방식':<10} | {'전체(s)':>8} | {'첫 조각(s)':>10} | {'보고서 글자 수':>12}")
+    print("-" * 52)
+    async with open_tool_map() as tool_map:
+        for orchestration in ("serial", "pipelined"):
+            # 체크포인터 없이 컴파일 (매 실행이 새 대화)
+            agent_executor = build_graph(tool_map, orchestration=orchestration).compile()
+            elapsed, first, chars = [], [], []
+            for _ in range(REPEATS):
+                total, first_delta, length = await run_once(agent_executor)
+                elapsed.append(total)
+                first.append(first_delta if first_delta is not None else total)
+                chars.append(length)
+            print(f"{orchestration:<10} | {sum(elapsed) / REPEATS:>8.2f} | "
+                  f"{sum(first) / REPEATS:>10.2f} | {sum(chars) / REPEATS:>12.0f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/pipelined_report.py (OPENAI_API_KEY 필요)
+    asyncio.run(run_benchmark())
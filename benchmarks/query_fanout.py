@@ -0,0 +1,56 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+from langchain_core.messages import HumanMessage
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from data_analysis_langgraph import build_graph, planner_llm, sub_query_node, SubQueryState
+
+
+### 2. 벤치마크 설정
+
+# 여러 상권 / 업종 / 분기를 비교하는 복합 질문
+QUESTIONS = [
+    "강남역과 홍대입구역 상권의 커피-음료 업종 매출을 2024년 분기별로 비교해줘",
+    "2024년 1분기와 4분기의 한식음식점, 편의점, 제과점 주말 매출을 각각 비교해줘",
+    "명동, 잠실, 여의도 상권의 2025년 1분기 점심시간 매출과 저녁시간 매출을 비교해줘",
+]
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def time_until(agent, question: str, config: dict, node_name: str) -> float:
+    """그래프를 실행하여 node_name 노드의 결과가 나올 때까지 걸린 시간을 측정합니다. (보고서 생성 제외)"""
+    start = time.perf_counter()
+    async for update in agent.astream({"messages": [HumanMessage(content=question)]}, config=config, stream_mode="updates"):
+        if node_name in update:
+            break
+    return time.perf_counter() - start
+
+async def time_sequential(question: str) -> float:
+    """같은 하위 질문들을 하나씩 순서대로 실행했을 때의 시간을 측정합니다. (계획 단계 포함)"""
+    start = time.perf_counter()
+    plan = await planner_llm.ainvoke(question)
+    for i, sub_query in enumerate(plan.sub_queries):
+        await sub_query_node(SubQueryState(index=i, sub_query=sub_query), config={})
+    return time.perf_counter() - start
+
+async def run_benchmark():
+    agent = build_graph().compile()
+    print(f"{'질문':<6} | {'단일 SQL(s)':>11} | {'순차 분기(s)':>12} | {'병렬 분기(s)':>12}")
+    print("-" * 54)
+    for n, question in enumerate(QUESTIONS, 1):
+        single = await time_until(agent, question, {"configurable": {"query_fanout": False}}, "execute_sql")
+        sequential = await time_sequential(question)
+        parallel = await time_until(agent, question, {"configurable": {"query_fanout": True}}, "merge_results")
+        print(f"{f'Q{n}':<6} | {single:>11.2f} | {sequential:>12.2f} | {parallel:>12.2f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
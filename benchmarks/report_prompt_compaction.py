@@ -0,0 +1,85 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import random
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from result_compaction import compact_results, estimate_tokens
+
+
+### 2. 벤치마크용 가상 조회 결과 생성 함수 정의
+
+def make_rows(n: int, seed: int = 42) -> list[dict]:
+    """quarterly_sales 테이블과 같은 형태의 가상 조회 결과를 생성합니다."""
+    rng = random.Random(seed)
+    districts = [f"상권{i:03d}" for i in range(max(n // 20, 3))]
+    categories = ["커피-음료", "한식음식점", "편의점", "제과점", "미용실", "분식전문점"]
+    quarters = ["20241", "20242", "20243", "20244", "20251"]
+    rows = []
+    for i in range(n):
+        amount = rng.randint(10_000_000, 900_000_000)
+        rows.append({
+            "year_quarter": quarters[i % len(quarters)],
+            "district_name": rng.choice(districts),
+            "service_category_name": rng.choice(categories),
+            "monthly_sales_amount": amount,
+            "monthly_sales_count": amount // rng.randint(8_000, 20_000),
+            "weekend_sales_amount": int(amount * rng.uniform(0.2, 0.5)),
+            "sales_time_11_14": int(amount * rng.uniform(0.1, 0.4)),
+        })
+    return rows
+
+def build_prompt(query: str, data_block: str) -> str:
+    """data_analysis_server.py 의 보고서 프롬프트와 같은 형태의 프롬프트를 만듭니다."""
+    return f"""
+    당신은 전문 데이터 분석가이자 보고서 작성가입니다.
+    ### 원본 사용자 질문:
+    {query}
+
+    ### 데이터베이스 조회 결과:
+    {data_block}
+
+    ### 최종 분석 보고서 (마크다운 형식):
+    """
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def measure_llm_latency(prompt: str) -> float:
+    """실제 LLM 호출 시간을 측정합니다. (OPENAI_API_KEY 필요)"""
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+    load_dotenv(os.path.join(folder_path, '.env'))
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    start = time.perf_counter()
+    llm.invoke(prompt)
+    return time.perf_counter() - start
+
+def run_benchmark(with_llm: bool = False):
+    query = "2024년 분기별로 매출이 가장 높은 상권과 업종을 비교해줘"
+    print(f"{'rows':>6} | {'json 토큰':>10} | {'압축 토큰':>10} | {'압축률':>7} | {'압축 시간(ms)':>12}")
+    print("-" * 62)
+    for n in [20, 100, 300, 1000, 5000]:
+        rows = make_rows(n)
+        json_prompt = build_prompt(query, json.dumps(rows, indent=2, ensure_ascii=False))
+
+        start = time.perf_counter()
+        compact_prompt = build_prompt(query, compact_results(rows))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        json_tokens, compact_tokens = estimate_tokens(json_prompt), estimate_tokens(compact_prompt)
+        print(f"{n:>6} | {json_tokens:>10,} | {compact_tokens:>10,} | {compact_tokens / json_tokens:>7.1%} | {elapsed_ms:>12.1f}")
+
+        if with_llm and json_tokens < 100_000:
+            print(f"       LLM 지연 시간: json {measure_llm_latency(json_prompt):.2f}s / 압축 {measure_llm_latency(compact_prompt):.2f}s")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 실제 LLM 지연 시간까지 측정하려면: python benchmarks/report_prompt_compaction.py --llm
+    run_benchmark(with_llm="--llm" in sys.argv)
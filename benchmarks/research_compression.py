@@ -0,0 +1,75 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import asyncio
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# research_fanout.py의 오프라인 문서(대체 검색 백엔드 설정 포함)를 그대로 사용
+from research_fanout import TOPIC, build_corpus
+from search_cache import CachedSearch
+from research_digest import expand_queries, dedupe_results, compress_research
+from token_count import estimate_tokens
+
+
+### 2. 벤치마크 설정
+
+# 비교할 조사 요약 토큰 예산
+TOKEN_BUDGETS = [500, 1000, 1500, 3000]
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def collect_results() -> list:
+    """multi 모드와 같은 방식(세부 질의 동시 검색 + 중복 제거)으로 검색 결과를 모읍니다."""
+    search = CachedSearch(mode="off")
+    outputs = await asyncio.gather(*(search.search(query) for query in expand_queries(TOPIC)))
+    kept, _ = dedupe_results([res for output in outputs for res in output["results"]])
+    return kept
+
+async def time_report_call(summary_text: str) -> tuple[float, int]:
+    """보고서 작성 전문가와 같은 프롬프트 / LLM으로 보고서를 생성하고 (경과 시간, 프롬프트 토큰 수)를 반환합니다."""
+    from report_writing_server import build_report_prompt, llm
+    prompt = build_report_prompt(f"{TOPIC} 분석 보고서를 작성해줘", f"시장 조사 및 트렌드 요약:\n\n{summary_text}")
+    start = time.perf_counter()
+    await llm.ainvoke(prompt)
+    return time.perf_counter() - start, estimate_tokens(prompt)
+
+async def run_benchmark(with_llm: bool):
+    with open(os.environ["SEARCH_LOCAL_CORPUS"], "w", encoding="utf-8") as f:
+        for document in build_corpus():
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+    results = await collect_results()
+    full_text = "\n\n---\n\n".join(f"출처: {res.get('url')}\n내용: {res.get('content')}" for res in results)
+
+    print(f"주제 '{TOPIC}', 검색 결과 {len(results)}건 (중복 제거 후)")
+    header = f"{'예산':>6} | {'문단(유지/전체)':>14} | {'요약 토큰':>8} | {'출처 수':>6} | {'압축(ms)':>8}"
+    print(header + (f" | {'보고서 LLM(s)':>12}" if with_llm else ""))
+    print("-" * (len(header) + (15 if with_llm else 0)))
+
+    rows = [("압축 없음", full_text, None)]
+    for budget in TOKEN_BUDGETS:
+        start = time.perf_counter()
+        summary_text, stats = compress_research(TOPIC, results, token_budget=budget)
+        rows.append((str(budget), summary_text, (stats, (time.perf_counter() - start) * 1000)))
+
+    for label, summary_text, info in rows:
+        passages = f"{info[0]['kept']}/{info[0]['passages']}" if info else "-"
+        elapsed_ms = f"{info[1]:.1f}" if info else "-"
+        line = (f"{label:>6} | {passages:>14} | {estimate_tokens(summary_text):>8} | "
+                f"{summary_text.count('출처: '):>6} | {elapsed_ms:>8}")
+        if with_llm:
+            llm_elapsed, _ = await time_report_call(summary_text)
+            line += f" | {llm_elapsed:>12.2f}"
+        print(line)
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/research_compression.py [--llm]
+    #   --llm: 요약별로 실제 보고서 LLM 호출 시간도 측정 (OPENAI_API_KEY 필요)
+    asyncio.run(run_benchmark("--llm" in sys.argv))
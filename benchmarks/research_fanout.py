@@ -0,0 +1,109 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# 네트워크 없이 실행되도록 대체 검색 백엔드 + 벤치마크용 문서 파일 사용 (검색 결과 캐시는 사용하지 않음)
+bench_dir = tempfile.mkdtemp(prefix="research_fanout_")
+os.environ["SEARCH_BACKEND"] = "local"
+os.environ["SEARCH_LOCAL_CORPUS"] = os.path.join(bench_dir, "corpus.jsonl")
+os.environ["SEARCH_CACHE_DB_PATH"] = os.path.join(bench_dir, "search_cache.db")
+
+from search_cache import CachedSearch
+from research_digest import expand_queries, dedupe_results, SUB_QUERY_FACETS
+from token_count import estimate_tokens
+
+
+### 2. 벤치마크 설정
+
+TOPIC = "국내 커피 전문점 시장"
+
+# 관점별 원문 기사 수 / 원문을 재배포(문장 일부만 수정)한 기사 비율 / 같은 기사의 추적용 URL 변형 비율
+ARTICLES_PER_FACET = 4
+SYNDICATED_RATIO = 0.4
+URL_VARIANT_RATIO = 0.2
+
+REPEATS = 5
+
+
+### 3. 벤치마크용 문서 생성 함수 정의
+
+def build_corpus(seed: int = 0) -> list:
+    """관점별 기사와, 다른 매체가 재배포한 유사 기사 / 추적 파라미터가 붙은 같은 기사를 섞은 문서 목록을 만듭니다."""
+    rng = random.Random(seed)
+    documents = []
+    for f, facet in enumerate([""] + SUB_QUERY_FACETS):
+        for i in range(ARTICLES_PER_FACET):
+            sentences = [
+                f"{TOPIC} {facet} 관련 보도 {f}-{i}.",
+                f"업계에 따르면 {TOPIC}의 {facet or '현황'} 지표는 전년 대비 {rng.randint(2, 15)}% 변화했다.",
+                f"전문가들은 {rng.choice(['저가 브랜드', '스페셜티 커피', '무인 카페', '배달 전문점'])}의 영향이 "
+                f"{rng.choice(['커지고', '줄어들고', '유지되고'])} 있다고 분석했다.",
+                f"조사 기관 {rng.randint(1, 50)}곳의 자료를 종합하면 지역별 편차는 {rng.randint(1, 9)}배 수준이다.",
+            ] * 3
+            content = " ".join(sentences)
+            url = f"https://news{f}.example.com/article/{i}"
+            documents.append({"url": url, "title": f"{TOPIC} {facet}", "content": content})
+            if rng.random() < SYNDICATED_RATIO:
+                documents.append({
+                    "url": f"https://portal{rng.randint(1, 9)}.example.net/{f}{i}",
+                    "title": f"[재배포] {TOPIC} {facet}",
+                    "content": content.replace("업계에 따르면", "관계자에 따르면") + " (제휴 기사)",
+                })
+            if rng.random() < URL_VARIANT_RATIO:
+                documents.append({"url": f"{url}/?utm_source=feed", "title": f"{TOPIC} {facet}", "content": content})
+    return documents
+
+def summary_tokens(results: list) -> int:
+    """market_research_server.py와 같은 형식으로 만든 research_summary의 토큰 수."""
+    text = "\n\n---\n\n".join(f"출처: {res.get('url')}\n내용: {res.get('content')}" for res in results)
+    return estimate_tokens(text)
+
+
+### 4. 벤치마크 실행 함수 정의
+
+async def research(search: CachedSearch, mode: str) -> tuple[float, list, list]:
+    """(경과 시간, 병합 / 중복 제거 전 결과, 최종 결과)를 반환합니다."""
+    start = time.perf_counter()
+    if mode == "single":
+        results = (await search.search(TOPIC))["results"]
+        return time.perf_counter() - start, results, results
+    outputs = await asyncio.gather(*(search.search(query) for query in expand_queries(TOPIC)))
+    merged = [res for output in outputs for res in output["results"]]
+    kept, _ = dedupe_results(merged)
+    return time.perf_counter() - start, merged, kept
+
+async def run_benchmark():
+    with open(os.environ["SEARCH_LOCAL_CORPUS"], "w", encoding="utf-8") as f:
+        for document in build_corpus():
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+    print(f"주제 '{TOPIC}', 세부 질의 {len(expand_queries(TOPIC))}개, {REPEATS}회 평균 (검색 결과 캐시 미사용)")
+    print(f"{'방식':<22} | {'경과(s)':>7} | {'출처 수':>6} | {'관점 수':>6} | {'요약 토큰':>8}")
+    print("-" * 64)
+    search = CachedSearch(mode="off")
+    for label, mode, dedupe in [("single", "single", True), ("multi(중복 제거 없음)", "multi", False), ("multi", "multi", True)]:
+        elapsed_total, sources, facets, tokens = 0.0, 0, 0, 0
+        for _ in range(REPEATS):
+            elapsed, merged, kept = await research(search, mode)
+            results = kept if dedupe else merged
+            elapsed_total += elapsed
+            sources += len(results)
+            facets += len({res["url"].split("/")[2] for res in results if "news" in res["url"]})
+            tokens += summary_tokens(results)
+        print(f"{label:<22} | {elapsed_total / REPEATS:>7.2f} | {sources / REPEATS:>6.1f} | "
+              f"{facets / REPEATS:>6.1f} | {tokens / REPEATS:>8.0f}")
+
+
+### 5. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/research_fanout.py
+    asyncio.run(run_benchmark())
@@ -0,0 +1,80 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import random
+import asyncio
+import statistics
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# 네트워크 없이 실행되도록 대체 검색 백엔드와 벤치마크 전용 캐시 DB 사용
+os.environ.setdefault("SEARCH_BACKEND", "local")
+os.environ.setdefault("SEARCH_CACHE_DB_PATH", os.path.join(folder_path, "benchmarks", "search_cache.bench.db"))
+
+from search_cache import CachedSearch, SEARCH_CACHE_DB_PATH, SEARCH_LOCAL_LATENCY
+
+
+### 2. 벤치마크 설정
+
+# 자주 반복되는 주제와, 문장부호 / 공백 / 대소문자만 다른 변형
+TOPICS = [
+    "2025년 국내 커피 전문점 시장 동향",
+    "편의점 도시락 시장 규모",
+    "MZ세대 외식 소비 트렌드",
+    "국내 배달 앱 시장 점유율",
+    "무인 매장 창업 현황",
+]
+VARIANTS = ["{}", "{}?", " {} ", "{}.", "{}!!"]
+
+# 요청 수 / 동시에 처리 중인 요청 수
+REQUESTS = 200
+CONCURRENCY = 8
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def make_workload(seed: int = 0) -> list:
+    """앞쪽 주제일수록 자주 요청되는(Zipf 분포와 비슷한) 요청 목록을 만듭니다."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    return [rng.choice(VARIANTS).format(rng.choices(TOPICS, weights)[0]) for _ in range(REQUESTS)]
+
+async def run_case(mode: str, workload: list) -> tuple[list, dict]:
+    """요청 목록을 동시 처리 수 CONCURRENCY로 실행하고 (요청별 지연 시간, 캐시 통계)를 반환합니다."""
+    search = CachedSearch(mode=mode)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one(topic: str):
+        async with semaphore:
+            start = time.perf_counter()
+            await search.search(topic)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(topic) for topic in workload))
+    return latencies, search.stats
+
+async def run_benchmark():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(SEARCH_CACHE_DB_PATH + suffix):
+            os.remove(SEARCH_CACHE_DB_PATH + suffix)
+    workload = make_workload()
+    print(f"요청 {REQUESTS}건(주제 {len(TOPICS)}개 x 표기 변형), 동시 {CONCURRENCY}건, 검색 지연 약 {SEARCH_LOCAL_LATENCY}s")
+    print(f"{'방식':<18} | {'평균(ms)':>9} | {'p95(ms)':>9} | {'백엔드 호출':>10}")
+    print("-" * 56)
+    for label, mode in [("캐시 없음", "off"), ("캐시(처음 실행)", "on"), ("캐시(재실행)", "on"), ("replay", "replay")]:
+        latencies, stats = await run_case(mode, workload)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{label:<18} | {statistics.mean(latencies) * 1000:>9.1f} | {p95 * 1000:>9.1f} | {stats['backend_calls']:>10}")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(SEARCH_CACHE_DB_PATH + suffix):
+            os.remove(SEARCH_CACHE_DB_PATH + suffix)
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/search_cache.py
+    asyncio.run(run_benchmark())
@@ -0,0 +1,72 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import asyncio
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+# research_compression.py와 같은 오프라인 검색 결과 / 조사 요약을 사용
+from research_compression import TOPIC, build_corpus, collect_results
+from research_digest import compress_research
+from report_streaming import stream_report
+from report_writing_server import llm, build_report_prompt, write_sectioned_report
+
+
+### 2. 벤치마크 설정
+
+# 비교할 보고서 길이 (본문 섹션 수)
+SECTION_COUNTS = [3, 5, 8]
+REPEATS = 2
+
+
+### 3. 벤치마크 실행 함수 정의
+
+def build_query(section_count: int) -> str:
+    """두 방식 모두 같은 길이의 보고서를 요청하도록 본문 섹션 수를 명시한 사용자 요청."""
+    return f"{TOPIC} 분석 보고서를 본문 {section_count}개 섹션으로 자세히 작성해줘"
+
+async def time_single(user_query: str, research_summary: str) -> tuple[float, int]:
+    """single 방식(LLM 한 번 호출)의 (경과 시간, 보고서 글자 수)를 반환합니다."""
+    start = time.perf_counter()
+    report_text = await stream_report(llm, build_report_prompt(user_query, research_summary))
+    return time.perf_counter() - start, len(report_text)
+
+async def time_sections(user_query: str, research_summary: str, section_count: int) -> tuple[float, int]:
+    """sections 방식(목차 -> 섹션 동시 작성 -> 정합성 검토)의 (경과 시간, 보고서 글자 수)를 반환합니다."""
+    start = time.perf_counter()
+    report_text = await write_sectioned_report(user_query, research_summary, section_count=section_count)
+    return time.perf_counter() - start, len(report_text)
+
+async def run_benchmark():
+    with open(os.environ["SEARCH_LOCAL_CORPUS"], "w", encoding="utf-8") as f:
+        for document in build_corpus():
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+    research_summary, _ = compress_research(TOPIC, await collect_results())
+    research_summary = f"시장 조사 및 트렌드 요약:\n\n{research_summary}"
+
+    print(f"주제 '{TOPIC}', {REPEATS}회 평균 (OPENAI_API_KEY 필요)")
+    print(f"{'섹션 수':>6} | {'방식':<8} | {'경과(s)':>8} | {'보고서 글자 수':>12} | {'초당 글자 수':>10}")
+    print("-" * 58)
+    for section_count in SECTION_COUNTS:
+        user_query = build_query(section_count)
+        for label in ("single", "sections"):
+            elapsed, chars = 0.0, 0
+            for _ in range(REPEATS):
+                if label == "single":
+                    seconds, length = await time_single(user_query, research_summary)
+                else:
+                    seconds, length = await time_sections(user_query, research_summary, section_count)
+                elapsed += seconds
+                chars += length
+            print(f"{section_count:>6} | {label:<8} | {elapsed / REPEATS:>8.2f} | "
+                  f"{chars / REPEATS:>12.0f} | {chars / elapsed:>10.0f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/sectioned_report.py
+    asyncio.run(run_benchmark())
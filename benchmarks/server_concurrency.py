@@ -0,0 +1,65 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+from fastmcp import Client
+
+# 프로젝트 루트 폴더 경로
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+### 2. 벤치마크 대상 서버 설정
+
+# 서버 이름 -> (서버 파일, 도구 이름, 도구 입력 값)
+SERVERS = {
+    "data_analysis": (
+        "data_analysis_server.py", "analyze_commercial_district",
+        {"input_data": {"query": "2024년 1분기 매출 상위 5개 상권을 알려줘"}},
+    ),
+    "market_research": (
+        "market_research_server.py", "conduct_market_research",
+        {"input_data": {"topic": "2025년 국내 커피 전문점 시장 동향"}},
+    ),
+    "report_writing": (
+        "report_writing_server.py", "write_final_report",
+        {"input_data": {"user_query": "커피 전문점 시장 보고서", "research_summary": "커피 전문점 수는 매년 증가하고 있다."}},
+    ),
+}
+
+# 동시에 실행할 요청 수(in-flight) 단계
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def run_level(client: Client, tool_name: str, payload: dict, concurrency: int) -> tuple[float, int]:
+    """동시 요청 concurrency개를 한 번에 보내고 (경과 시간, 실패 수)를 반환합니다."""
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(client.call_tool(tool_name, payload) for _ in range(concurrency)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(isinstance(r, Exception) for r in results)
+
+async def run_benchmark(server_key: str):
+    server_file, tool_name, payload = SERVERS[server_key]
+    # 하나의 서버 프로세스에 모든 요청을 보낸다
+    async with Client(os.path.join(folder_path, server_file)) as client:
+        # 첫 호출은 초기화 비용이 섞이므로 예열용으로 한 번 실행
+        await client.call_tool(tool_name, payload)
+
+        print(f"[{server_key}] 서버 프로세스 1개, 도구 '{tool_name}'")
+        print(f"{'in-flight':>9} | {'경과(s)':>8} | {'처리량(req/s)':>13} | {'실패':>4}")
+        print("-" * 46)
+        for level in CONCURRENCY_LEVELS:
+            elapsed, failures = await run_level(client, tool_name, payload, level)
+            print(f"{level:>9} | {elapsed:>8.2f} | {level / elapsed:>13.2f} | {failures:>4}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/server_concurrency.py [data_analysis | market_research | report_writing]
+    target = sys.argv[1] if len(sys.argv) > 1 else "data_analysis"
+    asyncio.run(run_benchmark(target))
@@ -0,0 +1,76 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import time
+import asyncio
+import statistics
+from langchain_core.messages import HumanMessage
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+# 상위 폴더(프로젝트 루트)의 모듈을 임포트할 수 있도록 경로 추가
+folder_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, folder_path)
+
+from data_analysis_langgraph import build_graph
+from speculative_sql import estimate_cost
+
+
+### 2. 벤치마크 설정
+
+# SQL 생성이 까다로워 실패하기 쉬운 질문 위주로 구성
+QUESTIONS = [
+    "2024년 분기별로 주말 매출 비중이 가장 크게 늘어난 업종 3개는?",
+    "2024년 1분기 대비 4분기에 점심시간 매출이 가장 많이 증가한 상권은?",
+    "커피-음료 업종에서 30대 매출 비중이 평균보다 높은 상권 목록",
+    "2025년 1분기 남성 대비 여성 매출 비율이 가장 높은 업종 5개",
+    "2024년 저녁시간 매출이 점심시간 매출의 2배 이상인 상권 수",
+    "2024년 2분기 매출 건수당 평균 매출액이 가장 높은 업종",
+]
+
+# 단일 후보 모드에서 실패 시 사용자가 다시 시도하는 최대 횟수
+MAX_ATTEMPTS = 3
+
+
+### 3. 벤치마크 실행 함수 정의
+
+async def time_to_sql_result(agent, question: str, candidates: int, usage: UsageMetadataCallbackHandler) -> tuple[float, bool]:
+    """질문 하나가 SQL 실행 결과를 얻기까지 걸린 시간(재시도 포함)과 성공 여부를 반환합니다."""
+    # 하위 질문 분할(fan-out)은 끄고 SQL 생성/실행 모드만 비교
+    config = {"configurable": {"sql_candidates": candidates, "query_fanout": False}, "callbacks": [usage]}
+    start = time.perf_counter()
+    for _ in range(MAX_ATTEMPTS):
+        try:
+            async for update in agent.astream({"messages": [HumanMessage(content=question)]}, config=config, stream_mode="updates"):
+                # SQL 실행 결과가 나오면 보고서 생성은 측정에서 제외
+                if "execute_sql" in update:
+                    if update["execute_sql"]["sql_row_count"]:
+                        return time.perf_counter() - start, True
+                    break
+        except Exception:
+            pass
+    return time.perf_counter() - start, False
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1] if len(values) > 1 else values[0]
+
+async def run_benchmark(repeat: int):
+    agent = build_graph().compile()
+    print(f"{'후보 수':>6} | {'p50(s)':>7} | {'p95(s)':>7} | {'성공률':>6} | {'토큰(in/out)':>15} | {'비용(USD)':>9}")
+    print("-" * 68)
+    for candidates in [1, 3, 5]:
+        usage = UsageMetadataCallbackHandler()
+        latencies, successes = [], 0
+        for question in QUESTIONS * repeat:
+            elapsed, ok = await time_to_sql_result(agent, question, candidates, usage)
+            latencies.append(elapsed)
+            successes += ok
+        tokens_in = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+        tokens_out = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+        print(f"{candidates:>6} | {percentile(latencies, 50):>7.2f} | {percentile(latencies, 95):>7.2f} | "
+              f"{successes / len(latencies):>6.0%} | {f'{tokens_in}/{tokens_out}':>15} | {estimate_cost(usage.usage_metadata):>9.5f}")
+
+
+### 4. 벤치마크 실행
+if __name__ == "__main__":
+    # 사용법: python benchmarks/speculative_sql.py [반복 횟수]
+    asyncio.run(run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3))
@@ -0,0 +1,125 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+from functools import lru_cache
+from typing import Any, Iterable, Set
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# 큰 상태 값을 저장할 로컬 디렉터리
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(folder_path, "blobs"))
+
+# 상태에 저장되는 참조 문자열의 접두어 (예: "blob:sha256:3f2a...")
+REF_PREFIX = "blob:sha256:"
+
+# 어떤 체크포인트에서도 참조되지 않은 blob을 삭제하기 전 유예 기간(일)
+# 체크포인트 정리 작업은 실행될 때마다 아직 참조 중인 blob의 수정 시각을 갱신하므로,
+# 이 기간 동안 갱신되지 않은 blob은 같은 저장소를 쓰는 어떤 체크포인트 DB에서도 참조되지 않는 것으로 본다.
+# (스레드 TTL과 같게 두면, 그보다 오래 열리지 않은 DB의 스레드는 다음 정리 때 어차피 만료됨)
+BLOB_GC_GRACE_DAYS = float(os.getenv("BLOB_GC_GRACE_DAYS", "7"))
+
+_REF_PATTERN = re.compile(re.escape(REF_PREFIX) + r"[0-9a-f]{64}")
+
+
+### 3. 내용 주소 기반(content-addressed) 저장 함수 정의
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+def _blob_path(digest: str) -> str:
+    # 한 디렉터리에 파일이 너무 많아지지 않도록 해시 앞 2글자로 하위 폴더를 나눈다
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:])
+
+def put_blob(data: bytes) -> str:
+    """
+    바이트 데이터를 내용의 해시(sha256)를 이름으로 저장하고 참조 문자열을 반환합니다.
+    같은 내용은 한 번만 저장됩니다.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 프로세스가 읽는 도중 깨진 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    else:
+        # 이미 있는 내용을 다시 저장하면 새로 참조된 것이므로 정리 대상에서 제외되도록 수정 시각 갱신
+        os.utime(path)
+    return REF_PREFIX + digest
+
+@lru_cache(maxsize=64)
+def get_blob(ref: str) -> bytes:
+    """참조 문자열에 해당하는 바이트 데이터를 읽어옵니다. (최근 사용한 값은 메모리에 유지)"""
+    if not is_blob_ref(ref):
+        raise ValueError(f"올바른 blob 참조가 아닙니다: {ref[:40]}")
+    with open(_blob_path(ref[len(REF_PREFIX):]), "rb") as f:
+        return f.read()
+
+
+### 4. JSON / 텍스트 저장 함수 정의
+
+def put_json(value: Any) -> str:
+    return put_blob(json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+
+def get_json(ref: str, default: Any = None) -> Any:
+    """참조를 JSON 값으로 읽어옵니다. 참조가 비어 있으면 default를 반환합니다."""
+    if not ref:
+        return default
+    return json.loads(get_blob(ref))
+
+def put_text(text: str) -> str:
+    return put_blob(text.encode("utf-8"))
+
+def get_text(ref: str | None, default: str | None = None) -> str | None:
+    """참조를 텍스트로 읽어옵니다. 참조가 비어 있으면 default를 반환합니다."""
+    if not ref:
+        return default
+    return get_blob(ref).decode("utf-8")
+
+
+### 5. 참조되지 않는 blob 정리 함수 정의
+
+def find_refs(value: Any) -> Set[str]:
+    """값(상태 / 메시지 / 중첩된 dict, list 등) 안에 들어 있는 모든 blob 참조 문자열을 찾습니다."""
+    return set(_REF_PATTERN.findall(repr(value)))
+
+def touch_blobs(refs: Iterable[str]) -> int:
+    """참조 중인 blob의 수정 시각을 지금으로 갱신하고, 갱신한 blob 수를 반환합니다."""
+    touched = 0
+    for ref in refs:
+        try:
+            os.utime(_blob_path(ref[len(REF_PREFIX):]))
+            touched += 1
+        except FileNotFoundError:
+            pass
+    return touched
+
+def sweep_blobs(grace_days: float = BLOB_GC_GRACE_DAYS) -> int:
+    """grace_days 동안 저장 / 참조 갱신이 없었던 blob(과 남은 임시 파일)을 삭제하고, 삭제한 파일 수를 반환합니다."""
+    if not os.path.isdir(BLOB_DIR):
+        return 0
+    cutoff = time.time() - grace_days * 86400
+    deleted = 0
+    for entry in os.scandir(BLOB_DIR):
+        if not entry.is_dir():
+            continue
+        for blob in os.scandir(entry.path):
+            try:
+                if blob.is_file() and blob.stat().st_mtime < cutoff:
+                    os.remove(blob.path)
+                    deleted += 1
+            except FileNotFoundError:
+                pass
+    if deleted:
+        get_blob.cache_clear()
+    return deleted
@@ -0,0 +1,189 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import hashlib
+import sqlite3
+from contextlib import closing
+from typing import Any, Dict, List, Tuple
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# 체크포인트 압축 사용 여부 / zstd 압축 레벨
+CHECKPOINT_COMPRESSION = os.getenv("CHECKPOINT_COMPRESSION", "on").lower() not in ("0", "off", "false")
+CHECKPOINT_ZSTD_LEVEL = int(os.getenv("CHECKPOINT_ZSTD_LEVEL", "3"))
+
+# 보고서/대화 체크포인트로 학습한 zstd 사전을 보관하는 폴더
+# 사전은 "<사전 id>.dict" 파일로 저장되며(id: 사전 내용의 sha256 앞 16자리), 한 번 저장한 파일은 덮어쓰지 않습니다.
+# 새 값은 가장 최근에 학습한 사전(또는 CHECKPOINT_ZSTD_DICT_ID로 지정한 사전)으로 압축하고,
+# 이전 사전으로 압축된 값은 타입 태그의 사전 id로 해당 사전을 찾아 읽습니다.
+CHECKPOINT_ZSTD_DICT_DIR = os.getenv("CHECKPOINT_ZSTD_DICT_DIR", os.path.join(folder_path, "checkpoint_zstd_dicts"))
+CHECKPOINT_ZSTD_DICT_ID = os.getenv("CHECKPOINT_ZSTD_DICT_ID", "")
+
+# 사전 id 없이 저장된 이전 형식("+zstd-dict")의 체크포인트를 읽기 위한 사전 파일 경로
+CHECKPOINT_ZSTD_DICT = os.getenv("CHECKPOINT_ZSTD_DICT", os.path.join(folder_path, "checkpoint_zstd.dict"))
+
+# 압축된 데이터의 타입 태그 접미사
+# (예: "msgpack" -> "msgpack+zstd", 사전 사용 시 "msgpack+zstd-dict:<사전 id>")
+ZSTD_SUFFIX = "+zstd"
+ZSTD_DICT_SUFFIX = "+zstd-dict"
+
+
+### 3. 압축 직렬화기 정의
+
+def dictionary_id(dict_data: bytes) -> str:
+    """사전 내용으로 정해지는 사전 id. (같은 사전은 항상 같은 id)"""
+    return hashlib.sha256(dict_data).hexdigest()[:16]
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    기본 직렬화기(JsonPlusSerializer, msgpack 형식)의 결과를 zstd로 압축하는 체크포인트 직렬화기.
+    - 압축한 값은 타입 태그에 접미사를 붙여 저장하므로, 압축 전에 저장된 체크포인트도 그대로 읽을 수 있습니다.
+    - 사전(dict_data)을 사용해 압축한 값은 태그에 사전 id를 남기며, 같은 사전이 있어야 읽을 수 있습니다.
+    - known_dicts: 읽기에만 사용할 이전 사전 {사전 id: 사전 내용} ("" 키는 id 없는 이전 형식용)
+    """
+    def __init__(self, inner: SerializerProtocol | None = None, level: int = CHECKPOINT_ZSTD_LEVEL,
+                 dict_data: bytes | None = None, known_dicts: Dict[str, bytes] | None = None):
+        self.inner = inner or JsonPlusSerializer()
+        self._dicts = dict(known_dicts or {})
+        if dict_data:
+            active_id = dictionary_id(dict_data)
+            self._dicts[active_id] = dict_data
+            self._suffix = f"{ZSTD_DICT_SUFFIX}:{active_id}"
+            self._compressor = zstandard.ZstdCompressor(level=level, dict_data=zstandard.ZstdCompressionDict(dict_data))
+        else:
+            self._suffix = ZSTD_SUFFIX
+            self._compressor = zstandard.ZstdCompressor(level=level)
+        # 접미사별 압축 해제기 (사전 없이 압축된 값은 사전 없이 풀어야 한다, 사전별 해제기는 처음 필요할 때 생성)
+        self._decompressors = {ZSTD_SUFFIX: zstandard.ZstdDecompressor()}
+
+    def _decompressor(self, suffix: str):
+        if suffix not in self._decompressors:
+            _, _, dict_id = suffix.partition(":")
+            if not suffix.startswith(ZSTD_DICT_SUFFIX) or dict_id not in self._dicts:
+                return None
+            zstd_dict = zstandard.ZstdCompressionDict(self._dicts[dict_id])
+            self._decompressors[suffix] = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+        return self._decompressors[suffix]
+
+    def decompress_typed(self, data: Tuple[str, bytes]) -> Tuple[str, bytes]:
+        """압축을 풀어 기본 직렬화기의 (타입, 바이트)로 되돌립니다. (압축되지 않은 값은 그대로 반환)"""
+        type_, payload = data
+        base_type, plus, codec = type_.partition("+")
+        if not plus:
+            return data
+        decompressor = self._decompressor(plus + codec)
+        if decompressor is None:
+            raise ValueError(
+                f"압축 사전 없이 읽을 수 없는 체크포인트입니다. (type={type_}, 사전 폴더: {CHECKPOINT_ZSTD_DICT_DIR})"
+            )
+        return base_type, decompressor.decompress(payload)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        return type_ + self._suffix, self._compressor.compress(data)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        return self.inner.loads_typed(self.decompress_typed(data))
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+
+def load_dictionaries() -> Tuple[Dict[str, bytes], str | None]:
+    """
+    사전 폴더의 모든 사전과 새 값 압축에 사용할 사전 id를 반환합니다.
+    (CHECKPOINT_ZSTD_DICT_ID가 없으면 가장 최근에 저장된 사전, 사전이 없으면 None)
+    """
+    dicts, newest = {}, []
+    if os.path.isdir(CHECKPOINT_ZSTD_DICT_DIR):
+        for name in os.listdir(CHECKPOINT_ZSTD_DICT_DIR):
+            if not name.endswith(".dict"):
+                continue
+            path = os.path.join(CHECKPOINT_ZSTD_DICT_DIR, name)
+            with open(path, "rb") as f:
+                dicts[name[:-len(".dict")]] = f.read()
+            newest.append((os.path.getmtime(path), name[:-len(".dict")]))
+    if os.path.exists(CHECKPOINT_ZSTD_DICT):
+        with open(CHECKPOINT_ZSTD_DICT, "rb") as f:
+            dicts[""] = f.read()
+    active_id = CHECKPOINT_ZSTD_DICT_ID or (max(newest)[1] if newest else None)
+    if active_id and active_id not in dicts:
+        raise ValueError(f"CHECKPOINT_ZSTD_DICT_ID에 해당하는 사전이 없습니다: {active_id}")
+    return dicts, active_id
+
+def make_checkpoint_serializer() -> SerializerProtocol:
+    """
+    설정에 맞는 체크포인트 직렬화기를 생성합니다.
+    zstandard 패키지가 없거나 압축을 끈 경우 기본 직렬화기를 반환합니다.
+    """
+    if not CHECKPOINT_COMPRESSION or zstandard is None:
+        return JsonPlusSerializer()
+    dicts, active_id = load_dictionaries()
+    return CompressedSerializer(dict_data=dicts.get(active_id) if active_id else None, known_dicts=dicts)
+
+
+### 4. 압축 사전 학습 함수 정의
+
+def load_checkpoint_samples(db_files: List[str]) -> List[bytes]:
+    """
+    체크포인트 DB에 저장된 체크포인트를 압축 전 바이트(msgpack)로 읽어옵니다.
+    이전 사전으로 압축된 값도 사전 폴더의 사전으로 풀어서 포함합니다. (사전을 찾을 수 없는 값만 제외)
+    """
+    dicts, _ = load_dictionaries()
+    serializer = CompressedSerializer(known_dicts=dicts)
+    samples, skipped = [], 0
+    for db_file in db_files:
+        with closing(sqlite3.connect(db_file)) as conn:
+            rows = conn.execute("SELECT type, checkpoint FROM checkpoints").fetchall()
+        for type_, payload in rows:
+            try:
+                samples.append(serializer.decompress_typed((type_, payload))[1])
+            except ValueError:
+                skipped += 1
+    if skipped:
+        print(f"사전을 찾을 수 없어 제외한 체크포인트: {skipped}개")
+    return samples
+
+def train_dictionary(samples: List[bytes], dict_size: int = 112 * 1024) -> bytes:
+    """체크포인트 샘플로 zstd 사전을 학습합니다."""
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+def save_dictionary(dict_data: bytes) -> str:
+    """
+    사전을 사전 폴더에 "<사전 id>.dict"로 저장하고 경로를 반환합니다.
+    이미 저장된 사전 파일은 덮어쓰지 않습니다. (그 사전으로 압축된 체크포인트를 계속 읽을 수 있도록)
+    """
+    os.makedirs(CHECKPOINT_ZSTD_DICT_DIR, exist_ok=True)
+    path = os.path.join(CHECKPOINT_ZSTD_DICT_DIR, f"{dictionary_id(dict_data)}.dict")
+    # "xb": 같은 이름의 파일이 있으면 FileExistsError
+    with open(path, "xb") as f:
+        f.write(dict_data)
+    return path
+
+
+### 5. 사전 학습 실행
+if __name__ == "__main__":
+    # 사용법: python checkpoint_serde.py agent_checkpoint.sqlite mcp_agent.sqlite ...
+    if zstandard is None:
+        sys.exit("zstandard 패키지가 필요합니다. (pip install zstandard)")
+    samples = load_checkpoint_samples(sys.argv[1:])
+    print(f"체크포인트 샘플 {len(samples)}개로 사전을 학습합니다...")
+    try:
+        path = save_dictionary(train_dictionary(samples))
+    except FileExistsError as e:
+        sys.exit(f"같은 사전이 이미 저장되어 있습니다: {e.filename}")
+    print(f"사전을 저장했습니다: {path} (이후 새 체크포인트는 이 사전으로 압축되며, 이전 사전도 계속 사용됩니다)")
@@ -0,0 +1,361 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import json
+import time
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import WRITES_IDX_MAP, Checkpoint, CheckpointMetadata, ChannelVersions, get_checkpoint_metadata
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from checkpoint_serde import make_checkpoint_serializer
+from blob_store import BLOB_GC_GRACE_DAYS, find_refs, touch_blobs, sweep_blobs
+
+
+### 2. 환경 설정
+
+# 스레드(대화)마다 남겨둘 최근 체크포인트 수
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+
+# 마지막 체크포인트 이후 이 기간(일)이 지난 스레드는 통째로 삭제
+CHECKPOINT_THREAD_TTL_DAYS = float(os.getenv("CHECKPOINT_THREAD_TTL_DAYS", "7"))
+
+# 백그라운드 정리 주기(초) / 한 번에 삭제할 최대 행 수 / 한 번에 반환할 최대 페이지 수
+CHECKPOINT_COMPACTION_INTERVAL = float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "300"))
+CHECKPOINT_DELETE_BATCH = int(os.getenv("CHECKPOINT_DELETE_BATCH", "500"))
+CHECKPOINT_VACUUM_PAGES = int(os.getenv("CHECKPOINT_VACUUM_PAGES", "1000"))
+
+# 지연 기록(write-behind) 모드 사용 여부
+# 체크포인트를 메모리에 모았다가 최대 FLUSH_INTERVAL초(또는 FLUSH_MAX_PENDING건)마다 한 트랜잭션으로 기록
+# (비정상 종료 시 최대 FLUSH_INTERVAL초 분량이 유실될 수 있으므로 기본값은 꺼짐, 모든 콘솔 / 서비스에 적용)
+CHECKPOINT_WRITE_BEHIND = os.getenv("CHECKPOINT_WRITE_BEHIND", "off").lower() in ("1", "on", "true")
+CHECKPOINT_FLUSH_INTERVAL = float(os.getenv("CHECKPOINT_FLUSH_INTERVAL", "1.0"))
+CHECKPOINT_FLUSH_MAX_PENDING = int(os.getenv("CHECKPOINT_FLUSH_MAX_PENDING", "64"))
+
+# UUID 타임스탬프 기준 시각(1582-10-15)과 유닉스 기준 시각의 차이 (100ns 단위)
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+### 3. 체크포인트 정리 함수 정의
+
+def checkpoint_id_before(seconds_ago: float) -> str:
+    """
+    지금으로부터 seconds_ago초 전 시각에 해당하는 체크포인트 ID(uuid6)의 하한값을 만듭니다.
+    uuid6는 앞쪽 비트가 생성 시각이므로 문자열 비교만으로 시간 순서를 비교할 수 있습니다.
+    """
+    timestamp = int((time.time() - seconds_ago) * 10_000_000) + _UUID_EPOCH_OFFSET
+    time_high_mid, time_low = timestamp >> 12, timestamp & 0x0FFF
+    value = (time_high_mid << 80) | (0x6 << 76) | (time_low << 64)
+    return str(uuid.UUID(int=value))
+
+async def _delete_batch(saver: AsyncSqliteSaver, select_sql: str, params: tuple) -> int:
+    """select_sql로 고른 (thread_id, checkpoint_ns, checkpoint_id) 묶음을 한 트랜잭션에서 삭제합니다."""
+    # 체크포인터와 같은 연결을 쓰므로 그래프의 읽기/쓰기와 섞이지 않도록 잠금을 잡는다
+    async with saver.lock:
+        # 지연 기록 대기열도 같은 잠금 안에서 먼저 기록해야, 아직 기록되지 않은 최신 체크포인트까지
+        # 포함해서 만료 / 유지 대상을 판단한다 (활성 스레드를 만료로 잘못 삭제하지 않음)
+        if isinstance(saver, WriteBehindSqliteSaver):
+            await saver._flush_locked()
+        async with saver.conn.execute(select_sql, params) as cur:
+            keys = await cur.fetchall()
+        if keys:
+            await saver.conn.executemany(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+            )
+            await saver.conn.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+            )
+            await saver.conn.commit()
+    return len(keys)
+
+def _refs_in_rows(saver: AsyncSqliteSaver, rows: List[tuple]) -> set:
+    """(type, 직렬화된 값) 행들을 역직렬화하여 그 안의 blob 참조를 모읍니다."""
+    refs = set()
+    for type_, value in rows:
+        refs |= find_refs(saver.serde.loads_typed((type_, value)))
+    return refs
+
+async def mark_referenced_blobs(saver: AsyncSqliteSaver, batch_size: int = CHECKPOINT_DELETE_BATCH) -> int:
+    """
+    남아 있는 체크포인트 / 쓰기 기록이 참조하는 blob의 수정 시각을 갱신합니다. (blob 정리에서 제외)
+    batch_size 행씩 읽고, 역직렬화와 파일 갱신은 별도 스레드에서 실행합니다.
+    """
+    touched = 0
+    for table, column in (("checkpoints", "checkpoint"), ("writes", "value")):
+        last_rowid = 0
+        while True:
+            async with saver.lock:
+                async with saver.conn.execute(
+                    f"SELECT rowid, type, {column} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ) as cur:
+                    rows = await cur.fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            refs = await asyncio.to_thread(_refs_in_rows, saver, [(row[1], row[2]) for row in rows])
+            touched += await asyncio.to_thread(touch_blobs, refs)
+    return touched
+
+async def compact_checkpoints(
+    saver: AsyncSqliteSaver,
+    keep_last: int = CHECKPOINT_KEEP_LAST,
+    ttl_days: float = CHECKPOINT_THREAD_TTL_DAYS,
+    batch_size: int = CHECKPOINT_DELETE_BATCH,
+    blob_grace_days: float = BLOB_GC_GRACE_DAYS,
+) -> Dict[str, int]:
+    """
+    보존 정책에 따라 체크포인트를 정리합니다.
+    - 마지막 체크포인트가 TTL보다 오래된 스레드는 모두 삭제
+    - 나머지 스레드는 최근 keep_last개의 체크포인트만 유지
+    - 삭제는 batch_size 단위로 나누어 실행하고, 배치 사이에 다른 작업에 실행 기회를 넘긴다
+    - 남은 체크포인트가 참조하는 blob을 표시한 뒤, blob_grace_days 동안 참조되지 않은 blob을 삭제 (0이면 생략)
+    - 반환값: {"expired": 삭제한 만료 체크포인트 수, "trimmed": 삭제한 오래된 체크포인트 수, "blobs": 삭제한 blob 수}
+    """
+    await saver.setup()
+    stats = {"expired": 0, "trimmed": 0, "blobs": 0}
+
+    expire_sql = """
+        SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints
+        WHERE thread_id IN (
+            SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?
+        )
+        LIMIT ?"""
+    trim_sql = """
+        SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+            SELECT thread_id, checkpoint_ns, checkpoint_id,
+                   ROW_NUMBER() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rn
+            FROM checkpoints
+        )
+        WHERE rn > ?
+        LIMIT ?"""
+
+    if ttl_days > 0:
+        cutoff = checkpoint_id_before(ttl_days * 86400)
+        while deleted := await _delete_batch(saver, expire_sql, (cutoff, batch_size)):
+            stats["expired"] += deleted
+            await asyncio.sleep(0)
+    if keep_last > 0:
+        while deleted := await _delete_batch(saver, trim_sql, (keep_last, batch_size)):
+            stats["trimmed"] += deleted
+            await asyncio.sleep(0)
+    if blob_grace_days > 0:
+        await mark_referenced_blobs(saver, batch_size)
+        stats["blobs"] = await asyncio.to_thread(sweep_blobs, blob_grace_days)
+    return stats
+
+async def reclaim_free_pages(saver: AsyncSqliteSaver, pages: int = CHECKPOINT_VACUUM_PAGES) -> None:
+    """삭제로 생긴 빈 페이지를 최대 pages개까지 파일에서 반환합니다. (전체 VACUUM 없이 조금씩)"""
+    async with saver.lock:
+        await saver.conn.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+        await saver.conn.commit()
+
+async def enable_incremental_vacuum(saver: AsyncSqliteSaver) -> bool:
+    """
+    DB 파일을 auto_vacuum=INCREMENTAL 모드로 전환합니다. (전환했으면 True)
+    기존 파일은 모드 변경을 반영하기 위해 최초 1회 전체 VACUUM이 필요하며, 그동안 DB를 독점하므로
+    백그라운드 정리 작업에서 체크포인터 잠금을 잡고 실행합니다. (이벤트 루프는 멈추지 않음)
+    """
+    await saver.setup()
+    async with saver.lock:
+        async with saver.conn.execute("PRAGMA auto_vacuum") as cur:
+            (mode,) = await cur.fetchone()
+        if mode == 2:
+            return False
+        # 대기 중인 지연 기록을 먼저 기록하여 열린 트랜잭션이 없는 상태에서 VACUUM 실행
+        if isinstance(saver, WriteBehindSqliteSaver):
+            await saver._flush_locked()
+        await saver.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await saver.conn.execute("VACUUM")
+    return True
+
+
+### 4. 지연 기록(write-behind) 체크포인터 정의
+
+class WriteBehindSqliteSaver(AsyncSqliteSaver):
+    """
+    체크포인트 저장을 기다리지 않고 다음 노드를 바로 실행할 수 있도록 하는 체크포인터.
+    - aput/aput_writes는 값을 즉시 직렬화해 메모리 대기열에 넣고 바로 반환합니다.
+    - 대기열은 백그라운드 작업이 flush_interval초마다(또는 max_pending건이 쌓이면) 한 트랜잭션으로 기록합니다.
+    - 읽기 전과 종료 시에는 대기열을 먼저 기록하므로, 정상 종료라면 대화 기록이 유실되지 않습니다.
+      (비정상 종료 시에는 최대 flush_interval초 분량의 체크포인트가 유실될 수 있습니다.)
+    """
+    def __init__(self, *args, flush_interval: float = CHECKPOINT_FLUSH_INTERVAL,
+                 max_pending: int = CHECKPOINT_FLUSH_MAX_PENDING, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending_checkpoints: List[tuple] = []
+        self._pending_writes: List[Tuple[str, tuple]] = []
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    def _pending_count(self) -> int:
+        return len(self._pending_checkpoints) + len(self._pending_writes)
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint,
+                   metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        # 이후 그래프가 상태를 바꾸더라도 영향을 받지 않도록 지금 시점의 값으로 직렬화
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        serialized_metadata = json.dumps(
+            get_checkpoint_metadata(config, metadata), ensure_ascii=False
+        ).encode("utf-8", "ignore")
+        self._pending_checkpoints.append((
+            thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+            type_, serialized_checkpoint, serialized_metadata,
+        ))
+        self._notify()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]],
+                          task_id: str, task_path: str = "") -> None:
+        # 특수 채널(오류, 중단 등)은 덮어쓰고, 일반 채널은 이미 있으면 유지 (AsyncSqliteSaver와 동일한 규칙)
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        for idx, (channel, value) in enumerate(writes):
+            self._pending_writes.append((verb, (
+                config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", ""),
+                config["configurable"]["checkpoint_id"], task_id, WRITES_IDX_MAP.get(channel, idx),
+                channel, *self.serde.dumps_typed(value),
+            )))
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._pending_count() >= self.max_pending:
+            self._full.set()
+
+    async def aflush(self) -> None:
+        """메모리 대기열의 체크포인트를 한 트랜잭션으로 SQLite에 기록합니다."""
+        if not self._pending_count():
+            return
+        await self.setup()
+        async with self.lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        """aflush의 기록 단계. 호출하는 쪽에서 self.lock을 잡고 있어야 합니다. (setup 완료 후)"""
+        if not self._pending_count():
+            return
+        # 잠금 안에서 대기열을 넘겨받아야 뒤이은 읽기가 항상 기록된 값을 본다
+        checkpoints, self._pending_checkpoints = self._pending_checkpoints, []
+        writes, self._pending_writes = self._pending_writes, []
+        try:
+            if checkpoints:
+                await self.conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                    "parent_checkpoint_id, type, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    checkpoints,
+                )
+            for verb in ("INSERT OR REPLACE", "INSERT OR IGNORE"):
+                rows = [params for v, params in writes if v == verb]
+                if rows:
+                    await self.conn.executemany(
+                        f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+                        "channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            await self.conn.commit()
+        except Exception:
+            # 기록에 실패하면 다음 기록 때 다시 시도하도록 대기열 앞쪽에 되돌려 놓는다
+            await self.conn.rollback()
+            self._pending_checkpoints[:0] = checkpoints
+            self._pending_writes[:0] = writes
+            raise
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.aflush()
+            except Exception as e:
+                print(f"[Checkpoint] 체크포인트 기록 중 오류 발생 (다음 주기에 재시도): {e}")
+
+    def start_flusher(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def aclose(self) -> None:
+        """백그라운드 기록을 멈추고 남은 대기열을 모두 기록합니다."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.aflush()
+
+    # --- 읽기/삭제 전에는 대기열을 먼저 기록 ---
+    async def aget_tuple(self, config: RunnableConfig):
+        await self.aflush()
+        return await super().aget_tuple(config)
+
+    async def alist(self, config: RunnableConfig | None, **kwargs):
+        await self.aflush()
+        async for item in super().alist(config, **kwargs):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.aflush()
+        await super().adelete_thread(thread_id)
+
+
+### 5. 백그라운드 정리 작업 / 체크포인터 생성 함수 정의
+
+async def _compaction_loop(saver: AsyncSqliteSaver, interval: float) -> None:
+    vacuum_mode_ready = False
+    while True:
+        try:
+            stats = await compact_checkpoints(saver)
+            if not vacuum_mode_ready:
+                # 첫 정리 후 한 번만 incremental vacuum 모드로 전환 (전체 VACUUM이 삭제된 공간도 함께 반환)
+                if await enable_incremental_vacuum(saver):
+                    print("[Checkpoint] DB를 incremental vacuum 모드로 전환했습니다.")
+                vacuum_mode_ready = True
+            if stats["expired"] or stats["trimmed"]:
+                await reclaim_free_pages(saver)
+                print(f"[Checkpoint] 만료 스레드 체크포인트 {stats['expired']}개, "
+                      f"오래된 체크포인트 {stats['trimmed']}개를 정리했습니다.")
+            if stats["blobs"]:
+                print(f"[Checkpoint] 참조되지 않는 blob {stats['blobs']}개를 삭제했습니다.")
+        except Exception as e:
+            # 정리 작업의 실패가 에이전트 실행을 멈추지 않도록 기록만 남긴다
+            print(f"[Checkpoint] 체크포인트 정리 중 오류 발생: {e}")
+        await asyncio.sleep(interval)
+
+@asynccontextmanager
+async def open_checkpointer(
+    db_file: str, interval: float = CHECKPOINT_COMPACTION_INTERVAL, write_behind: bool = CHECKPOINT_WRITE_BEHIND
+) -> AsyncIterator[AsyncSqliteSaver]:
+    """
+    AsyncSqliteSaver를 열고, 블록이 실행되는 동안 보존 정책(최근 N개 유지 + 오래된 스레드 만료)에 따른
+    정리 작업을 백그라운드에서 실행합니다.
+    체크포인트는 압축 직렬화기(checkpoint_serde)로 저장됩니다.
+    기존의 AsyncSqliteSaver.from_conn_string(db_file) 대신 그대로 사용할 수 있습니다.
+    - write_behind: True면 체크포인트를 모아서 백그라운드에서 기록하고, 블록이 끝날 때 남은 값을 모두 기록
+    백그라운드 작업은 이벤트 루프에서 실행되므로, 콘솔에서는 input()을 asyncio.to_thread로 기다려야
+    사용자 입력을 기다리는 동안에도 체크포인트 기록 / 정리 작업이 멈추지 않습니다.
+    """
+    async with aiosqlite.connect(db_file) as conn:
+        saver_class = WriteBehindSqliteSaver if write_behind else AsyncSqliteSaver
+        saver = saver_class(conn, serde=make_checkpoint_serializer())
+        if write_behind:
+            saver.start_flusher()
+        task = asyncio.create_task(_compaction_loop(saver, interval))
+        try:
+            yield saver
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            if write_behind:
+                await saver.aclose()
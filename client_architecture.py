@@ -5,7 +5,7 @@ import os
 import asyncio
 import json
 import sys
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp_sessions import MCPSessionManager
 
 # 실행 파일(client_architecture.py) 폴더 경로 설정
 folder_path = os.path.dirname(os.path.abspath(__file__))
@@ -26,8 +26,8 @@ async def run_client():
     """
     
     try:
-        # client 생성
-        client = MultiServerMCPClient(
+        # 세션 관리자 생성: 도구 서버를 한 번만 실행하고, 블록이 끝날 때까지 같은 세션으로 모든 도구 호출을 처리
+        async with MCPSessionManager(
             {
                 "GreetingServer": {
                     "command": sys.executable,
@@ -35,36 +35,35 @@ async def run_client():
                     "transport": "stdio"
                 }
             }
-        )
+        ) as mcp_sessions:
+            # 도구 목록(list) 생성
+            tools = await mcp_sessions.get_tools()
 
-        # 도구 목록(list) 생성
-        tools = await client.get_tools()
+            # 도구 설정: 인사 메시지 생성 도구
+            greeting_tool = tools[0]
+            print(f"도구 목록과 명세: {greeting_tool}")
+            print('-'*80)
+            print(f'도구 호출 준비 완료: {greeting_tool.name}')
 
-        # 도구 설정: 인사 메시지 생성 도구
-        greeting_tool = tools[0]
-        print(f"도구 목록과 명세: {greeting_tool}")
-        print('-'*80)
-        print(f'도구 호출 준비 완료: {greeting_tool.name}')
+            print('-'*80)
 
-        print('-'*80)
+            # 도구 서버에 요청할 python 딕셔너리 생성: 도구 함수(create_greeting)의 입력 값 생성
+            payload = {"input_data": {"name":"박안정", "language":"한국어"}}
 
-        # 도구 서버에 요청할 python 딕셔너리 생성: 도구 함수(create_greeting)의 입력 값 생성
-        payload = {"input_data": {"name":"박안정", "language":"한국어"}}
+            # ainvoke 함수는 이 python 딕셔너리(payload)를, 클라이언트와 도구 서버간에 쉽게 주고 받을 수 있는 JSON 문자열로 변환
 
-        # ainvoke 함수는 이 python 딕셔너리(payload)를, 클라이언트와 도구 서버간에 쉽게 주고 받을 수 있는 JSON 문자열로 변환
+            # 도구 실행 -> 응답: JSON 형식의 문자열
+            response_str = await greeting_tool.ainvoke(payload)
+            print(f'서버로부터 응답 수신: {response_str}')
 
-        # 도구 실행 -> 응답: JSON 형식의 문자열
-        response_str = await greeting_tool.ainvoke(payload)
-        print(f'서버로부터 응답 수신: {response_str}')
+            # 서버가 보낸 JSON 문자열을 다시 python 딕셔너리로 변환
+            response_data = json.loads(response_str)
 
-        # 서버가 보낸 JSON 문자열을 다시 python 딕셔너리로 변환
-        response_data = json.loads(response_str)
-
-        # 결과 추출
-        if "result" in response_data:
-            print(f"최종 결과: {response_data['result']['greeting']}")
-        else:
-            print(f'서버에서 처리된 오류: {response_data.get('error')}')
+            # 결과 추출
+            if "result" in response_data:
+                print(f"최종 결과: {response_data['result']['greeting']}")
+            else:
+                print(f'서버에서 처리된 오류: {response_data.get('error')}')
 
     # 포괄적 예외 처리
     except Exception as e:
@@ -76,4 +75,4 @@ async def run_client():
 ### 3. 메인 함수 실행
 if __name__=="__main__":
     asyncio.run(run_client())
-    print(f"\n[SYSTEM] 클라이언트 실행이 완료되었으며, 서버 프로세스는 자동으로 종료됩니다.")
\ No newline at end of file
+    print(f"\n[SYSTEM] 클라이언트 실행이 완료되었으며, 세션이 닫히면서 서버 프로세스도 종료됩니다.")
\ No newline at end of file
@@ -0,0 +1,100 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import re
+from typing import Callable, List
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+from langgraph.graph.message import add_messages
+from token_count import estimate_tokens
+
+
+### 2. 환경 설정
+
+# 원문 그대로 유지할 최근 대화 턴 수 (턴: 사용자 질문 1개와 그에 대한 응답들)
+MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "6"))
+
+# 원문으로 유지할 메시지의 최대 토큰 수 (넘으면 오래된 턴부터 요약으로 이동)
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "4000"))
+
+# 누적 요약의 최대 토큰 수 (넘으면 가장 오래된 요약 항목부터 삭제)
+MEMORY_SUMMARY_MAX_TOKENS = int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", "600"))
+
+# 요약 메시지의 고정 ID / 머리말
+SUMMARY_MESSAGE_ID = "conversation_summary"
+SUMMARY_HEADER = "[이전 대화 요약]"
+
+
+### 3. 대화 요약 함수 정의
+
+def _first_line(text: str, limit: int) -> str:
+    """마크다운 기호를 걷어낸 첫 번째 본문 줄(없으면 첫 제목 줄)을 limit 글자 이내로 반환합니다."""
+    lines = [line.strip() for line in str(text).splitlines() if line.strip()]
+    body = [line for line in lines if not line.startswith("#")]
+    for line in body or lines:
+        line = re.sub(r"^[#>\-*\s|]+", "", line).strip()
+        if line:
+            return line if len(line) <= limit else line[:limit] + "…"
+    return ""
+
+def summarize_turn(turn: List[AnyMessage]) -> str:
+    """한 턴을 '질문 → 응답 첫 줄' 형태의 한 줄 요약으로 만듭니다. (LLM 호출 없음)"""
+    question = next((m.content for m in turn if isinstance(m, HumanMessage)), "")
+    answers = [m.content for m in turn if not isinstance(m, HumanMessage) and m.content]
+    answer = _first_line(answers[-1], 120) if answers else "(응답 없음)"
+    return f"- Q: {_first_line(question, 80)} → A: {answer}"
+
+def _split_turns(messages: List[AnyMessage]) -> List[List[AnyMessage]]:
+    """사용자 메시지를 기준으로 메시지 목록을 턴 단위로 나눕니다."""
+    turns: List[List[AnyMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+def _message_tokens(messages: List[AnyMessage]) -> int:
+    return sum(estimate_tokens(str(m.content)) for m in messages)
+
+
+### 4. 메시지 창(window) 리듀서 정의
+
+def make_windowed_reducer(
+    max_turns: int = MEMORY_MAX_TURNS,
+    max_tokens: int = MEMORY_MAX_TOKENS,
+    summary_max_tokens: int = MEMORY_SUMMARY_MAX_TOKENS,
+) -> Callable[[list, list], List[AnyMessage]]:
+    """
+    add_messages와 같은 방식으로 메시지를 합친 뒤, 최근 max_turns턴(최대 max_tokens 토큰)만 원문으로 유지하는
+    리듀서를 만듭니다. 밀려난 턴은 맨 앞의 요약 메시지(SystemMessage)에 한 줄씩 누적됩니다.
+    상태의 messages 필드에 add_messages 대신 사용하면 대화가 길어져도 LLM에 보내는 메시지 양(턴당 비용)과
+    체크포인트 크기가 일정하게 유지됩니다.
+    - 진행 중인 마지막 턴은 제한을 넘더라도 항상 원문으로 유지됩니다.
+    """
+    def reducer(left: list, right: list) -> List[AnyMessage]:
+        merged = combined = add_messages(left, right)
+        summary_lines: List[str] = []
+        if merged and merged[0].id == SUMMARY_MESSAGE_ID:
+            summary_lines = merged[0].content.splitlines()[1:]
+            merged = merged[1:]
+
+        turns = _split_turns(merged)
+        dropped: List[List[AnyMessage]] = []
+        while len(turns) > 1 and (
+            len(turns) > max_turns or _message_tokens([m for t in turns for m in t]) > max_tokens
+        ):
+            dropped.append(turns.pop(0))
+        if not dropped:
+            return combined
+
+        summary_lines += [summarize_turn(turn) for turn in dropped]
+        # 요약도 한도를 넘으면 가장 오래된 항목부터 버린다
+        while len(summary_lines) > 1 and estimate_tokens("\n".join(summary_lines)) > summary_max_tokens:
+            summary_lines.pop(0)
+        return [_summary_message(summary_lines)] + [m for t in turns for m in t]
+
+    return reducer
+
+def _summary_message(lines: List[str]) -> SystemMessage:
+    return SystemMessage(content="\n".join([SUMMARY_HEADER, *lines]), id=SUMMARY_MESSAGE_ID)
+
+# 기본 설정(환경 변수)을 사용하는 리듀서 -> Annotated[List[BaseMessage], windowed_add_messages]
+windowed_add_messages = make_windowed_reducer()
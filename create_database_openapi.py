@@ -140,14 +140,32 @@ def update_database_for_period(db_path, api_key, year, quarter):
     return True
 
 
-### 6. 애플리케이션 실행
+### 6. 분석 보고서 워밍업 함수 정의
+def warm_up_reports():
+    """
+    새 분기 데이터가 적재된 뒤, 자주 묻는 질문의 보고서를 새 데이터 버전으로 미리 계산해 둔다.
+    분석 서버(data_analysis_server.py)는 이 보고서를 즉시 반환한다.
+    """
+    import asyncio
+    from data_analysis_server import warm_up_report_cache
+    try:
+        stored = asyncio.run(warm_up_report_cache())
+        print(f"--- 보고서 워밍업 완료: {stored}건 ---")
+    except Exception as e:
+        # 워밍업 실패는 데이터 적재 결과에 영향을 주지 않는다
+        print(f"보고서 워밍업 중 오류 발생: {e}")
+
+
+### 7. 애플리케이션 실행
 if __name__ == '__main__':
     api_key = os.getenv("SEOUL_DATA_API_KEY")
-    db_path = 'sales.db'
+    # 분석 서버(data_analysis_server.py)와 같은 DB 파일을 사용하도록 실행 위치와 무관한 경로 사용
+    db_path = os.path.join(folder_path, 'sales.db')
     if not api_key: 
         print("환경변수에서 SEOUL_DATA_API_KEY를 찾을 수 없습니다.")
     else:
         initialize_database(db_path)
+        updated = False
         
         # 2024년 1분기 ~ 2025년 1분기 데이터 수집
         for year in ["2024", "2025"]:
@@ -157,4 +175,9 @@ if __name__ == '__main__':
                     break
                 if not update_database_for_period(db_path, api_key, year, str(quarter)): 
                     break
-        print("\n--- 모든 데이터 수집 및 업데이트 완료 ---")
\ No newline at end of file
+                updated = True
+        print("\n--- 모든 데이터 수집 및 업데이트 완료 ---")
+
+        # 적재가 끝난 데이터 버전으로 자주 묻는 질문의 보고서를 미리 계산
+        if updated:
+            warm_up_reports()
\ No newline at end of file
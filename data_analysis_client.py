@@ -8,11 +8,13 @@ from typing import Annotated, List, Dict, Any
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from conversation_memory import windowed_add_messages
+from checkpointing import open_checkpointer
 from functools import partial
+from report_streaming import astream_with_live_output, print_final_answer
+from mcp_sessions import MCPSessionManager, expert_server_connection
+from mcp_resilience import guarded_ainvoke
 
 
 ### 2. 환경 설정 
@@ -27,10 +29,14 @@ load_dotenv(env_file_path)
 # 파이썬 실행 환경 가져오기
 python_command = sys.executable
 
+# 공유 HTTP 분석 서버 주소 (예: http://127.0.0.1:8000/mcp)
+# 설정하지 않으면 기존처럼 클라이언트가 stdio로 전용 서버 프로세스를 실행한다
+DATA_ANALYSIS_SERVER_URL = os.getenv("DATA_ANALYSIS_SERVER_URL")
+
 
 ### 3. LangGraph 상태 정의 
 class AgentState(BaseModel):
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List[BaseMessage], windowed_add_messages]  # 최근 대화 창 + 이전 대화 요약
 
 
 
@@ -43,8 +49,8 @@ async def call_analysis_expert_node(state: AgentState, tool: Any) -> Dict[str, A
     print(f"\n[Node: Call Analysis Expert] '{user_query}' 분석을 요청합니다...")
     
     try:
-        # FastMCP 도구 호출
-        response_str = await tool.ainvoke({"input_data": {"query": user_query}})
+        # FastMCP 도구 호출 (마감 시간 / 회로 차단기 적용, 실패 시 {"error": ...} 응답)
+        response_str = await guarded_ainvoke(tool, {"input_data": {"query": user_query}})
         response_data = json.loads(response_str)
 
         if "result" in response_data:
@@ -79,24 +85,29 @@ async def main():
     # 1. 체크포인트(대화 기록)를 저장할 파일 경로를 지정합니다.
     db_file = os.path.join(folder_path, "analyze_commercial_district_checkpoint.sqlite")
     
-    # 2. 'async with' 구문을 사용하여 Checkpointer를 안전하게 초기화합니다.
-    async with AsyncSqliteSaver.from_conn_string(db_file) as memory:
-        # 단일 분석 전문가 서버만 관리하도록 클라이언트 설정
-        client = MultiServerMCPClient({
-            "DataAnalysisExpert": {
-                "command": python_command, 
-                "args": [os.path.join(folder_path, "data_analysis_server.py")],
-                "transport": "stdio"
-            }
-        })
-        
+    # 2. 단일 분석 전문가 서버만 관리하도록 연결 설정
+    # - URL이 설정되어 있으면 상시 실행 중인 공유 HTTP 서버에 연결 (캐시와 연결을 모든 사용자가 공유)
+    if DATA_ANALYSIS_SERVER_URL:
+        connection = {"url": DATA_ANALYSIS_SERVER_URL, "transport": "streamable_http"}
+    else:
+        # - MCP_IN_PROCESS=on: 서버 객체를 이 프로세스에 불러와 메모리 전송으로 연결
+        # - MCP_ZYGOTE=on: 미리 임포트를 마친 zygote에서 서버 프로세스를 fork하여 실행
+        connection = expert_server_connection(os.path.join(folder_path, "data_analysis_server.py"))
+
+    # 3. 'async with' 구문을 사용하여 Checkpointer와 MCP 세션을 안전하게 초기화합니다.
+    # - 분석 서버는 한 번만 실행하고, 프로그램이 끝날 때까지 같은 세션으로 모든 도구를 호출
+    #   (서버가 보내는 진행 알림(보고서 조각)은 그래프의 custom 스트림으로 전달)
+    async with open_checkpointer(db_file) as memory, \
+            MCPSessionManager({"DataAnalysisExpert": connection}) as mcp_sessions:
         print("\n--- MCP 서버로부터 분석 전문가 도구 로드 중... ---")
-        tools = await client.get_tools()
+        tools = await mcp_sessions.get_tools()
         if not tools:
             print("[ERROR] 서버로부터 도구를 가져오지 못했습니다. 서버가 정상 실행 중인지 확인하세요.")
             return
         
-        analysis_tool = tools[0]
+        # 서버가 배치 도구도 함께 제공하므로 이름으로 단건 분석 도구를 선택
+        tool_map = {tool.name: tool for tool in tools}
+        analysis_tool = tool_map.get("analyze_commercial_district", tools[0])
         print(f"--- '{analysis_tool.name}' 도구 로드 완료 ---\n")
 
         # 그래프 구성: 입력 -> 분석 노드 -> 종료
@@ -120,7 +131,7 @@ async def main():
         while True:
             try:
                 # 사용자 입력 받기
-                user_input = input("\n사용자: ")
+                user_input = await asyncio.to_thread(input, "\n사용자: ")
                 if user_input.lower() in ["exit", "종료"]:
                     print("AI 에이전트: 프로그램을 종료합니다.")
                     break
@@ -129,17 +140,16 @@ async def main():
                 
                 print("AI 에이전트: (분석 중...)")
 
-                # LangGraph 에이전트 실행
-                final_state = await agent_executor.ainvoke(
+                # LangGraph 에이전트 실행 (보고서는 생성되는 대로 실시간 출력)
+                final_state, streamed_text = await astream_with_live_output(
+                    agent_executor,
                     {"messages": [HumanMessage(content=user_input)]}, 
                     config=config
                 )
                 
                 # 최종 결과 출력
                 final_answer = final_state['messages'][-1].content
-                print("\n" + "="*25 + " 최종 결과 " + "="*25)
-                print(final_answer)
-                print("="*62)
+                print_final_answer(final_answer, streamed_text)
 
             except KeyboardInterrupt:
                 print("\nAI 에이전트: 프로그램을 종료합니다.")
@@ -1,17 +1,22 @@
 ### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
 import os
 import sqlite3
-import json
 import asyncio
 import uuid
-from typing import List, Dict, Any, Annotated
+from typing import List, Dict, Any, Annotated, Tuple
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.types import Send
+from conversation_memory import windowed_add_messages
+from checkpointing import open_checkpointer
+from result_compaction import compact_results
+from report_streaming import emit_report_delta, astream_with_live_output, print_final_answer
+from speculative_sql import dedupe_candidates, race_sql_candidates
+from blob_store import put_json, get_json
 
 
 ### 2. 환경 설정
@@ -26,16 +31,51 @@ load_dotenv(env_file_path)
 # llm 생성하기
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
+# 추측 실행(speculative) 모드에서 다양한 SQL 후보를 얻기 위한 llm
+candidate_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+
+# 동시에 생성할 SQL 후보 수 (1이면 기존처럼 후보 하나만 생성하여 실행)
+# 실행 시 config={"configurable": {"sql_candidates": N}} 으로 바꿀 수 있다
+SQL_CANDIDATES = int(os.getenv("SQL_CANDIDATES", "1"))
+
+# 복합 질문을 하위 질문으로 나누어 병렬로 조회할지 여부와 최대 하위 질문 수
+# 켜면 모든 질문에 계획 LLM 호출이 한 번 추가되므로 기본값은 꺼짐
+# 실행 시 config={"configurable": {"query_fanout": True}} 로 켤 수 있다
+QUERY_FANOUT = os.getenv("QUERY_FANOUT", "0") == "1"
+MAX_SUB_QUERIES = int(os.getenv("MAX_SUB_QUERIES", "8"))
+
 # DB 파일 경로 설정하기
 DB_PATH = os.path.join(folder_path, 'sales.db')
 
 
 ### 3. LangGraph 상태 정의 
+
+def merge_sub_results(left: List[Dict], right: List[Dict]) -> List[Dict]:
+    """병렬 분기의 결과를 누적하는 리듀서 (빈 리스트가 들어오면 새 질문으로 보고 초기화)"""
+    if not right:
+        return []
+    return (left or []) + right
+
+class QueryPlan(BaseModel):
+    sub_queries: List[str] = Field(default_factory=list, description="독립적으로 조회할 수 있는 하위 질문 목록 (단순 질문이면 빈 리스트)")
+
+# 복합 질문을 하위 질문으로 나누는 계획용 llm (구조화된 출력)
+planner_llm = llm.with_structured_output(QueryPlan)
+
+class SubQueryState(BaseModel):
+    index: int = Field(description="하위 질문의 순서")
+    sub_query: str = Field(description="하위 질문")
+
 class AnalysisState(BaseModel):
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List[BaseMessage], windowed_add_messages]  # 최근 대화 창 + 이전 대화 요약
     original_query: str = Field(default="", description="사용자의 원본 질문")
     sql_query: str = Field(default="", description="생성된 SQL 쿼리")
-    sql_result: List[Dict] = Field(default_factory=list, description="SQL 실행 결과")
+    sql_candidates: List[str] = Field(default_factory=list, description="추측 실행 모드에서 생성된 SQL 후보 목록")
+    # 조회 결과 전체는 체크포인트마다 반복 저장되지 않도록 blob 저장소에 한 번만 저장하고 참조만 보관
+    sql_result_ref: str = Field(default="", description="SQL 실행 결과의 blob 저장소 참조")
+    sql_row_count: int = Field(default=0, description="SQL 실행 결과 행 수")
+    sub_queries: List[str] = Field(default_factory=list, description="복합 질문을 나눈 하위 질문 목록")
+    sub_results: Annotated[List[Dict], merge_sub_results] = Field(default_factory=list, description="하위 질문별 실행 결과")
 
 
 ### 4. 핵심 도구 함수 정의
@@ -63,19 +103,10 @@ def execute_sql_query(sql: str) -> List[Dict] | str:
     except sqlite3.Error as e:
         return f"SQL 실행 오류: {e}"
 
-
-### 5. LangGraph 노드(Node) 정의
-
-async def sql_generation_node(state: AnalysisState) -> Dict[str, Any]:
-    """사용자 질문을 바탕으로 SQL을 생성하는 노드"""
-    print("\n[Node: SQL Generation]")
-    user_query = state.messages[-1].content
-    db_schema = get_db_schema_info()
-
-    if not db_schema:
-        raise FileNotFoundError(f"데이터베이스 파일({DB_PATH})이 없습니다. create_database_openapi.py를 먼저 실행해주세요.")
-
-    prompt = f"""
+# SQL 생성용 프롬프트 정의 함수
+def build_sql_prompt(db_schema: str, user_query: str) -> str:
+    """사용자 질문과 DB 스키마로 SQL 생성용 프롬프트를 만듭니다."""
+    return f"""
     당신은 대한민국 서울시 상권분석 전문가이자 SQL 마스터입니다.
     아래 DB 스키마와 컬럼 의미를 참고하여, 사용자 질문에 가장 적합한 SQLite 쿼리를 생성해주세요.
 
@@ -102,29 +133,150 @@ async def sql_generation_node(state: AnalysisState) -> Dict[str, Any]:
 
     - 다른 설명 없이 오직 실행 가능한 SQLite 쿼리만 생성해주세요.
     """
-    response = await llm.ainvoke(prompt)
-    sql_query = response.content.strip().replace('`', '').replace('sql', '')
-    print(f"-> 생성된 SQL:\n{sql_query}")
-    return {"original_query": user_query, "sql_query": sql_query}
+
+def get_sql_candidate_count(config: RunnableConfig | None) -> int:
+    """실행 설정(configurable) 또는 환경 변수에서 SQL 후보 수를 읽어옵니다."""
+    configurable = (config or {}).get("configurable", {})
+    return max(int(configurable.get("sql_candidates", SQL_CANDIDATES)), 1)
+
+# SQL 생성 함수 정의
+async def generate_sql_candidates(user_query: str, candidate_count: int) -> List[str]:
+    """질문에 대한 SQL을 생성합니다. (추측 실행 모드에서는 여러 후보를 동시에 생성)"""
+    db_schema = get_db_schema_info()
+    if not db_schema:
+        raise FileNotFoundError(f"데이터베이스 파일({DB_PATH})이 없습니다. create_database_openapi.py를 먼저 실행해주세요.")
+
+    prompt = build_sql_prompt(db_schema, user_query)
+    if candidate_count == 1:
+        response = await llm.ainvoke(prompt)
+        return [response.content.strip().replace('`', '').replace('sql', '')]
+
+    # 기본 후보(temperature=0) 1개 + 다양성을 위한 추가 후보를 동시에 요청
+    responses = await asyncio.gather(
+        llm.ainvoke(prompt),
+        *(candidate_llm.ainvoke(prompt) for _ in range(candidate_count - 1)),
+    )
+    return dedupe_candidates(
+        [r.content.strip().replace('`', '').replace('sql', '') for r in responses]
+    )
+
+# SQL 실행 함수 정의
+async def run_sql_candidates(candidates: List[str]) -> Tuple[str, List[Dict]]:
+    """SQL 후보를 실행하고 (채택된 SQL, 조회 결과)를 반환합니다. (실패 시 sqlite3.Error 발생)"""
+    if len(candidates) > 1:
+        # 후보들을 EXPLAIN으로 검증하며 동시에 실행하고, 가장 먼저 결과를 낸 후보를 채택
+        return await race_sql_candidates(DB_PATH, candidates)
+    result = await asyncio.to_thread(execute_sql_query, candidates[0])
+    if isinstance(result, str):
+        raise sqlite3.Error(result)
+    return candidates[0], result
+
+
+### 5. LangGraph 노드(Node) 정의
+
+async def query_planning_node(state: AnalysisState, config: RunnableConfig) -> Dict[str, Any]:
+    """복합 질문을 서로 독립적인 하위 질문으로 나누는 계획 노드 (단순 질문이면 나누지 않음)"""
+    print("\n[Node: Query Planning]")
+    user_query = state.messages[-1].content
+    # 새 질문마다 이전 턴의 분기 결과를 초기화
+    reset = {"original_query": user_query, "sub_queries": [], "sub_results": [], "sql_candidates": []}
+
+    configurable = (config or {}).get("configurable", {})
+    if not configurable.get("query_fanout", QUERY_FANOUT):
+        return reset
+
+    prompt = f"""
+    당신은 서울시 상권 매출 데이터베이스(quarterly_sales)의 분석 계획 담당자입니다.
+    사용자 질문이 여러 상권, 업종, 분기 등을 비교하는 복합 질문이라면,
+    각각 하나의 SQL로 독립적으로 조회할 수 있는 하위 질문(최대 {MAX_SUB_QUERIES}개)으로 나누어 주세요.
+    하나의 간단한 SQL로 답할 수 있는 질문이라면 sub_queries를 빈 리스트로 반환하세요.
+
+    ### 사용자의 질문:
+    {user_query}
+    """
+    plan = await planner_llm.ainvoke(prompt)
+    sub_queries = [q for q in plan.sub_queries if q.strip()][:MAX_SUB_QUERIES]
+    if len(sub_queries) < 2:
+        print("-> 단일 질문으로 처리합니다.")
+        return reset
+    print(f"-> {len(sub_queries)}개의 하위 질문으로 분할:")
+    for i, q in enumerate(sub_queries, 1):
+        print(f"   {i}. {q}")
+    return {**reset, "sub_queries": sub_queries}
+
+def route_after_planning(state: AnalysisState) -> str | List[Send]:
+    """하위 질문이 있으면 병렬 분기(Send)로, 없으면 기존 단일 SQL 흐름으로 보냅니다."""
+    if len(state.sub_queries) < 2:
+        return "generate_sql"
+    return [Send("run_sub_query", SubQueryState(index=i, sub_query=q)) for i, q in enumerate(state.sub_queries)]
+
+async def sub_query_node(state: SubQueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """하위 질문 하나의 SQL 생성과 실행을 담당하는 병렬 분기 노드"""
+    print(f"\n[Node: Sub Query {state.index + 1}] {state.sub_query}")
+    outcome = {"index": state.index, "sub_query": state.sub_query, "sql_query": "", "rows_ref": "", "row_count": 0, "error": ""}
+    try:
+        candidates = await generate_sql_candidates(state.sub_query, get_sql_candidate_count(config))
+        outcome["sql_query"], rows = await run_sql_candidates(candidates)
+        outcome["rows_ref"], outcome["row_count"] = await asyncio.to_thread(put_json, rows), len(rows)
+        print(f"-> [Sub Query {state.index + 1}] 실행 결과: {len(rows)}개 행 조회")
+    except Exception as e:
+        # SQL 실행 오류뿐 아니라 LLM 호출 오류(요청 한도 초과 등)도
+        # 한 분기의 실패가 다른 분기의 결과까지 버리지 않도록 오류를 기록만 한다
+        outcome["error"] = str(e)
+        print(f"-> [Sub Query {state.index + 1}] 실패: {e}")
+    return {"sub_results": [outcome]}
+
+async def merge_results_node(state: AnalysisState) -> Dict[str, Any]:
+    """병렬 분기의 결과를 하위 질문 순서대로 합쳐 보고서 작성용 결과로 만드는 노드"""
+    print("\n[Node: Merge Results]")
+    outcomes = sorted(state.sub_results, key=lambda o: o["index"])
+    if all(o["error"] for o in outcomes):
+        raise sqlite3.Error("; ".join(f"[{o['sub_query']}] {o['error']}" for o in outcomes))
+
+    merged_rows, sql_parts = [], []
+    for o in outcomes:
+        # 각 행에 어떤 하위 질문의 결과인지 표시하여 보고서에서 비교할 수 있도록 한다
+        merged_rows.extend({"sub_query": o["sub_query"], **row} for row in get_json(o["rows_ref"], []))
+        status = f"실패: {o['error']}" if o["error"] else f"{o['row_count']}개 행"
+        sql_parts.append(f"-- [{o['index'] + 1}] {o['sub_query']} ({status})\n{o['sql_query']}")
+    print(f"-> {len(outcomes)}개 분기, 총 {len(merged_rows)}개 행 병합")
+    return {
+        "sql_query": "\n\n".join(sql_parts),
+        "sql_result_ref": await asyncio.to_thread(put_json, merged_rows),
+        "sql_row_count": len(merged_rows),
+    }
+
+async def sql_generation_node(state: AnalysisState, config: RunnableConfig) -> Dict[str, Any]:
+    """사용자 질문을 바탕으로 SQL을 생성하는 노드 (추측 실행 모드에서는 여러 후보를 동시에 생성)"""
+    print("\n[Node: SQL Generation]")
+    user_query = state.messages[-1].content
+    candidate_count = get_sql_candidate_count(config)
+    candidates = await generate_sql_candidates(user_query, candidate_count)
+
+    if candidate_count == 1:
+        print(f"-> 생성된 SQL:\n{candidates[0]}")
+        return {"original_query": user_query, "sql_query": candidates[0], "sql_candidates": []}
+    print(f"-> 생성된 SQL 후보: {len(candidates)}개 (요청 {candidate_count}개)")
+    return {"original_query": user_query, "sql_query": candidates[0], "sql_candidates": candidates}
 
 async def sql_execution_node(state: AnalysisState) -> Dict[str, Any]:
     """생성된 SQL을 실행하는 노드"""
     print("\n[Node: SQL Execution]")
-    sql_query = state.sql_query
-    result = await asyncio.to_thread(execute_sql_query, sql_query)
-    
-    if isinstance(result, str):
-        raise sqlite3.Error(result)
+    candidates = state.sql_candidates if len(state.sql_candidates) > 1 else [state.sql_query]
+    sql_query, result = await run_sql_candidates(candidates)
+    if len(candidates) > 1:
+        print(f"-> 채택된 SQL:\n{sql_query}")
         
     print(f"-> 실행 결과: {len(result)}개 행 조회")
-    return {"sql_result": result}
+    return {"sql_query": sql_query, "sql_result_ref": await asyncio.to_thread(put_json, result), "sql_row_count": len(result)}
 
 async def report_generation_node(state: AnalysisState) -> Dict[str, Any]:
     """최종 보고서를 생성하고 상태를 업데이트하는 노드"""
     print("\n[Node: Report Generation]")
     original_query = state.original_query
     sql_query = state.sql_query
-    sql_result = state.sql_result
+    # 보고서 작성 시점에만 blob 저장소에서 조회 결과를 읽어온다
+    sql_result = get_json(state.sql_result_ref, []) if state.sql_row_count else []
 
     if not sql_result:
         report = "분석 결과, 해당 조건에 맞는 데이터가 없습니다."
@@ -137,13 +289,18 @@ async def report_generation_node(state: AnalysisState) -> Dict[str, Any]:
         ### 원본 사용자 질문:
         {original_query}
 
-        ### 데이터베이스 조회 결과 (JSON 형식):
-        {json.dumps(sql_result, indent=2, ensure_ascii=False)}
+        ### 데이터베이스 조회 결과 (총 {len(sql_result)}개 행, 요약 통계 및 핵심 행):
+        {compact_results(sql_result)}
 
         ### 최종 분석 보고서 (마크다운 형식):
         """
-        response = await llm.ainvoke(prompt)
-        report = response.content
+        # 보고서를 토큰 단위로 스트리밍하면서 custom 스트림으로 전달
+        parts = []
+        async for chunk in llm.astream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                emit_report_delta(chunk.content)
+        report = "".join(parts)
 
     final_content = f"### 분석 보고서\n{report}\n\n---\n\n### 실행된 SQL 쿼리\n```sql\n{sql_query}\n```"
     return {"messages": [AIMessage(content=final_content)]}
@@ -151,6 +308,27 @@ async def report_generation_node(state: AnalysisState) -> Dict[str, Any]:
 
 ### 6. 그래프 구성 및 콘솔 실행 로직 정의
 
+def build_graph() -> StateGraph:
+    """분석 에이전트 그래프를 구성합니다. (컴파일은 호출하는 쪽에서 체크포인터와 함께 수행)"""
+    graph_builder = StateGraph(AnalysisState)
+    graph_builder.add_node("plan_query", query_planning_node)
+    graph_builder.add_node("generate_sql", sql_generation_node)
+    graph_builder.add_node("execute_sql", sql_execution_node)
+    graph_builder.add_node("run_sub_query", sub_query_node)
+    graph_builder.add_node("merge_results", merge_results_node)
+    graph_builder.add_node("generate_report", report_generation_node)
+    graph_builder.set_entry_point("plan_query")
+
+    # 단순 질문: plan_query -> generate_sql -> execute_sql -> generate_report
+    # 복합 질문: plan_query -> run_sub_query (하위 질문 수만큼 병렬) -> merge_results -> generate_report
+    graph_builder.add_conditional_edges("plan_query", route_after_planning, ["generate_sql", "run_sub_query"])
+    graph_builder.add_edge("run_sub_query", "merge_results")
+    graph_builder.add_edge("merge_results", "generate_report")
+    graph_builder.add_edge("generate_sql", "execute_sql")
+    graph_builder.add_edge("execute_sql", "generate_report")
+    graph_builder.add_edge("generate_report", END)
+    return graph_builder
+
 async def main():
     """
     비동기 메인 함수: LangGraph를 설정하고,
@@ -161,17 +339,10 @@ async def main():
     db_file = os.path.join(folder_path, "agent_checkpoint.sqlite")
     
     # 2. 'async with' 구문을 사용하여 Checkpointer를 안전하게 초기화합니다.
-    async with AsyncSqliteSaver.from_conn_string(db_file) as memory:
+    async with open_checkpointer(db_file) as memory:
         
         # 그래프 구성
-        graph_builder = StateGraph(AnalysisState)
-        graph_builder.add_node("generate_sql", sql_generation_node)
-        graph_builder.add_node("execute_sql", sql_execution_node)
-        graph_builder.add_node("generate_report", report_generation_node)
-        graph_builder.set_entry_point("generate_sql")
-        graph_builder.add_edge("generate_sql", "execute_sql")
-        graph_builder.add_edge("execute_sql", "generate_report")
-        graph_builder.add_edge("generate_report", END)
+        graph_builder = build_graph()
 
         # 파일 기반 Checkpointer를 사용하여 그래프를 컴파일합니다.
         agent_executor = graph_builder.compile(checkpointer=memory)
@@ -188,7 +359,7 @@ async def main():
         while True:
             try:
                 # 사용자 입력 받기
-                user_input = input("\n사용자: ")
+                user_input = await asyncio.to_thread(input, "\n사용자: ")
                 if user_input.lower() in ["exit", "종료"]:
                     print("AI 에이전트: 프로그램을 종료합니다.")
                     break
@@ -197,17 +368,16 @@ async def main():
                 
                 print("AI 에이전트: (분석 중...)")
 
-                # LangGraph 에이전트 실행
-                final_state = await agent_executor.ainvoke(
+                # LangGraph 에이전트 실행 (보고서는 생성되는 대로 실시간 출력)
+                final_state, streamed_text = await astream_with_live_output(
+                    agent_executor,
                     {"messages": [HumanMessage(content=user_input)]}, 
                     config=config
                 )
                 
                 # 최종 결과 출력
                 final_answer = final_state['messages'][-1].content
-                print("\n" + "="*25 + " 최종 결과 " + "="*25)
-                print(final_answer)
-                print("="*62)
+                print_final_answer(final_answer, streamed_text)
 
             except KeyboardInterrupt:
                 print("\nAI 에이전트: 프로그램을 종료합니다.")
@@ -1,12 +1,19 @@
 ### 1. 필요한 모듈 / 함수 임포트
 import os
 import sqlite3
-import json
-from typing import Dict, Any
+import asyncio
+import pathlib
+import queue
+import threading
+from typing import List, Dict, Any
 from pydantic import BaseModel, Field
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from result_compaction import compact_results
+from report_streaming import stream_report
+import report_cache
+from mcp_serving import run_server, build_http_app
 
 
 ### 2. 환경 설정
@@ -27,8 +34,17 @@ llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 # DB 파일 경로 설정하기
 DB_PATH = os.path.join(folder_path, 'sales.db')
 
+# 동시 조회에 사용할 DB 연결 수 / 배치 도구의 최대 동시 LLM 호출 수
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+# 모든 연결이 사용 중일 때 연결 반환을 기다리는 최대 시간(초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
 
-### 3. DB 스키마 정보 생성 함수 정의
+# 새 분기 데이터 적재 후 미리 보고서를 만들어 둘 자주 묻는 질문 수
+WARM_UP_TOP_K = int(os.getenv("WARM_UP_TOP_K", "20"))
+
+
+### 3. DB 스키마 정보 생성 / SQL 실행 함수 정의
 
 def get_db_schema_info() -> str | None:
     """데이터베이스의 스키마 정보를 텍스트로 반환합니다."""
@@ -40,27 +56,85 @@ def get_db_schema_info() -> str | None:
         result = cursor.fetchone()
         return result[0] if result else None
 
+# 읽기 전용 SQLite 연결 풀 정의
+class SQLiteConnectionPool:
+    """
+    여러 스레드에서 동시에 조회 쿼리를 실행할 수 있도록 읽기 전용 연결을 재사용하는 연결 풀.
+    - 연결은 처음 필요할 때 생성되며, 최대 pool_size개까지 만들어집니다.
+    - 모든 연결이 사용 중이면 timeout초까지 기다린 뒤 sqlite3.OperationalError를 발생시킵니다.
+    """
+    def __init__(self, db_path: str, pool_size: int, timeout: float = DB_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: queue.Queue = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
 
-### 4. 분석 전문가 도구 함수 정의
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    uri = f"{pathlib.Path(self.db_path).as_uri()}?mode=ro"
+                    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                except sqlite3.Error:
+                    self._created -= 1
+                    raise
+                conn.row_factory = sqlite3.Row
+                return conn
+        # 모든 연결이 사용 중이면 반환될 때까지 대기 (스레드가 영원히 멈추지 않도록 제한 시간 적용)
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"DB 연결 풀 고갈: {self.timeout}초 동안 사용 가능한 연결이 없습니다. (pool_size={self.pool_size})"
+            ) from None
 
-class AnalysisInput(BaseModel):
-    query: str = Field(description="상권 분석을 위한 사용자의 자연어 질문")
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """사용할 수 없게 된 연결을 닫고, 새 연결을 만들 수 있도록 생성 수를 줄입니다."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
 
-@mcp_server.tool(
-    name="analyze_commercial_district",
-    description="사용자의 자연어 질문을 SQL로 변환하고 데이터베이스를 조회하여, 그 결과를 바탕으로 전문적인 분석 보고서를 생성합니다."
-)
-def analyze_commercial_district(input_data: AnalysisInput) -> Dict[str, Any]:
-    """사용자 질문을 분석하여 보고서를 작성하는 전문가 도구"""
-    print(f"--- [DataAnalysisExpert] 분석 요청 접수: '{input_data.query}' ---")
-    
-    # 1. DB 스키마 정보 생성
-    db_schema = get_db_schema_info()
-    if not db_schema:
-        return {"error": f"분석을 위한 데이터베이스 파일({DB_PATH})이 없습니다. 담당자가 먼저 DB를 생성해야 합니다."}
+    def execute(self, sql: str) -> List[Dict]:
+        """SQL 쿼리를 실행하고 결과 행 목록을 반환합니다. (실패 시 sqlite3.Error 발생)"""
+        conn = self._acquire()
+        reusable = True
+        try:
+            cursor = conn.execute(sql)
+            return [dict(row) for row in cursor.fetchall()]
+        except (sqlite3.InterfaceError, sqlite3.ProgrammingError):
+            # 닫혔거나 손상된 연결은 풀에 되돌리지 않음
+            reusable = False
+            raise
+        finally:
+            # 오류가 나도 연결은 항상 반환(또는 폐기)하여 풀이 고갈되지 않도록 함
+            if reusable:
+                self._idle.put(conn)
+            else:
+                self._discard(conn)
 
-    # 2. LLM을 이용한 SQL 쿼리 생성용 프롬프트 정의 
-    sql_prompt = f"""
+db_pool = SQLiteConnectionPool(DB_PATH, pool_size=DB_POOL_SIZE)
+
+# SQL 쿼리 실행 함수 정의
+def execute_sql_query(sql: str) -> List[Dict]:
+    """연결 풀을 사용하여 SQL 쿼리를 실행합니다. (실패 시 sqlite3.Error 발생)"""
+    return db_pool.execute(sql)
+
+
+### 4. 프롬프트 생성 함수 정의
+
+def build_sql_prompt(db_schema: str, query: str) -> str:
+    """LLM을 이용한 SQL 쿼리 생성용 프롬프트를 반환합니다."""
+    return f"""
     당신은 대한민국 서울시 상권분석 전문가이자 SQL 마스터입니다.
     아래 DB 스키마와 컬럼 의미를 참고하여, 사용자 질문에 가장 적합한 SQLite 쿼리를 생성해주세요.
 
@@ -83,40 +157,84 @@ def analyze_commercial_district(input_data: AnalysisInput) -> Dict[str, Any]:
     - 예를 들어, 사용자가 '점심 시간'을 언급하면 `sales_time_11_14` 컬럼을 사용해야 합니다.
 
     ### 사용자의 질문:
-    {input_data.query}
+    {query}
 
     - 다른 설명 없이 오직 실행 가능한 SQLite 쿼리만 생성해주세요.
     """
+
+def clean_sql(text: str) -> str:
+    """LLM 응답에서 코드 블록 표시를 제거하여 실행 가능한 SQL만 남깁니다."""
+    return text.strip().replace('`', '').replace("sql", "")
+
+def build_report_prompt(query: str, results: List[Dict]) -> str:
+    """LLM을 이용한 최종 보고서 생성용 프롬프트를 반환합니다."""
+    return f"""
+    당신은 전문 데이터 분석가이자 보고서 작성가입니다.
+    다음은 사용자의 원본 질문과 데이터베이스에서 추출한 분석 결과입니다.
+    이 데이터를 단순히 나열하지 말고, 사용자가 질문한 의도에 맞춰 의미 있는 인사이트를 도출하고, 비교 및 분석하여 상세한 최종 보고서를 마크다운 형식으로 작성해주세요.
+
+    ### 원본 사용자 질문:
+    {query}
+
+    ### 데이터베이스 조회 결과 (총 {len(results)}개 행, 요약 통계 및 핵심 행):
+    {compact_results(results)}
+
+    ### 최종 분석 보고서 (마크다운 형식):
+    """
+
+NO_DATA_REPORT = "분석 결과, 해당 조건에 맞는 데이터가 없습니다. 다른 조건으로 질문해 보시는 것은 어떨까요?"
+
+
+### 5. 분석 전문가 도구 함수 정의
+
+class AnalysisInput(BaseModel):
+    query: str = Field(description="상권 분석을 위한 사용자의 자연어 질문")
+
+@mcp_server.tool(
+    name="analyze_commercial_district",
+    description="사용자의 자연어 질문을 SQL로 변환하고 데이터베이스를 조회하여, 그 결과를 바탕으로 전문적인 분석 보고서를 생성합니다."
+)
+async def analyze_commercial_district(input_data: AnalysisInput, ctx: Context) -> Dict[str, Any]:
+    """
+    사용자 질문을 분석하여 보고서를 작성하는 전문가 도구
+    - LLM 호출은 비동기(ainvoke/astream)로, DB 작업은 스레드 풀에서 실행하여
+      하나의 서버 프로세스가 여러 요청을 동시에 처리할 수 있습니다.
+    - 보고서는 생성되는 즉시 MCP 진행 알림(progress notification)으로 클라이언트에 스트리밍됩니다.
+    """
+    print(f"--- [DataAnalysisExpert] 분석 요청 접수: '{input_data.query}' ---")
+    await asyncio.to_thread(report_cache.log_request, input_data.query)
+
+    # 0. 현재 데이터 버전으로 미리 계산해 둔 보고서가 있으면 즉시 반환
+    data_version = await asyncio.to_thread(report_cache.get_data_version, DB_PATH)
+    cached = data_version and await asyncio.to_thread(report_cache.get_cached_report, input_data.query, data_version)
+    if cached:
+        print("--- [DataAnalysisExpert] 미리 계산된 보고서 반환 ---")
+        await ctx.report_progress(progress=len(cached["report"]), total=len(cached["report"]), message=cached["report"])
+        return {"result": cached}
+    
+    # 1. DB 스키마 정보 생성
+    db_schema = await asyncio.to_thread(get_db_schema_info)
+    if not db_schema:
+        return {"error": f"분석을 위한 데이터베이스 파일({DB_PATH})이 없습니다. 담당자가 먼저 DB를 생성해야 합니다."}
+
+    # 2. LLM을 이용한 SQL 쿼리 생성용 프롬프트 정의 
+    sql_prompt = build_sql_prompt(db_schema, input_data.query)
+    sql_query = ""
     try:
         # 3. SQL 쿼리 생성
-        sql_query = llm.invoke(sql_prompt).content.strip().replace('`', '').replace("sql", "")
+        response = await llm.ainvoke(sql_prompt)
+        sql_query = clean_sql(response.content)
         print(f"생성된 SQL 쿼리:\n{sql_query}")
 
-        # 4. 생성된 SQL 쿼리 실행
-        with sqlite3.connect(DB_PATH) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-            results = [dict(row) for row in cursor.fetchall()]
+        # 4. 생성된 SQL 쿼리 실행 (이벤트 루프를 막지 않도록 스레드 풀에서 실행)
+        results = await asyncio.to_thread(execute_sql_query, sql_query)
         
         if not results:
-            report = "분석 결과, 해당 조건에 맞는 데이터가 없습니다. 다른 조건으로 질문해 보시는 것은 어떨까요?"
+            report = NO_DATA_REPORT
         else:
-            # 5. LLM을 이용한 최종 보고서 생성
-            report_prompt = f"""
-            당신은 전문 데이터 분석가이자 보고서 작성가입니다.
-            다음은 사용자의 원본 질문과 데이터베이스에서 추출한 분석 결과입니다.
-            이 데이터를 단순히 나열하지 말고, 사용자가 질문한 의도에 맞춰 의미 있는 인사이트를 도출하고, 비교 및 분석하여 상세한 최종 보고서를 마크다운 형식으로 작성해주세요.
-
-            ### 원본 사용자 질문:
-            {input_data.query}
-
-            ### 데이터베이스 조회 결과 (JSON 형식):
-            {json.dumps(results, indent=2, ensure_ascii=False)}
-
-            ### 최종 분석 보고서 (마크다운 형식):
-            """
-            report = llm.invoke(report_prompt).content
+            # 5. LLM을 이용한 최종 보고서 생성 (토큰 스트리밍)
+            report_prompt = build_report_prompt(input_data.query, results)
+            report = await stream_report(llm, report_prompt, ctx)
         
         print("--- [DataAnalysisExpert] 보고서 생성 완료 ---")
         return {"result": {"report": report, "executed_sql": sql_query}}
@@ -131,7 +249,124 @@ def analyze_commercial_district(input_data: AnalysisInput) -> Dict[str, Any]:
         return {"error": error_message}
 
 
-### 5. 서버 실행 
+async def run_batch_analysis(queries: List[str]) -> Dict[str, Any]:
+    """
+    여러 질문을 한 번에 분석하여 질문별 결과 또는 오류를 반환합니다.
+    - SQL 생성과 보고서 생성은 llm.abatch로, SQL 실행은 연결 풀 위에서 동시에 처리합니다.
+    """
+    print(f"--- [DataAnalysisExpert] 배치 분석 요청 접수: {len(queries)}건 ---")
+    if not queries:
+        return {"result": {"items": [], "succeeded": 0, "failed": 0}}
+
+    db_schema = await asyncio.to_thread(get_db_schema_info)
+    if not db_schema:
+        return {"error": f"분석을 위한 데이터베이스 파일({DB_PATH})이 없습니다. 담당자가 먼저 DB를 생성해야 합니다."}
+
+    llm_config = {"max_concurrency": BATCH_MAX_CONCURRENCY}
+    items: List[Dict[str, Any]] = [{"query": q} for q in queries]
+
+    # 1. 모든 질문의 SQL을 배치 LLM 호출로 생성
+    sql_responses = await llm.abatch(
+        [build_sql_prompt(db_schema, q) for q in queries], config=llm_config, return_exceptions=True
+    )
+    for item, response in zip(items, sql_responses):
+        if isinstance(response, Exception):
+            item["error"] = f"SQL 생성 중 LLM 호출 오류 발생: {response}"
+        else:
+            item["executed_sql"] = clean_sql(response.content)
+
+    # 2. 생성된 SQL을 연결 풀 위에서 동시에 실행
+    pending = [item for item in items if "error" not in item]
+    query_results = await asyncio.gather(
+        *(asyncio.to_thread(execute_sql_query, item["executed_sql"]) for item in pending),
+        return_exceptions=True,
+    )
+    for item, rows in zip(pending, query_results):
+        if isinstance(rows, sqlite3.Error):
+            item["error"] = f"SQL 실행 중 오류가 발생했습니다: {rows}\n실패한 쿼리: {item['executed_sql']}"
+        elif isinstance(rows, Exception):
+            item["error"] = f"분석 프로세스 중 예측하지 못한 오류 발생: {rows}"
+        else:
+            item["rows"] = rows
+
+    # 3. 조회 결과가 있는 질문의 보고서를 배치 LLM 호출로 병렬 생성
+    with_data = [item for item in items if item.get("rows")]
+    report_responses = await llm.abatch(
+        [build_report_prompt(item["query"], item["rows"]) for item in with_data], config=llm_config, return_exceptions=True
+    )
+    for item, response in zip(with_data, report_responses):
+        if isinstance(response, Exception):
+            item["error"] = f"보고서 생성 중 LLM 호출 오류 발생: {response}"
+        else:
+            item["report"] = response.content
+
+    # 4. 질문별 결과 / 오류를 프로토콜에 맞춰 정리
+    output = []
+    for item in items:
+        if "error" in item:
+            output.append({"query": item["query"], "error": item["error"], "executed_sql": item.get("executed_sql", "")})
+        else:
+            report = item.get("report", NO_DATA_REPORT)
+            output.append({"query": item["query"], "result": {"report": report, "executed_sql": item["executed_sql"]}})
+    failed = sum("error" in item for item in output)
+    print(f"--- [DataAnalysisExpert] 배치 분석 완료: 성공 {len(output) - failed}건, 실패 {failed}건 ---")
+    return {"result": {"items": output, "succeeded": len(output) - failed, "failed": failed}}
+
+
+class BatchAnalysisInput(BaseModel):
+    queries: List[str] = Field(description="한 번에 분석할 자연어 질문 목록")
+
+@mcp_server.tool(
+    name="analyze_commercial_district_batch",
+    description="여러 개의 상권 분석 질문을 한 번에 받아 SQL 생성, DB 조회, 보고서 작성을 병렬로 처리하고 질문별 결과와 오류를 반환합니다."
+)
+async def analyze_commercial_district_batch(input_data: BatchAnalysisInput) -> Dict[str, Any]:
+    """
+    여러 질문을 한 번의 도구 호출로 분석하는 배치 전문가 도구
+    - 한 질문의 실패가 다른 질문에 영향을 주지 않도록 질문별로 결과 또는 오류를 반환합니다.
+    """
+    return await run_batch_analysis(input_data.queries)
+
+
+### 6. 보고서 워밍업 함수 정의
+
+async def warm_up_report_cache(top_k: int = WARM_UP_TOP_K) -> int:
+    """
+    요청 기록에서 가장 자주 묻는 질문 top_k개의 보고서를 현재 데이터 버전으로 미리 계산해 저장합니다.
+    새 분기 데이터를 적재한 직후(update_database_for_period 완료 후) 실행합니다.
+    - 반환값: 새로 저장한 보고서 수
+    """
+    data_version = await asyncio.to_thread(report_cache.get_data_version, DB_PATH)
+    if not data_version:
+        return 0
+    questions = await asyncio.to_thread(report_cache.top_questions, top_k)
+    missing = await asyncio.to_thread(
+        lambda: [q for q in questions if not report_cache.get_cached_report(q, data_version)]
+    )
+    print(f"--- [DataAnalysisExpert] 보고서 워밍업: 데이터 버전 {data_version}, 대상 {len(missing)}/{len(questions)}건 ---")
+    if not missing:
+        return 0
+
+    response = await run_batch_analysis(missing)
+    stored = 0
+    for item in response.get("result", {}).get("items", []):
+        if "result" in item:
+            await asyncio.to_thread(
+                report_cache.store_report, item["query"], data_version,
+                item["result"]["executed_sql"], item["result"]["report"],
+            )
+            stored += 1
+    print(f"--- [DataAnalysisExpert] 보고서 워밍업 완료: {stored}건 저장 ---")
+    return stored
+
+
+### 7. 서버 실행 
+
+def create_http_app():
+    """HTTP 워커 풀 모드에서 uvicorn 워커 프로세스마다 호출되는 앱 팩토리"""
+    return build_http_app(mcp_server, stateless=True)
+
 if __name__ == "__main__":
     print("MCP [DataAnalysisExpert] 서버가 시작되었습니다.")
-    mcp_server.run()
\ No newline at end of file
+    # 기본은 stdio, MCP_TRANSPORT=http 이면 여러 클라이언트가 공유하는 HTTP 서버로 실행
+    run_server(mcp_server, app_factory="data_analysis_server:create_http_app", app_dir=folder_path)
\ No newline at end of file
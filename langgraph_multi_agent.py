@@ -3,7 +3,6 @@ import asyncio
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import Annotated, List, Dict, Any
-import operator
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
 from langchain_community.document_loaders import TextLoader
@@ -14,7 +13,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from checkpointing import open_checkpointer
+from conversation_memory import windowed_add_messages
 
 
 ### 2. 환경 설정(명시적 경로 설정): API 키 불러오기 
@@ -66,7 +66,7 @@ rag_chain = (
 
 ### 4. 그래프 상태(Graph State) 정의
 class AgentState(BaseModel):
-    messages: Annotated[List[BaseMessage], operator.add] = Field(default_factory=list)
+    messages: Annotated[List[BaseMessage], windowed_add_messages] = Field(default_factory=list)  # 최근 대화 창 + 이전 대화 요약
     context: str | None = None
     next: str = ""
 
@@ -127,7 +127,7 @@ async def main():
     db_file = "multi_agent.sqlite"
 
     # 2. 'async with' 구문을 사용하여 데이터베이스 연결을 안전하게 관리합니다.
-    async with AsyncSqliteSaver.from_conn_string(db_file) as memory:
+    async with open_checkpointer(db_file) as memory:
 
         # 그래프 컴파일 + 체크포인터 설정(그래프와 연결)
         app = workflow.compile(checkpointer=memory)
@@ -139,7 +139,7 @@ async def main():
 
         # 그래프 실행
         while True:
-            user_input = input("사용자: ")
+            user_input = await asyncio.to_thread(input, "사용자: ")
             if user_input.lower() in ["exit", "quit"]:
                 break
 
@@ -1,11 +1,13 @@
 ### 1. 환경 설정
 
 # 필요한 함수 임포트
+import asyncio
 from typing import Dict, Any, List
 from pydantic import BaseModel, Field
 from fastmcp import FastMCP
 from dotenv import load_dotenv
-from langchain_tavily import TavilySearch
+from search_cache import CachedSearch
+from research_digest import RESEARCH_MODE, RESEARCH_COMPRESSION, expand_queries, dedupe_results, compress_research
 
 # Tavily API Key 가져오기(명시적 경로 설정)
 file_path = '.env'
@@ -17,38 +19,75 @@ load_dotenv(file_path)
 # 서버 설정
 mcp_server = FastMCP(name="MarketResearchExpert")
 
-# 도구 설정
-tavily_tool = TavilySearch(max_results=3)
+# 도구 설정: 검색 결과 캐시를 적용한 Tavily 검색
+# (SEARCH_CACHE_MODE=replay: 저장된 결과만 사용, SEARCH_BACKEND=local: 네트워크 없이 동작하는 대체 백엔드)
+research_search = CachedSearch(max_results=3)
 
 
-### 3. 전문가 도구 함수 정의
+### 3. 검색 결과 수집 함수 정의
+
+async def gather_search_results(topic: str, mode: str = RESEARCH_MODE) -> List[Dict[str, Any]]:
+    """
+    조사 방식(mode, 기본값 RESEARCH_MODE)에 따라 검색 결과 목록을 수집합니다.
+    - single: 주제 하나로 검색
+    - multi: 세부 질의 여러 개를 동시에 검색하고, 같은 URL / 내용이 거의 같은 문서를 제거하여 병합
+      (일부 질의가 실패해도 나머지 결과로 진행)
+    """
+    if mode != "multi":
+        tool_output = await research_search.search(topic)
+        return tool_output.get("results", [])
+
+    queries = expand_queries(topic)
+    outputs = await asyncio.gather(*(research_search.search(query) for query in queries), return_exceptions=True)
+    failures = [output for output in outputs if isinstance(output, BaseException)]
+    if len(failures) == len(outputs):
+        raise failures[0]
+    results = [res for output in outputs if not isinstance(output, BaseException) for res in output.get("results", [])]
+    kept, stats = dedupe_results(results)
+    print(f"--- [MarketResearchExpert] 세부 질의 {len(queries)}개(실패 {len(failures)}개): 검색 결과 {stats['input']}건 -> "
+          f"{stats['kept']}건 (중복 URL {stats['duplicate_url']}건, 유사 문서 {stats['near_duplicate']}건 제거) ---")
+    return kept
+
+
+### 4. 전문가 도구 함수 정의
 
 # 입력 스키마 정의 
 class ResearchInput(BaseModel):
     topic: str = Field(description="조사할 시장 또는 주제")
+    mode: str | None = Field(default=None, description="조사 방식: single(주제만 검색) / multi(세부 질의 병렬 검색), 생략 시 서버 설정")
 
 # 전문가 도구 함수 정의
 @mcp_server.tool(
     name="conduct_market_research",
     description="주어진 주제에 대해 웹 검색을 수행하고, 분석에 필요한 핵심 정보를 요약하여 반환합니다."
 )
-def conduct_market_research(input_data: ResearchInput) -> Dict[str, Any]:
+async def conduct_market_research(input_data: ResearchInput) -> Dict[str, Any]:
     """
     Tavily 검색을 사용하여 시장 정보를 수집하고, 가공하여 반환하는 전문가 도구.
+    검색은 비동기(ainvoke)로 실행되어 하나의 서버 프로세스가 여러 요청을 동시에 처리할 수 있습니다.
+    같은(정규화 기준) 주제의 최근 검색 결과는 캐시에서 바로 반환합니다.
+    RESEARCH_MODE=multi면 세부 질의 여러 개를 동시에 검색하여 중복을 제거한 결과를 사용합니다.
+    RESEARCH_COMPRESSION=on이면 주제와 관련도가 높은 문단만 토큰 예산 안에서 골라 요약에 담습니다.
     """
     print(f"--- [MarketResearchExpert] 주제 '{input_data.topic}'에 대한 조사를 시작합니다. ---")
     try:
-        # 웹 검색 실행
-        tool_output = tavily_tool.invoke(input_data.topic)        
+        # 웹 검색 실행 (캐시 적용)
+        search_results = await gather_search_results(input_data.topic, input_data.mode or RESEARCH_MODE)
 
         # ======================= 수집된 데이터 전처리 =======================
-        # 1. 딕셔너리(tool_output)에서 필요한 정보만 추출하여 가공한다
-        processed_content = []
-        for res in tool_output.get("results", []):
-            processed_content.append(f"출처: {res.get('url')}\n내용: {res.get('content')}")
-        
-        # 2. 읽기 쉽게 가공된 텍스트를 하나의 문자열로 병합한다
-        summary_text = "\n\n---\n\n".join(processed_content)
+        if RESEARCH_COMPRESSION:
+            # 1-2. 검색 결과를 문단으로 나누고, 주제와 관련도(BM25)가 높은 문단만 토큰 예산 안에서 출처와 함께 병합한다
+            summary_text, stats = compress_research(input_data.topic, search_results)
+            print(f"--- [MarketResearchExpert] 조사 요약 압축: 문단 {stats['passages']}개 중 {stats['kept']}개, "
+                  f"{stats['input_tokens']} -> {stats['output_tokens']} 토큰 ---")
+        else:
+            # 1. 검색 결과에서 필요한 정보만 추출하여 가공한다
+            processed_content = []
+            for res in search_results:
+                processed_content.append(f"출처: {res.get('url')}\n내용: {res.get('content')}")
+
+            # 2. 읽기 쉽게 가공된 텍스트를 하나의 문자열로 병합한다
+            summary_text = "\n\n---\n\n".join(processed_content)
         # =============================================================
 
         # 3. 깨끗하게 가공된 '문자열'을 research_summary에 저장
@@ -64,7 +103,7 @@ def conduct_market_research(input_data: ResearchInput) -> Dict[str, Any]:
         return {"error": error_message}
 
 
-### 4. 서버 실행 
+### 5. 서버 실행 
 if __name__ == "__main__":
     print("MCP [MarketResearchExpert] 서버가 시작되었습니다.")
     mcp_server.run()
\ No newline at end of file
@@ -0,0 +1,240 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import json
+import time
+import asyncio
+import statistics
+from collections import deque
+from typing import Any, Dict
+from langchain_core.tools import ToolException
+
+
+### 2. 환경 설정
+
+def _parse_tool_seconds(value: str) -> Dict[str, float]:
+    """"도구이름=초,도구이름=초" 형식의 환경 변수를 딕셔너리로 변환합니다."""
+    items = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {name.strip(): float(seconds) for name, seconds in items}
+
+# 도구 호출 마감 시간(초): 도구별 기본값 / 목록에 없는 도구의 기본값
+# (MCP_TOOL_DEADLINES="conduct_market_research=45,write_final_report=240" 형식으로 변경 가능)
+TOOL_DEADLINES = {
+    "analyze_commercial_district": 120.0,
+    "conduct_market_research": 60.0,
+    "write_final_report": 180.0,
+    "draft_report_outline": 60.0,
+    "draft_report_section": 120.0,
+    "reconcile_report": 180.0,
+    **_parse_tool_seconds(os.getenv("MCP_TOOL_DEADLINES", "")),
+}
+MCP_TOOL_DEADLINE = float(os.getenv("MCP_TOOL_DEADLINE", "180"))
+
+# 헤지(중복) 요청을 허용할 도구
+# - 같은 입력으로 두 번 실행해도 안전하고, 진행 알림(보고서 조각)을 스트리밍하지 않는 도구만 지정
+MCP_HEDGE_TOOLS = [name.strip() for name in os.getenv("MCP_HEDGE_TOOLS", "conduct_market_research").split(",") if name.strip()]
+
+# 첫 요청이 최근 지연 시간의 몇 퍼센타일을 넘으면 헤지 요청을 보낼지 / 기준을 계산하는 데 필요한 최소 표본 수
+MCP_HEDGE_PERCENTILE = int(os.getenv("MCP_HEDGE_PERCENTILE", "95"))
+MCP_HEDGE_MIN_SAMPLES = int(os.getenv("MCP_HEDGE_MIN_SAMPLES", "20"))
+
+# 서버별 회로 차단기: 연속 실패 횟수가 이 값에 도달하면 차단 / 차단 후 다시 시험 호출을 허용하기까지의 시간(초)
+MCP_BREAKER_FAILURES = int(os.getenv("MCP_BREAKER_FAILURES", "5"))
+MCP_BREAKER_RESET_SECONDS = float(os.getenv("MCP_BREAKER_RESET_SECONDS", "30"))
+
+# 도구별 지연 시간 통계에 사용하는 최근 호출 수
+MCP_LATENCY_WINDOW = int(os.getenv("MCP_LATENCY_WINDOW", "512"))
+
+
+### 3. 도구별 지연 시간 통계 클래스 정의
+
+class ToolStats:
+    """도구 하나의 호출 수 / 오류 수 / 헤지 수와 최근 성공 호출의 지연 시간을 기록합니다."""
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=MCP_LATENCY_WINDOW)
+        self.calls = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def percentile(self, p: int) -> float | None:
+        if len(self.latencies) < 2:
+            return None
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    def hedge_delay(self) -> float | None:
+        """헤지 요청을 보내기까지 기다릴 시간. (표본이 부족하면 None -> 헤지하지 않음)"""
+        if len(self.latencies) < MCP_HEDGE_MIN_SAMPLES:
+            return None
+        return self.percentile(MCP_HEDGE_PERCENTILE)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 1)
+        return {
+            "calls": self.calls, "in_flight": self.in_flight, "errors": self.errors, "timeouts": self.timeouts,
+            "rejected": self.rejected, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+            "p50_ms": ms(self.percentile(50)), "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)), "max_ms": ms(max(self.latencies, default=None)),
+        }
+
+
+### 4. 회로 차단기 클래스 정의
+
+class CircuitBreaker:
+    """
+    서버 하나의 회로 차단기.
+    - closed: 정상. 연속 실패가 MCP_BREAKER_FAILURES회에 도달하면 open
+    - open: 호출을 보내지 않고 즉시 실패. MCP_BREAKER_RESET_SECONDS가 지나면 half_open
+    - half_open: 시험 호출 1건만 허용. 성공하면 closed, 실패하면 다시 open
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + MCP_BREAKER_RESET_SECONDS - time.monotonic())
+
+    def allow(self) -> bool:
+        """호출을 보내도 되면 True를 반환합니다. (half_open에서는 시험 호출 1건만 허용)"""
+        if self.state == "open" and self.retry_after() == 0:
+            self.state = "half_open"
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            print(f"[Breaker] 서버 '{self.name}'이(가) 복구되었습니다.")
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """시험 호출이 결과 없이 취소되었을 때 다음 호출이 시험 호출을 보낼 수 있도록 합니다."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= MCP_BREAKER_FAILURES:
+            if self.state != "open":
+                print(f"[Breaker] 서버 '{self.name}' 차단 (연속 실패 {self.failures}회, {MCP_BREAKER_RESET_SECONDS:.0f}초 후 재시도)")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+# 프로세스 전체(모든 세션)가 공유하는 도구별 통계 / 서버별 회로 차단기
+_tool_stats: Dict[str, ToolStats] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+### 5. 도구 호출 함수 정의
+
+def _error_response(tool_name: str, error_type: str, message: str, **extra: Any) -> str:
+    """도구 응답과 같은 {"error": ...} 프로토콜의 JSON 문자열을 만듭니다."""
+    return json.dumps({"error": message, "error_type": error_type, "tool": tool_name, **extra}, ensure_ascii=False)
+
+async def _hedged_ainvoke(tool: Any, tool_input: Dict[str, Any], stats: ToolStats, hedge_delay: float | None) -> str:
+    """
+    도구를 호출하고, hedge_delay가 지나도 응답이 없으면 같은 요청을 한 번 더 보내 먼저 끝난 결과를 사용합니다.
+    (남은 요청은 취소, 두 요청이 모두 실패하면 마지막 예외를 다시 발생)
+    """
+    primary = asyncio.create_task(tool.ainvoke(tool_input))
+    pending = {primary}
+    try:
+        if hedge_delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                stats.hedges += 1
+                pending.add(asyncio.create_task(tool.ainvoke(tool_input)))
+        last_error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        stats.hedge_wins += 1
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def guarded_ainvoke(tool: Any, tool_input: Dict[str, Any]) -> str:
+    """
+    전문가 도구를 마감 시간 / 헤지 요청 / 회로 차단기를 적용하여 호출합니다.
+    - 성공하면 도구의 응답(JSON 문자열)을 그대로 반환합니다.
+    - 마감 시간 초과, 연결 오류, 서버 차단 시에는 예외 대신
+      {"error": ..., "error_type": "timeout" | "unavailable" | "circuit_open", ...} JSON 문자열을 반환하므로
+      노드는 기존의 {"result"} / {"error"} 처리 로직을 그대로 사용할 수 있습니다.
+    - 도구가 반환한 {"error": ...}(예: SQL 실행 실패)와 도구 실행 오류(ToolException, 서버가 isError로 응답)는
+      서버 정상 동작으로 보고 차단기의 실패로 세지 않습니다. (도구 실행 오류는 error_type "tool_error")
+    """
+    tool_name = tool.name
+    server_name = (getattr(tool, "metadata", None) or {}).get("mcp_server", tool_name)
+    stats = _tool_stats.setdefault(tool_name, ToolStats())
+    breaker = _breakers.setdefault(server_name, CircuitBreaker(server_name))
+    stats.calls += 1
+
+    if not breaker.allow():
+        stats.rejected += 1
+        retry_after = round(breaker.retry_after(), 1)
+        return _error_response(
+            tool_name, "circuit_open",
+            f"'{server_name}' 서버가 일시적으로 응답하지 않아 요청을 보내지 않았습니다. {retry_after}초 후 다시 시도해주세요.",
+            retry_after=retry_after,
+        )
+
+    deadline = TOOL_DEADLINES.get(tool_name, MCP_TOOL_DEADLINE)
+    hedge_delay = stats.hedge_delay() if tool_name in MCP_HEDGE_TOOLS else None
+    stats.in_flight += 1
+    start = time.perf_counter()
+    try:
+        response_str = await asyncio.wait_for(_hedged_ainvoke(tool, tool_input, stats, hedge_delay), timeout=deadline)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        breaker.record_failure()
+        print(f"[Resilience] '{tool_name}' 호출이 마감 시간({deadline:g}초)을 넘겼습니다.")
+        return _error_response(tool_name, "timeout", f"'{tool_name}' 도구가 {deadline:g}초 안에 응답하지 않았습니다.")
+    except asyncio.CancelledError:
+        breaker.release_probe()
+        raise
+    except ToolException as e:
+        # 서버는 정상적으로 응답했으므로(잘못된 입력 등) 차단기에는 성공으로 반영
+        stats.errors += 1
+        breaker.record_success()
+        print(f"[Resilience] '{tool_name}' 도구 실행 오류: {e}")
+        return _error_response(tool_name, "tool_error", f"'{tool_name}' 도구 실행 중 오류가 발생했습니다: {e}")
+    except Exception as e:
+        stats.errors += 1
+        breaker.record_failure()
+        print(f"[Resilience] '{tool_name}' 호출 실패: {type(e).__name__}: {e}")
+        return _error_response(tool_name, "unavailable", f"'{tool_name}' 도구 호출 중 오류가 발생했습니다: {e}")
+    finally:
+        stats.in_flight -= 1
+    stats.latencies.append(time.perf_counter() - start)
+    breaker.record_success()
+    return response_str
+
+
+### 6. 지표 조회 함수 정의
+
+def tool_metrics() -> Dict[str, Any]:
+    """도구별 지연 시간 분포(p50/p90/p99/max)와 호출 / 오류 / 헤지 수, 서버별 차단기 상태를 반환합니다."""
+    return {
+        "tools": {name: stats.snapshot() for name, stats in sorted(_tool_stats.items())},
+        "breakers": {
+            name: {"state": breaker.state, "failures": breaker.failures, "retry_after": round(breaker.retry_after(), 1)}
+            for name, breaker in sorted(_breakers.items())
+        },
+    }
@@ -0,0 +1,80 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import asyncio
+from typing import Any
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+
+### 2. 환경 설정
+
+# 서버 실행 방식: "stdio"(클라이언트가 직접 실행) 또는 "http"(여러 클라이언트가 공유하는 상시 실행 서버)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+MCP_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+
+# HTTP 모드에서 사용할 워커 프로세스 수 (2 이상이면 stateless HTTP로 실행)
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+
+# 워커 하나가 동시에 실행하는 도구 호출 수 / 실행을 기다릴 수 있는 최대 요청 수
+MCP_MAX_CONCURRENCY = int(os.getenv("MCP_MAX_CONCURRENCY", "16"))
+MCP_MAX_QUEUE = int(os.getenv("MCP_MAX_QUEUE", "64"))
+
+
+### 3. 동시 실행 / 대기열 제한 미들웨어 정의
+
+class ConcurrencyLimitMiddleware(Middleware):
+    """
+    도구 호출의 동시 실행 수를 제한하고, 대기 중인 요청이 한도를 넘으면 즉시 거절하는 미들웨어.
+    과부하 상황에서 요청이 무한정 쌓이는 대신 클라이언트가 빠르게 실패를 받도록 합니다.
+    """
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Any) -> Any:
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise ToolError(
+                f"서버가 혼잡합니다. (실행 중 {self.max_concurrency}건, 대기 {self._waiting}건) 잠시 후 다시 시도해주세요."
+            )
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            return await call_next(context)
+        finally:
+            self._semaphore.release()
+
+
+### 4. 서버 실행 함수 정의
+
+def build_http_app(mcp_server: FastMCP, stateless: bool = False) -> Any:
+    """동시 실행 제한을 적용한 streamable-HTTP ASGI 앱을 생성합니다."""
+    mcp_server.add_middleware(ConcurrencyLimitMiddleware(MCP_MAX_CONCURRENCY, MCP_MAX_QUEUE))
+    return mcp_server.http_app(stateless_http=stateless)
+
+def run_server(mcp_server: FastMCP, app_factory: str | None = None, app_dir: str | None = None) -> None:
+    """
+    MCP_TRANSPORT 설정에 따라 서버를 실행합니다.
+    - stdio: 기존과 같이 클라이언트 프로세스가 서버를 직접 실행
+    - http: 하나의 상시 실행 서버(또는 워커 풀)가 여러 클라이언트의 요청을 함께 처리
+    - app_factory: 워커를 2개 이상 띄울 때 각 워커에서 호출할 "모듈:함수" 형식의 앱 팩토리
+    """
+    if MCP_TRANSPORT == "stdio":
+        mcp_server.run()
+        return
+
+    import uvicorn
+    print(f"MCP [{mcp_server.name}] HTTP 서버: http://{MCP_HOST}:{MCP_PORT}/mcp "
+          f"(워커 {MCP_WORKERS}개, 워커당 동시 실행 {MCP_MAX_CONCURRENCY}건, 대기열 {MCP_MAX_QUEUE}건)")
+    if MCP_WORKERS > 1 and app_factory:
+        # 워커 간에는 세션을 공유할 수 없으므로 요청마다 독립적인 stateless HTTP로 실행
+        uvicorn.run(app_factory, factory=True, host=MCP_HOST, port=MCP_PORT,
+                    workers=MCP_WORKERS, app_dir=app_dir)
+    else:
+        uvicorn.run(build_http_app(mcp_server), host=MCP_HOST, port=MCP_PORT)
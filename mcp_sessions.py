@@ -0,0 +1,398 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import asyncio
+import hashlib
+import threading
+import importlib.util
+from typing import Any, AsyncIterator, Dict, List
+from contextlib import asynccontextmanager
+import anyio
+from fastmcp import Client, FastMCP
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+from langchain_core.tools import StructuredTool, ToolException
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from report_streaming import make_session_progress_callback
+from mcp_zygote import stdio_server_connection
+
+
+### 2. 환경 설정
+
+# 서버마다 실행할 복제본(프로세스) 수
+MCP_REPLICAS = int(os.getenv("MCP_REPLICAS", "1"))
+
+# 복제본 하나가 세션 연결을 마칠 때까지 기다리는 최대 시간(초)
+MCP_REPLICA_START_TIMEOUT = float(os.getenv("MCP_REPLICA_START_TIMEOUT", "60"))
+
+# 복제본 오류로 호출이 실패했을 때 다른(또는 재시작한) 복제본으로 다시 시도하는 횟수
+MCP_CALL_RETRIES = int(os.getenv("MCP_CALL_RETRIES", "1"))
+
+# 서버를 도구가 처음 호출될 때 실행할지 여부 (도구 목록은 캐시에서 읽음)
+MCP_LAZY_START = os.getenv("MCP_LAZY_START", "on").lower() not in ("0", "off", "false")
+
+# 전문가 서버를 클라이언트 프로세스 안에 불러와 메모리 전송으로 연결할지 여부 (단일 호스트 배포용)
+MCP_IN_PROCESS = os.getenv("MCP_IN_PROCESS", "off").lower() in ("1", "on", "true")
+
+# 서버별 도구 목록(이름, 설명, 입력 스키마) 캐시 파일 경로
+MCP_TOOL_CACHE = os.getenv(
+    "MCP_TOOL_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_tool_cache.json")
+)
+
+
+### 3. 도구 호출 결과 변환 함수 정의
+
+def result_to_text(result: Any) -> str:
+    """MCP 도구 호출 결과(CallToolResult)의 텍스트 내용을 하나의 문자열로 합칩니다."""
+    text = "\n".join(block.text for block in result.content if getattr(block, "type", "") == "text")
+    if result.isError:
+        raise ToolException(text or "도구 실행 중 오류가 발생했습니다.")
+    return text
+
+
+### 4. 도구 목록 캐시 함수 정의
+
+def server_fingerprint(connection: Dict[str, Any]) -> str | None:
+    """
+    stdio 서버 연결 설정의 서버 소스 파일(.py) 내용으로 해시를 만듭니다.
+    서버 코드가 바뀌면 해시가 달라져 캐시가 무효화됩니다. (HTTP 서버 등 파일이 없으면 None)
+    """
+    if connection.get("transport") == "in_process":
+        source_files = [connection["path"]]
+    elif connection.get("transport") == "stdio":
+        source_files = [arg for arg in connection.get("args", []) if arg.endswith(".py") and os.path.exists(arg)]
+    else:
+        return None
+    digest = hashlib.sha256()
+    if not source_files:
+        return None
+    for path in source_files:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def load_tool_cache() -> Dict[str, Any]:
+    try:
+        with open(MCP_TOOL_CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_tool_cache(cache: Dict[str, Any]) -> None:
+    # 다른 클라이언트가 동시에 읽더라도 깨진 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{MCP_TOOL_CACHE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MCP_TOOL_CACHE)
+
+
+### 5. 서버 연결 설정 / 프로세스 내 서버 함수 정의
+
+def expert_server_connection(script_path: str) -> Dict[str, Any]:
+    """
+    전문가 서버 파일의 연결 설정을 만듭니다.
+    - MCP_IN_PROCESS=on: 서버 모듈의 FastMCP 객체(mcp_server)를 이 프로세스에 불러와 메모리 전송으로 연결
+    - 그 외: stdio 서버 프로세스로 실행 (MCP_ZYGOTE=on이면 zygote에서 fork)
+    """
+    if MCP_IN_PROCESS:
+        return {"transport": "in_process", "path": script_path, "server": "mcp_server"}
+    return stdio_server_connection(script_path)
+
+_in_process_servers: Dict[str, FastMCP] = {}
+_in_process_lock = threading.Lock()
+
+def load_in_process_server(connection: Dict[str, Any]) -> FastMCP:
+    """
+    서버 파일을 모듈로 불러와 FastMCP 서버 객체를 반환합니다. (파일마다 한 번만 불러옴)
+    서버 파일의 __main__ 블록은 실행되지 않으므로 서버 프로세스가 따로 실행되지 않습니다.
+    """
+    path = os.path.abspath(connection["path"])
+    with _in_process_lock:
+        if path not in _in_process_servers:
+            module_name = os.path.splitext(os.path.basename(path))[0]
+            module = sys.modules.get(module_name)
+            if module is None or os.path.abspath(getattr(module, "__file__", "") or "") != path:
+                spec = importlib.util.spec_from_file_location(module_name, path)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                spec.loader.exec_module(module)
+            _in_process_servers[path] = getattr(module, connection.get("server", "mcp_server"))
+    return _in_process_servers[path]
+
+@asynccontextmanager
+async def in_process_session(mcp_server: FastMCP) -> AsyncIterator[Any]:
+    """
+    FastMCP 서버 객체에 메모리 전송으로 연결한 MCP 세션을 엽니다.
+    stdio와 같은 MCP 프로토콜(초기화, 도구 목록/호출, 진행 알림)을 사용하지만,
+    메시지는 프로세스 실행이나 파이프 / JSON 인코딩 없이 메모리 스트림으로 전달됩니다.
+    """
+    async with Client(mcp_server) as client:
+        yield client.session
+
+
+### 6. 서버 복제본 클래스 정의
+
+class ServerReplica:
+    """
+    서버 프로세스(세션) 1개.
+    stdio 세션은 연 작업(task)에서 닫아야 하므로, 세션은 복제본 전용 작업 안에서 열고 닫습니다.
+    in_process 연결이면 프로세스 대신 같은 서버 객체에 메모리 세션을 하나 엽니다.
+    """
+    def __init__(self, client: MultiServerMCPClient, server_name: str, index: int, connection: Dict[str, Any]):
+        self.client = client
+        self.server_name = server_name
+        self.connection = connection
+        self.index = index
+        self.session: Any = None
+        self.outstanding = 0
+        self.generation = 0
+        self.restarts = 0
+        self._task: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: BaseException | None = None
+        self._restart_lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"{self.server_name}#{self.index}"
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        try:
+            if self.connection.get("transport") == "in_process":
+                # 서버 모듈 임포트(LLM / DB 초기화)가 이벤트 루프를 막지 않도록 스레드에서 실행
+                mcp_server = await asyncio.to_thread(load_in_process_server, self.connection)
+                session_context = in_process_session(mcp_server)
+            else:
+                session_context = self.client.session(self.server_name)
+            async with session_context as session:
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def start(self) -> None:
+        self._ready.clear()
+        self._stop.clear()
+        self._error = None
+        self.generation += 1
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=MCP_REPLICA_START_TIMEOUT)
+        except asyncio.TimeoutError:
+            # 세션을 여는 중인 작업이 남아 있으면 이후 stop()이 끝나지 않으므로 취소
+            await self.stop()
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is None:
+            return
+        if self.session is None or not self._ready.is_set():
+            # 아직 세션을 열고 있는 작업은 _stop을 기다리지 않으므로 취소
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def restart(self, failed_generation: int) -> None:
+        """failed_generation 세대의 세션이 실패했을 때 복제본을 재시작합니다. (이미 재시작했다면 건너뜀)"""
+        async with self._restart_lock:
+            if self.generation != failed_generation and self.healthy:
+                return
+            print(f"[MCP] 복제본 {self.name}을(를) 재시작합니다.")
+            await self.stop()
+            self.restarts += 1
+            await self.start()
+
+
+### 7. 서버 복제본 풀 / 세션 관리 클래스 정의
+
+class MCPSessionManager:
+    """
+    MCP 서버마다 복제본(세션)을 replicas개 열어 두고 모든 도구 호출에 재사용합니다.
+    - get_tools()로 만든 도구는 호출할 때마다 서버를 새로 실행하지 않고 열려 있는 세션으로 요청을 보냅니다.
+    - 하나의 세션에서 여러 호출을 동시에 보낼 수 있으며(요청 ID로 응답을 구분),
+      복제본이 여러 개면 처리 중인 호출이 가장 적은 복제본으로 보냅니다.
+    - 연결이 끊기거나 프로세스가 종료된 복제본은 재시작하고, 실패한 호출은 다른 복제본으로 다시 시도합니다.
+      (정상 세션에서 발생한 도구 / 프로토콜 오류는 재시작이나 재시도 없이 그대로 전달)
+    - lazy=True면 도구 목록은 캐시(서버 소스 파일 해시 기준)에서 바로 만들고,
+      서버는 그 서버의 도구가 처음 호출될 때 실행합니다. (캐시가 없거나 오래되면 서버를 실행해 목록을 갱신)
+    - 연결 설정의 transport가 "in_process"면 서버 파일의 FastMCP 객체를 이 프로세스에 불러와
+      메모리 전송으로 연결합니다. (expert_server_connection() 참고)
+    - async with 블록이 끝나면 모든 세션과 서버 프로세스를 종료합니다.
+
+    사용 예:
+        async with MCPSessionManager({"DataAnalysisExpert": connection}, replicas=4) as mcp_sessions:
+            tools = await mcp_sessions.get_tools()
+    """
+    def __init__(self, connections: Dict[str, Dict[str, Any]], replicas: int | Dict[str, int] = MCP_REPLICAS,
+                 lazy: bool = MCP_LAZY_START):
+        self.connections = connections
+        self.lazy = lazy
+        self._start_locks = {server_name: asyncio.Lock() for server_name in connections}
+        self._client = MultiServerMCPClient(
+            {name: conn for name, conn in connections.items() if conn.get("transport") != "in_process"}
+        )
+        self.replicas: Dict[str, List[ServerReplica]] = {
+            server_name: [
+                ServerReplica(self._client, server_name, i, connections[server_name])
+                for i in range(max(1, replicas.get(server_name, 1) if isinstance(replicas, dict) else replicas))
+            ]
+            for server_name in connections
+        }
+
+    def _all_replicas(self) -> List[ServerReplica]:
+        return [replica for replicas in self.replicas.values() for replica in replicas]
+
+    async def __aenter__(self) -> "MCPSessionManager":
+        if not self.lazy:
+            try:
+                await asyncio.gather(*(self._ensure_started(server_name) for server_name in self.connections))
+            except BaseException:
+                await self.__aexit__(None, None, None)
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.gather(*(r.stop() for r in self._all_replicas()), return_exceptions=True)
+
+    async def _ensure_started(self, server_name: str) -> None:
+        """서버의 복제본이 아직 실행되지 않았다면 모두 동시에 실행합니다."""
+        async with self._start_locks[server_name]:
+            replicas = self.replicas[server_name]
+            if any(r.generation for r in replicas):
+                return
+            print(f"[MCP] 서버 '{server_name}'을(를) 시작합니다. (복제본 {len(replicas)}개)")
+            results = await asyncio.gather(*(r.start() for r in replicas), return_exceptions=True)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                await asyncio.gather(*(r.stop() for r in replicas), return_exceptions=True)
+                for r in replicas:
+                    r.generation = 0
+                raise errors[0]
+
+    def _pick_replica(self, server_name: str) -> ServerReplica:
+        """정상 복제본 중 처리 중인 호출이 가장 적은 복제본을 고릅니다."""
+        replicas = self.replicas[server_name]
+        candidates = [r for r in replicas if r.healthy] or replicas
+        return min(candidates, key=lambda r: r.outstanding)
+
+    @staticmethod
+    def is_transport_error(error: BaseException) -> bool:
+        """
+        세션 연결이 끊기거나 서버 프로세스가 종료되어 발생한 예외인지 판단합니다.
+        정상 세션에서 돌아온 도구 / 프로토콜 오류(McpError 등)는 False입니다.
+        """
+        if isinstance(error, BaseExceptionGroup):
+            return any(MCPSessionManager.is_transport_error(e) for e in error.exceptions)
+        if isinstance(error, McpError):
+            return error.error.code == CONNECTION_CLOSED
+        return isinstance(error, (
+            anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+            ConnectionError, EOFError, ProcessLookupError,
+        ))
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """열려 있는 세션으로 도구를 호출합니다. 서버의 진행 알림(보고서 조각)은 그래프 custom 스트림으로 전달됩니다."""
+        on_progress = make_session_progress_callback()
+        await self._ensure_started(server_name)
+        last_error: Exception | None = None
+        for _ in range(MCP_CALL_RETRIES + 1):
+            replica = self._pick_replica(server_name)
+            generation = replica.generation
+            replica.outstanding += 1
+            try:
+                if not replica.healthy:
+                    try:
+                        await replica.restart(generation)
+                    except Exception as restart_error:
+                        # 재시작 실패는 프로세스 문제이므로 다른 복제본으로 다시 시도
+                        last_error = restart_error
+                        print(f"[MCP] 복제본 {replica.name} 재시작 실패: {restart_error}")
+                        continue
+                    generation = replica.generation
+                result = await replica.session.call_tool(tool_name, arguments, progress_callback=on_progress)
+            except Exception as e:
+                # 연결 / 프로세스 문제일 때만 복제본을 재시작하고 다시 시도
+                # (그 외의 오류는 세션이 정상이므로, 재시작하면 같은 복제본의 다른 호출까지 끊기고
+                #  보고서 작성처럼 오래 걸리고 멱등이 아닌 도구가 다시 실행되므로 그대로 전달)
+                if not self.is_transport_error(e):
+                    raise
+                last_error = e
+                print(f"[MCP] 복제본 {replica.name}에서 '{tool_name}' 호출 실패: {type(e).__name__}: {e}")
+                try:
+                    await replica.restart(generation)
+                except Exception as restart_error:
+                    print(f"[MCP] 복제본 {replica.name} 재시작 실패: {restart_error}")
+                continue
+            finally:
+                replica.outstanding -= 1
+            return result_to_text(result)
+        raise last_error
+
+    async def list_tool_manifests(self, server_name: str) -> List[Dict[str, Any]]:
+        """
+        서버의 도구 목록(이름, 설명, 입력 스키마)을 반환합니다.
+        lazy 모드에서는 서버 소스 파일 해시가 같은 캐시가 있으면 서버를 실행하지 않고 캐시를 사용합니다.
+        """
+        fingerprint = server_fingerprint(self.connections[server_name])
+        cache = load_tool_cache() if self.lazy and fingerprint else {}
+        cached = cache.get(server_name)
+        if cached and cached.get("fingerprint") == fingerprint:
+            return cached["tools"]
+
+        await self._ensure_started(server_name)
+        listed = await self._pick_replica(server_name).session.list_tools()
+        manifests = [
+            {"name": tool.name, "description": tool.description or "", "input_schema": tool.inputSchema}
+            for tool in listed.tools
+        ]
+        if self.lazy and fingerprint:
+            cache = load_tool_cache()
+            cache[server_name] = {"fingerprint": fingerprint, "tools": manifests}
+            save_tool_cache(cache)
+        return manifests
+
+    async def get_tools(self) -> List[StructuredTool]:
+        """모든 서버의 도구 목록을 LangChain 도구로 변환합니다. (복제본들은 같은 도구를 제공)"""
+        manifest_lists = await asyncio.gather(*(self.list_tool_manifests(name) for name in self.replicas))
+        return [
+            self._to_langchain_tool(server_name, manifest)
+            for server_name, manifests in zip(self.replicas, manifest_lists)
+            for manifest in manifests
+        ]
+
+    def stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        """복제본별 상태(정상 여부, 처리 중인 호출 수, 재시작 횟수)를 반환합니다."""
+        return {
+            server_name: [
+                {"replica": r.index, "healthy": r.healthy, "outstanding": r.outstanding, "restarts": r.restarts}
+                for r in replicas
+            ]
+            for server_name, replicas in self.replicas.items()
+        }
+
+    def _to_langchain_tool(self, server_name: str, manifest: Dict[str, Any]) -> StructuredTool:
+        async def call(**arguments: Any) -> str:
+            return await self.call_tool(server_name, manifest["name"], arguments)
+
+        return StructuredTool(
+            name=manifest["name"],
+            description=manifest["description"],
+            args_schema=manifest["input_schema"],
+            coroutine=call,
+            metadata={"mcp_server": server_name},
+        )
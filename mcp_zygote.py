@@ -0,0 +1,206 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import sys
+import json
+import time
+import runpy
+import signal
+import socket
+import importlib
+import selectors
+import traceback
+from typing import Any, Dict, List
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# zygote 사용 여부 / zygote가 요청을 받는 유닉스 소켓 경로
+MCP_ZYGOTE = os.getenv("MCP_ZYGOTE", "off").lower() in ("1", "on", "true")
+MCP_ZYGOTE_SOCKET = os.getenv("MCP_ZYGOTE_SOCKET", os.path.join(folder_path, ".mcp_zygote.sock"))
+
+# zygote가 미리 임포트해 둘 무거운 외부 패키지 (전문가 서버들이 공통으로 사용)
+# 프로젝트 모듈은 넣지 않습니다: 모듈 수준에서 읽는 환경 변수 설정이 zygote 실행 시점 값으로 고정되고,
+# 소스를 수정해도 zygote를 재시작할 때까지 반영되지 않기 때문입니다.
+# (프로젝트 모듈은 자식 프로세스가 클라이언트의 환경 변수를 적용한 뒤 임포트)
+ZYGOTE_PRELOAD = [
+    "pydantic", "dotenv", "fastmcp", "langchain_core.prompts", "langchain_openai", "langchain_tavily",
+    "numpy", "pandas", "tiktoken",
+]
+
+
+### 3. 클라이언트 측: 서버 연결 설정 함수 정의
+
+def stdio_server_connection(script_path: str) -> Dict[str, Any]:
+    """
+    MultiServerMCPClient / MCPSessionManager에 전달할 stdio 서버 연결 설정을 만듭니다.
+    MCP_ZYGOTE=on이면 서버를 직접 실행하는 대신 zygote에서 미리 임포트를 마친 자식 프로세스로 실행합니다.
+    """
+    if MCP_ZYGOTE and hasattr(socket, "send_fds"):
+        args = [os.path.abspath(__file__), "run", script_path]
+    else:
+        args = [script_path]
+    return {"command": sys.executable, "args": args, "transport": "stdio"}
+
+
+### 4. 실행기(shim) 함수 정의
+
+def run_via_zygote(script_path: str, args: List[str]) -> int:
+    """
+    zygote에 서버 실행을 요청하고, 자식 프로세스가 끝날 때까지 기다린 뒤 종료 코드를 반환합니다.
+    - 이 프로세스의 stdin/stdout/stderr를 그대로 자식에게 넘기므로 MCP 클라이언트는 차이를 알 수 없습니다.
+    - zygote가 실행 중이 아니면 서버를 직접 실행합니다.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(MCP_ZYGOTE_SOCKET)
+    except OSError:
+        sock.close()
+        os.execv(sys.executable, [sys.executable, script_path, *args])
+
+    request = {"script": os.path.abspath(script_path), "args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+    socket.send_fds(sock, [json.dumps(request).encode("utf-8")], [0, 1, 2])
+    replies = sock.makefile("r", encoding="utf-8")
+    child_pid = json.loads(replies.readline())["pid"]
+
+    # MCP 클라이언트가 실행기를 종료하면 자식 서버에도 같은 신호를 전달
+    def forward(signum, frame):
+        try:
+            os.kill(child_pid, signum)
+        except ProcessLookupError:
+            pass
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    line = replies.readline()
+    return json.loads(line)["exit_code"] if line else 1
+
+
+### 5. zygote 함수 정의
+
+def preload_modules() -> None:
+    """공용 외부 패키지를 미리 임포트합니다. (설치되지 않은 모듈은 건너뜀)"""
+    for module_name in ZYGOTE_PRELOAD:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+            print(f"[Zygote] {module_name} 임포트 완료 ({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            print(f"[Zygote] {module_name} 임포트 건너뜀: {e}")
+
+def _run_child(request: Dict[str, Any], fds: List[int]) -> None:
+    """fork된 자식 프로세스에서 서버 스크립트를 __main__으로 실행합니다. (반환하지 않음)"""
+    code = 0
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            if fd > 2:
+                os.close(fd)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.chdir(request["cwd"])
+        sys.argv = [request["script"], *request["args"]]
+        sys.path[0] = os.path.dirname(request["script"])
+        # 서버 폴더의 프로젝트 모듈이 zygote에 남아 있다면 버리고, 위 환경 변수와 최신 소스로 다시 임포트되도록 함
+        # (폴더 바로 아래의 모듈만 대상, 하위 폴더의 가상 환경 패키지 등은 유지)
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None)
+            if name != "__main__" and module_file and os.path.dirname(module_file) == sys.path[0]:
+                del sys.modules[name]
+        runpy.run_path(request["script"], run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+def serve_zygote() -> None:
+    """
+    공용 모듈을 임포트한 상태로 대기하다가, 실행 요청이 오면 fork하여 서버 스크립트를 실행합니다.
+    fork 안전성을 위해 스레드나 이벤트 루프 없이 단일 스레드로 동작합니다.
+    """
+    preload_modules()
+    # 종료 신호를 받으면 소켓 파일을 정리하고 종료
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if os.path.exists(MCP_ZYGOTE_SOCKET):
+        os.unlink(MCP_ZYGOTE_SOCKET)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(MCP_ZYGOTE_SOCKET)
+    listener.listen(64)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    children: Dict[int, socket.socket] = {}
+    print(f"[Zygote] 대기 중: {MCP_ZYGOTE_SOCKET} (pid {os.getpid()})", flush=True)
+
+    try:
+        while True:
+            for _ in selector.select(timeout=0.2):
+                conn, _ = listener.accept()
+                try:
+                    message, fds, _, _ = socket.recv_fds(conn, 1 << 20, 3)
+                    request = json.loads(message)
+                except (OSError, ValueError) as e:
+                    print(f"[Zygote] 잘못된 요청: {e}", flush=True)
+                    conn.close()
+                    continue
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    selector.close()
+                    listener.close()
+                    conn.close()
+                    _run_child(request, fds)
+                for fd in fds:
+                    os.close(fd)
+                conn.sendall((json.dumps({"pid": pid}) + "\n").encode("utf-8"))
+                children[pid] = conn
+                print(f"[Zygote] {os.path.basename(request['script'])} 실행 (pid {pid})", flush=True)
+
+            # 종료된 자식의 종료 코드를 실행기에 전달
+            while children:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                conn = children.pop(pid, None)
+                if conn is not None:
+                    try:
+                        conn.sendall((json.dumps({"exit_code": os.waitstatus_to_exitcode(status)}) + "\n").encode("utf-8"))
+                    except OSError:
+                        pass
+                    conn.close()
+    finally:
+        listener.close()
+        if os.path.exists(MCP_ZYGOTE_SOCKET):
+            os.unlink(MCP_ZYGOTE_SOCKET)
+
+
+### 6. 실행
+if __name__ == "__main__":
+    # 사용법:
+    #   python mcp_zygote.py serve                     -> zygote 실행 (MCP_ZYGOTE=on인 클라이언트보다 먼저 실행)
+    #   python mcp_zygote.py run <서버 파일> [인자 ...]  -> 클라이언트가 사용하는 실행기
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "serve":
+        try:
+            serve_zygote()
+        except KeyboardInterrupt:
+            print("\n[Zygote] 종료합니다.")
+    elif command == "run" and len(sys.argv) > 2:
+        sys.exit(run_via_zygote(sys.argv[2], sys.argv[3:]))
+    else:
+        sys.exit("사용법: python mcp_zygote.py serve | run <서버 파일> [인자 ...]")
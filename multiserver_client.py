@@ -5,16 +5,21 @@ import os
 import sys
 import json
 import asyncio
-from typing import Annotated, List, Dict, Any
+from typing import Annotated, AsyncIterator, List, Dict, Any
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from conversation_memory import windowed_add_messages
+from checkpointing import open_checkpointer
 from functools import partial
 import uuid
+from report_streaming import astream_with_live_output
+from mcp_sessions import MCPSessionManager, expert_server_connection
+from mcp_resilience import guarded_ainvoke
+from blob_store import put_text, get_text
+from research_digest import expand_queries
 
 # 실행 파일 폴더 경로 가져오기
 folder_path = os.path.dirname(os.path.abspath(__file__))
@@ -26,26 +31,31 @@ load_dotenv(env_file_path)
 # 파이썬 실행 환경 가져오기
 python_command = sys.executable
 
+# 작업 흐름: "serial"(시장 조사 완료 후 보고서 작성) 또는
+# "pipelined"(세부 조사 결과가 도착하는 대로 목차 / 섹션을 작성하고, 마지막에 정합성 검토로 보고서 완성)
+ORCHESTRATION_MODE = os.getenv("ORCHESTRATION_MODE", "serial").lower()
+
 
 ### 2. LangGraph 상태 정의 
 class OrchestratorState(BaseModel):
-    messages: Annotated[List[BaseMessage], add_messages]
-    research_summary: str | None = Field(default=None, description="시장 조사 결과를 저장하는 필드")
+    messages: Annotated[List[BaseMessage], windowed_add_messages]  # 최근 대화 창 + 이전 대화 요약
+    # 긴 시장 조사 결과는 체크포인트마다 반복 저장되지 않도록 blob 저장소에 저장하고 참조만 보관
+    research_summary_ref: str | None = Field(default=None, description="시장 조사 결과의 blob 저장소 참조")
     user_query: str | None = Field(default=None, description="사용자의 원본 질문을 저장하는 필드")
     next_node: str = Field(default="", description="다음에 실행할 노드를 지정")
 
 
 ### 3. 에이전트(노드 함수) 역할 정의
-async def supervisor_node(state: OrchestratorState) -> Dict[str, Any]:
+async def supervisor_node(state: OrchestratorState, orchestration: str = ORCHESTRATION_MODE) -> Dict[str, Any]:
     """전체 작업 흐름을 시작하고, 다음 단계를 결정하는 감독관 노드"""
     print("\n[Node: Supervisor] 감독관이 작업을 검토합니다.")
     # 새 작업 시작 시, 상태 초기화 및 원본 질문 저장
     if isinstance(state.messages[-1], HumanMessage):
         print("새로운 요청을 감지했습니다. 시장 조사 전문가를 호출합니다.")
         return {
-            "research_summary": None, 
+            "research_summary_ref": None, 
             "user_query": state.messages[-1].content,
-            "next_node": "call_market_research"
+            "next_node": "call_pipelined_report" if orchestration == "pipelined" else "call_market_research"
         }
     else:
         # 보고서 작성 완료 후, 최종 종료 결정
@@ -59,8 +69,8 @@ async def market_research_node(state: OrchestratorState, tool_map: Dict) -> Dict
     research_tool = tool_map["conduct_market_research"]
     tool_input = {"input_data": {"topic": state.user_query}}
     
-    # 도구 실행
-    response_str = await research_tool.ainvoke(tool_input)
+    # 도구 실행 (마감 시간 / 헤지 요청 / 회로 차단기 적용, 실패 시 {"error": ...} 응답)
+    response_str = await guarded_ainvoke(research_tool, tool_input)
 
     # 도구 실행의 결과 값(JSON 문자열) -> 파이썬 딕셔너리로 변환
     try:
@@ -78,7 +88,7 @@ async def market_research_node(state: OrchestratorState, tool_map: Dict) -> Dict
     if "result" in response_data:
         summary = response_data["result"]["research_summary"]
         print("시장 조사를 완료하고 요약 정보를 수신했습니다.")
-        return {"research_summary": summary, "next_node": "call_report_writing"}
+        return {"research_summary_ref": await asyncio.to_thread(put_text, summary), "next_node": "call_report_writing"}
     else:
         error_msg = response_data.get("error", "알 수 없는 오류")
         print(f"   - 시장 조사 중 오류 발생: {error_msg}")
@@ -92,12 +102,12 @@ async def report_writing_node(state: OrchestratorState, tool_map: Dict) -> Dict[
     tool_input = {
         "input_data": {
             "user_query": state.user_query,
-            "research_summary": state.research_summary
+            "research_summary": get_text(state.research_summary_ref)
         }
     }
 
-    # 도구 실행
-    response_str = await report_tool.ainvoke(tool_input)
+    # 도구 실행 (마감 시간 / 회로 차단기 적용, 실패 시 {"error": ...} 응답)
+    response_str = await guarded_ainvoke(report_tool, tool_input)
 
     # 도구 실행의 결과 값(JSON 문자열) -> 파이썬 딕셔너리로 변환
     try:
@@ -121,6 +131,98 @@ async def report_writing_node(state: OrchestratorState, tool_map: Dict) -> Dict[
         return {"messages": [AIMessage(content=f"보고서 작성 실패: {error_msg}")], "next_node": "end"}
 
 
+def _parse_response(response_str: str) -> Dict[str, Any]:
+    """도구 실행의 결과 값(JSON 문자열) -> 파이썬 딕셔너리 (JSON이 아니면 {"error": ...})"""
+    try:
+        return json.loads(response_str)
+    except json.JSONDecodeError:
+        return {"error": f"서버로부터 유효하지 않은 응답을 받았습니다: {response_str[:200]}"}
+
+async def pipelined_report_node(state: OrchestratorState, tool_map: Dict) -> Dict[str, Any]:
+    """
+    시장 조사와 보고서 작성을 겹쳐 실행하는 노드
+    1. 주제를 세부 질의로 나누어 시장 조사 전문가에게 동시에 요청
+    2. 첫 조사 결과가 도착하면 바로 보고서 목차 작성 시작
+    3. 조사 결과가 도착할 때마다(목차가 준비되면) 해당 섹션 작성 시작 - 나머지 조사와 동시에 진행
+    4. 모든 섹션이 끝나면 정합성 검토(핵심 요약 / 결론)로 최종 보고서 완성 (실시간 스트리밍)
+    """
+    print("[Node: Pipelined Report] 시장 조사와 보고서 작성을 동시에 진행합니다...")
+    user_query = state.user_query
+    focus_areas = expand_queries(user_query)
+
+    async def research(index: int, query: str) -> tuple[int, Dict[str, Any]]:
+        tool_input = {"input_data": {"topic": query, "mode": "single"}}
+        return index, _parse_response(await guarded_ainvoke(tool_map["conduct_market_research"], tool_input))
+
+    async def outline(first_notes: str) -> Dict[str, Any]:
+        tool_input = {"input_data": {"user_query": user_query, "research_notes": first_notes, "focus_areas": focus_areas}}
+        response_data = _parse_response(await guarded_ainvoke(tool_map["draft_report_outline"], tool_input))
+        if "result" in response_data:
+            return response_data["result"]
+        # 목차 생성에 실패하면 조사 관점을 그대로 목차로 사용
+        print(f"   - 목차 작성 실패, 조사 관점으로 대체: {response_data.get('error')}")
+        return {"title": f"{user_query} 분석 보고서", "sections": [{"heading": area, "focus": area} for area in focus_areas]}
+
+    async def draft(index: int, notes: str, outline_task: asyncio.Task) -> tuple[int, str]:
+        report_outline = await outline_task
+        section = report_outline["sections"][index]
+        tool_input = {"input_data": {
+            "user_query": user_query, "title": report_outline["title"],
+            "headings": [s["heading"] for s in report_outline["sections"]],
+            "heading": section["heading"], "focus": section["focus"], "research_notes": notes,
+        }}
+        response_data = _parse_response(await guarded_ainvoke(tool_map["draft_report_section"], tool_input))
+        if "result" in response_data:
+            print(f"   - 섹션 작성 완료: {section['heading']}")
+            return index, response_data["result"]["section_text"]
+        # 섹션 작성에 실패하면 조사 자료를 그대로 섹션 본문으로 사용
+        print(f"   - 섹션 작성 실패, 조사 자료로 대체: {response_data.get('error')}")
+        return index, f"## {section['heading']}\n\n{notes}"
+
+    # 1~3. 조사 결과가 도착하는 순서대로 목차 / 섹션 작성 시작
+    outline_task: asyncio.Task | None = None
+    draft_tasks: List[asyncio.Task] = []
+    research_notes: Dict[int, str] = {}
+    try:
+        for next_result in asyncio.as_completed([research(i, q) for i, q in enumerate(focus_areas)]):
+            index, response_data = await next_result
+            if "result" not in response_data:
+                print(f"   - 세부 조사 실패 ({focus_areas[index]}): {response_data.get('error', '알 수 없는 오류')}")
+                continue
+            notes = response_data["result"]["research_summary"]
+            research_notes[index] = notes
+            print(f"   - 세부 조사 도착 ({len(research_notes)}/{len(focus_areas)}): {focus_areas[index]}")
+            if outline_task is None:
+                outline_task = asyncio.create_task(outline(notes))
+            draft_tasks.append(asyncio.create_task(draft(index, notes, outline_task)))
+
+        if not research_notes:
+            return {"messages": [AIMessage(content="시장 조사 실패: 모든 세부 조사가 실패했습니다.")], "next_node": "end"}
+        report_outline = await outline_task
+        sections = [text for _, text in sorted(await asyncio.gather(*draft_tasks))]
+    finally:
+        for task in [outline_task, *draft_tasks]:
+            if task is not None:
+                task.cancel()
+
+    # 4. 정합성 검토 및 최종 보고서 완성
+    research_summary = "\n\n".join(research_notes[i] for i in sorted(research_notes))
+    tool_input = {"input_data": {"user_query": user_query, "title": report_outline["title"], "sections": sections}}
+    response_data = _parse_response(await guarded_ainvoke(tool_map["reconcile_report"], tool_input))
+    if "result" in response_data:
+        report = response_data["result"]["report_text"]
+        print("최종 보고서 작성을 완료했습니다.")
+    else:
+        # 정합성 검토에 실패하면 작성된 섹션을 순서대로 이어 붙여 반환
+        print(f"보고서 조립 중 오류 발생: {response_data.get('error')}")
+        report = f"# {report_outline['title']}\n\n" + "\n\n".join(sections)
+    return {
+        "research_summary_ref": await asyncio.to_thread(put_text, research_summary),
+        "messages": [AIMessage(content=report)],
+        "next_node": "supervisor",
+    }
+
+
 ### 4. 그래프 라우터 함수 정의 
 def router(state: OrchestratorState) -> str:
     """state의 next_node 값을 읽어 다음 노드를 결정하는 라우터"""
@@ -130,52 +232,62 @@ def router(state: OrchestratorState) -> str:
     return state.next_node
 
 
-### 5. 메인 함수 정의
-async def main():
-    # 1. 대화 기록을 저장할 DB 파일 설정
-    db_file = os.path.join(folder_path, "mcp_agent.sqlite")
-
-    # 2. AsyncSqliteSaver를 async with 구문을 사용하여 DB 연결을 안전하게 관리
-    async with AsyncSqliteSaver.from_conn_string(db_file) as memory:
-        # 클라이언트 생성
-        client = MultiServerMCPClient({
-            "MarketResearchExpert": {
-                "command": python_command, 
-                "args": [os.path.join(folder_path, "market_research_server.py")],
-                "transport": "stdio"
-                },
-            "ReportWritingExpert": {
-                "command": python_command, 
-                "args": [os.path.join(folder_path, "report_writing_server.py")],
-                "transport": "stdio"
-                }
-        })
-        
+### 5. 그래프 구성 함수 정의
+@asynccontextmanager
+async def open_tool_map() -> AsyncIterator[Dict[str, Any]]:
+    """
+    전문가 MCP 서버에 연결하여 도구 이름 -> 도구 딕셔너리를 생성합니다.
+    각 서버는 한 번만 실행되고, 블록이 끝날 때까지 같은 세션으로 모든 도구 호출을 처리합니다.
+    """
+    # 세션 관리자 생성
+    # (MCP_IN_PROCESS=on이면 서버 객체를 이 프로세스에 불러와 메모리 전송으로 연결,
+    #  MCP_ZYGOTE=on이면 미리 임포트를 마친 zygote에서 서버 프로세스를 fork하여 실행)
+    async with MCPSessionManager({
+        "MarketResearchExpert": expert_server_connection(os.path.join(folder_path, "market_research_server.py")),
+        "ReportWritingExpert": expert_server_connection(os.path.join(folder_path, "report_writing_server.py")),
+    }) as mcp_sessions:
         # 도구 함수 목록 생성    
-        tools = await client.get_tools()
+        tools = await mcp_sessions.get_tools()
         print(f"\n--- MCP 서버로부터 {len(tools)}개의 전문가 도구 로드 완료 ---")
 
         # 도구 함수 목록 -> 딕셔너리 생성
-        tool_map = {tool.name: tool for tool in tools}    
+        yield {tool.name: tool for tool in tools}
 
-        # 그래프 생성
-        graph = StateGraph(OrchestratorState)
+def build_graph(tool_map: Dict[str, Any], orchestration: str = ORCHESTRATION_MODE) -> StateGraph:
+    """
+    감독관 / 시장 조사 / 보고서 작성 노드로 구성된 그래프를 생성합니다.
+    orchestration="pipelined"면 감독관이 조사와 보고서 작성을 겹쳐 실행하는 노드로 작업을 보냅니다.
+    """
+    # 그래프 생성
+    graph = StateGraph(OrchestratorState)
 
-        # 그래프: 노드 추가
-        graph.add_node("supervisor", supervisor_node)
-        graph.add_node("call_market_research", partial(market_research_node, tool_map=tool_map))
-        graph.add_node("call_report_writing", partial(report_writing_node, tool_map=tool_map))
-        
-        # 그래프: 시작점 설정
-        graph.set_entry_point("supervisor")
+    # 그래프: 노드 추가
+    graph.add_node("supervisor", partial(supervisor_node, orchestration=orchestration))
+    graph.add_node("call_market_research", partial(market_research_node, tool_map=tool_map))
+    graph.add_node("call_report_writing", partial(report_writing_node, tool_map=tool_map))
+    graph.add_node("call_pipelined_report", partial(pipelined_report_node, tool_map=tool_map))
+    
+    # 그래프: 시작점 설정
+    graph.set_entry_point("supervisor")
 
-        # 그래프: 에지 설정
-        graph.add_conditional_edges("supervisor", router)
-        graph.add_conditional_edges("call_market_research", router)
-        graph.add_conditional_edges("call_report_writing", router)
-        
+    # 그래프: 에지 설정
+    graph.add_conditional_edges("supervisor", router)
+    graph.add_conditional_edges("call_market_research", router)
+    graph.add_conditional_edges("call_report_writing", router)
+    graph.add_conditional_edges("call_pipelined_report", router)
+    return graph
+
+
+### 6. 메인 함수 정의
+async def main():
+    # 1. 대화 기록을 저장할 DB 파일 설정
+    db_file = os.path.join(folder_path, "mcp_agent.sqlite")
+
+    # 2. 체크포인터(AsyncSqliteSaver)를 async with 구문을 사용하여 DB 연결을 안전하게 관리
+    # 3. 전문가 서버 세션은 프로그램이 끝날 때까지 유지하며 재사용
+    async with open_checkpointer(db_file) as memory, open_tool_map() as tool_map:
         # 그래프 컴파일 + 체크포인터 설정(그래프와 연결)
-        agent_executor = graph.compile(checkpointer=memory)
+        agent_executor = build_graph(tool_map).compile(checkpointer=memory)
         
         print("\n--- 기업용 보고서 자동화 시스템 ---")
 
@@ -191,15 +303,16 @@ async def main():
         while True:            
 
             # 사용자 입력 설정
-            user_input = input("사용자: ")
+            user_input = await asyncio.to_thread(input, "사용자: ")
             if user_input.lower() in ["exit", "quit", "그만"]: 
                 break            
             
             try:
                 # 최초 상태 설정
                 initial_state = {"messages": [HumanMessage(content=user_input)]}
-                # 최종 결과 생성 -> dict 자료형: {'messages': [...], 'research_summary': '...', 'user_query': '...', 'next_node': '...'}                # 
-                final_state = await agent_executor.ainvoke(initial_state, config=config)
+                # 최종 결과 생성 -> dict 자료형: {'messages': [...], 'research_summary_ref': 'blob:sha256:...', 'user_query': '...', 'next_node': '...'}                # 
+                # 보고서 작성 전문가가 보내는 보고서 조각은 도착하는 즉시 출력된다
+                final_state, streamed_text = await astream_with_live_output(agent_executor, initial_state, config=config)
                 # 최종 결과 값(시장 조사 및 분석의 결과) 추출
                 final_answer = final_state["messages"][-1].content
                 # print("\n" + "="*60)
@@ -207,8 +320,10 @@ async def main():
                 # print("="*60)
                 # print(final_answer)
                 # print("="*60 + "\n")
-                # 최종 결과 값 출력
-                if final_answer:
+                # 최종 결과 값 출력 (실시간으로 이미 출력한 보고서는 다시 출력하지 않음)
+                if final_answer and streamed_text and streamed_text in final_answer:
+                    print("-" * 80)
+                elif final_answer:
                     print(f"\nAI: {final_answer}")
                 else:
                     print("\nAI: 죄송합니다. 작업을 완료하지 못했습니다.")                    
@@ -216,6 +331,6 @@ async def main():
             except Exception as e:
                 print(f"\n[CRITICAL] 시스템 실행 중 심각한 오류가 발생했습니다: {e}")
 
-### 6. 애플리케이션 실행
+### 7. 애플리케이션 실행
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,134 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import re
+import time
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterator, List, Dict, Any
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# 요청 기록과 미리 계산한 보고서를 저장할 DB 파일 경로
+CACHE_DB_PATH = os.path.join(folder_path, 'analysis_cache.db')
+
+# 워밍업 대상 질문을 고를 때 살펴볼 요청 기록 기간(일)
+REQUEST_LOG_WINDOW_DAYS = int(os.getenv("REQUEST_LOG_WINDOW_DAYS", "30"))
+
+
+### 3. 캐시 DB 초기화 함수 정의
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    """WAL 모드 설정과 테이블 생성은 프로세스에서 처음 연결할 때 한 번만 실행합니다."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        _create_tables(conn)
+        _schema_ready = True
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS request_log (
+        normalized_query TEXT NOT NULL,
+        query TEXT NOT NULL,
+        requested_at REAL NOT NULL
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_request_log_time ON request_log (requested_at)")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS report_cache (
+        data_version TEXT NOT NULL,
+        normalized_query TEXT NOT NULL,
+        query TEXT NOT NULL,
+        executed_sql TEXT NOT NULL,
+        report TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (data_version, normalized_query)
+    )""")
+    conn.commit()
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """캐시 DB 연결. 블록이 끝나면 커밋(오류 시 롤백)하고 연결을 닫습니다."""
+    with closing(sqlite3.connect(CACHE_DB_PATH, timeout=30)) as conn:
+        _init_schema(conn)
+        with conn:
+            yield conn
+
+
+### 4. 데이터 버전 / 질문 정규화 함수 정의
+
+_version_cache: Dict[str, tuple] = {}
+
+def get_data_version(db_path: str) -> str | None:
+    """
+    매출 DB의 데이터 버전(최신 분기 + 전체 행 수)을 반환합니다.
+    파일이 바뀌지 않았다면 이전에 계산한 값을 재사용합니다.
+    """
+    if not os.path.exists(db_path):
+        return None
+    mtime = os.stat(db_path).st_mtime_ns
+    cached = _version_cache.get(db_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            latest, count = conn.execute("SELECT MAX(year_quarter), COUNT(*) FROM quarterly_sales").fetchone()
+    except sqlite3.Error:
+        return None
+    version = f"{latest}-{count}"
+    _version_cache[db_path] = (mtime, version)
+    return version
+
+def normalize_query(query: str) -> str:
+    """대소문자, 공백, 끝 문장부호 차이를 없애 같은 질문을 같은 키로 만듭니다."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!？").strip().lower()
+
+
+### 5. 요청 기록 / 보고서 캐시 함수 정의
+
+def log_request(query: str) -> None:
+    """분석 요청을 기록합니다."""
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO request_log (normalized_query, query, requested_at) VALUES (?, ?, ?)",
+            (normalize_query(query), query, time.time()),
+        )
+
+def top_questions(k: int) -> List[str]:
+    """최근 요청 기록에서 가장 많이 요청된 질문 k개를 반환합니다."""
+    since = time.time() - REQUEST_LOG_WINDOW_DAYS * 86400
+    with _connect() as conn:
+        rows = conn.execute("""
+            SELECT MAX(query), COUNT(*) AS cnt FROM request_log
+            WHERE requested_at >= ?
+            GROUP BY normalized_query
+            ORDER BY cnt DESC, MAX(requested_at) DESC
+            LIMIT ?""", (since, k)).fetchall()
+    return [row[0] for row in rows]
+
+def get_cached_report(query: str, data_version: str) -> Dict[str, Any] | None:
+    """현재 데이터 버전으로 미리 계산된 보고서가 있으면 반환합니다."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT report, executed_sql FROM report_cache WHERE data_version = ? AND normalized_query = ?",
+            (data_version, normalize_query(query)),
+        ).fetchone()
+    return {"report": row[0], "executed_sql": row[1]} if row else None
+
+def store_report(query: str, data_version: str, executed_sql: str, report: str) -> None:
+    """보고서를 데이터 버전과 함께 저장하고, 이전 버전의 보고서는 삭제합니다."""
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO report_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (data_version, normalize_query(query), query, executed_sql, report, time.time()),
+        )
+        conn.execute("DELETE FROM report_cache WHERE data_version != ?", (data_version,))
@@ -0,0 +1,116 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+from typing import Any, Dict, Tuple
+
+
+### 2. 환경 설정
+
+# 서버가 진행 알림(progress notification) 한 번에 모아 보낼 최소 글자 수
+STREAM_FLUSH_CHARS = int(os.getenv("STREAM_FLUSH_CHARS", "40"))
+
+# LangGraph custom 스트림으로 전달되는 보고서 조각의 이벤트 타입
+REPORT_DELTA = "report_delta"
+
+
+### 3. 서버 측: LLM 토큰 스트리밍 -> MCP 진행 알림 전달 함수 정의
+
+async def stream_report(llm: Any, prompt: str, ctx: Any = None) -> str:
+    """
+    LLM 응답을 토큰 단위로 스트리밍하면서, 일정 크기마다 MCP 진행 알림의 message로 전달합니다.
+    - ctx: FastMCP Context (None이면 알림 없이 전체 텍스트만 반환)
+    - 반환값: 완성된 전체 보고서 텍스트
+    """
+    parts, buffer, sent = [], "", 0
+    async for chunk in llm.astream(prompt):
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            continue
+        parts.append(text)
+        buffer += text
+        # 너무 잦은 알림을 피하기 위해 일정 길이 또는 줄바꿈 단위로 모아서 전송
+        if ctx is not None and (len(buffer) >= STREAM_FLUSH_CHARS or "\n" in text):
+            sent += len(buffer)
+            await ctx.report_progress(progress=sent, total=None, message=buffer)
+            buffer = ""
+    if ctx is not None and buffer:
+        await ctx.report_progress(progress=sent + len(buffer), total=None, message=buffer)
+    return "".join(parts)
+
+
+### 4. 클라이언트 측: MCP 진행 알림 -> LangGraph custom 스트림 전달 함수 정의
+
+def emit_report_delta(text: str) -> None:
+    """보고서 조각을 현재 실행 중인 LangGraph 노드의 custom 스트림으로 내보냅니다."""
+    from langgraph.config import get_stream_writer
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # 그래프 실행 컨텍스트 밖에서 호출된 경우(예: 단독 도구 호출)에는 무시
+        return
+    writer({"type": REPORT_DELTA, "text": text})
+
+def make_progress_callbacks():
+    """
+    MultiServerMCPClient에 전달할 콜백을 생성합니다.
+    stdio 도구 호출은 호출 시점에 세션을 열기 때문에, 진행 알림 콜백은 도구를 호출한
+    노드의 실행 컨텍스트 안에서 실행되고, 따라서 get_stream_writer()를 그대로 사용할 수 있습니다.
+    """
+    from langchain_mcp_adapters.callbacks import Callbacks
+
+    async def on_progress(progress: float, total: float | None, message: str | None, context: Any) -> None:
+        if message:
+            emit_report_delta(message)
+
+    return Callbacks(on_progress=on_progress)
+
+def make_session_progress_callback():
+    """
+    장기 유지 MCP 세션(mcp_sessions.MCPSessionManager)의 call_tool에 전달할 진행 알림 콜백을 생성합니다.
+    세션의 알림은 세션 수신 작업에서 실행되어 노드의 실행 컨텍스트를 잃으므로,
+    도구를 호출하는 시점(노드 안)에 스트림 writer를 미리 잡아두고 사용합니다.
+    - 그래프 실행 컨텍스트 밖에서 호출하면 None을 반환합니다.
+    """
+    from langgraph.config import get_stream_writer
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return None
+
+    async def on_progress(progress: float, total: float | None, message: str | None) -> None:
+        if message:
+            writer({"type": REPORT_DELTA, "text": message})
+
+    return on_progress
+
+
+### 5. 콘솔 측: 스트리밍 결과 실시간 출력 함수 정의
+
+async def astream_with_live_output(agent_executor: Any, inputs: Dict, config: Dict) -> Tuple[Dict, str]:
+    """
+    그래프를 astream으로 실행하면서 보고서 조각을 도착하는 즉시 콘솔에 출력합니다.
+    - 반환값: (최종 상태, 실시간으로 출력한 보고서 전체 텍스트)
+    """
+    final_state, streamed = {}, []
+    async for mode, chunk in agent_executor.astream(inputs, config=config, stream_mode=["custom", "values"]):
+        if mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == REPORT_DELTA:
+            if not streamed:
+                print("\n" + "="*25 + " 실시간 보고서 " + "="*25)
+            print(chunk["text"], end="", flush=True)
+            streamed.append(chunk["text"])
+        elif mode == "values":
+            final_state = chunk
+    if streamed:
+        print()
+    return final_state, "".join(streamed)
+
+def print_final_answer(final_answer: str, streamed_text: str) -> None:
+    """최종 결과를 출력합니다. 이미 실시간으로 출력한 보고서 본문은 다시 출력하지 않습니다."""
+    if streamed_text and streamed_text in final_answer:
+        remainder = final_answer.split(streamed_text, 1)[1].strip()
+        if remainder:
+            print(remainder)
+        print("="*62)
+        return
+    print("\n" + "="*25 + " 최종 결과 " + "="*25)
+    print(final_answer)
+    print("="*62)
@@ -1,11 +1,14 @@
 ### 1. 환경 설정
 
 # 필요한 함수 임포트
-from typing import Dict, Any
+import os
+import asyncio
+from typing import Dict, Any, List
 from pydantic import BaseModel, Field
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from report_streaming import stream_report
 
 # API Key 가져오기(명시적 경로 설정)
 file_path = '.env'
@@ -20,49 +23,293 @@ mcp_server = FastMCP(name="ReportWritingExpert")
 # LLM 설정
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.6)
 
+# 보고서 작성 방식: "single"(LLM 한 번 호출로 전체 보고서 작성) 또는
+# "sections"(짧은 목차 생성 -> 섹션별 동시 작성 -> 정합성 검토 후 순서대로 조립)
+REPORT_MODE = os.getenv("REPORT_MODE", "single").lower()
 
-### 3. 전문가 도구 함수 정의
+# sections 방식: 본문 섹션 수 / 동시에 작성할 최대 섹션 수
+REPORT_SECTIONS = int(os.getenv("REPORT_SECTIONS", "5"))
+REPORT_SECTION_CONCURRENCY = int(os.getenv("REPORT_SECTION_CONCURRENCY", "5"))
+
+# 보고서 목차 생성용 llm (구조화된 출력)
+class OutlineSection(BaseModel):
+    heading: str = Field(description="섹션 제목")
+    focus: str = Field(description="이 섹션에서 다룰 내용 (한 문장)")
+
+class ReportOutline(BaseModel):
+    title: str = Field(description="보고서 제목")
+    sections: List[OutlineSection] = Field(default_factory=list, description="본문 섹션 목록 (순서대로)")
+
+outline_llm = llm.with_structured_output(ReportOutline)
+
+
+### 3. 프롬프트 생성 함수 정의
+
+def build_report_prompt(user_query: str, research_summary: str) -> str:
+    """사용자 요청과 시장 조사 요약으로 최종 보고서 작성 프롬프트를 만듭니다."""
+    return f"""
+    당신은 전문 데이터 분석가이자 보고서 작성 전문가입니다.
+    다음은 사용자의 원본 요청과 그에 따라 수집된 데이터 요약입니다.
+    이 요약 정보를 바탕으로, 사용자의 원래 질문 의도에 맞춰 비교, 분석, 요약 및 제언을 포함한 상세한 최종 보고서를 마크다운 형식으로 작성해주세요.
+    데이터를 단순히 나열하지 말고, 비교 분석하여 의미 있는 인사이트를 도출해야 합니다.
+
+    # 원본 사용자 요청:
+    {user_query}
+
+    # 수집된 시장 조사 요약:
+    {research_summary}
+
+    # 최종 보고서 (마크다운 형식):
+    """
+
+def build_outline_prompt(user_query: str, research_notes: str, focus_areas: List[str]) -> str:
+    """조사 초기 자료로 보고서 목차를 만드는 프롬프트. (focus_areas 하나당 섹션 하나)"""
+    areas = "\n".join(f"{i + 1}. {area}" for i, area in enumerate(focus_areas))
+    return f"""
+    당신은 보고서 작성 전문가입니다. 아래 사용자 요청에 대한 시장 분석 보고서의 제목과 본문 목차를 작성해주세요.
+    본문 섹션은 아래 '조사 관점' 목록과 같은 순서로 정확히 {len(focus_areas)}개를 만들고,
+    각 섹션 제목은 해당 관점을 보고서 독자가 이해하기 쉬운 표현으로 바꿔주세요.
+    지금까지 도착한 초기 조사 자료는 제목과 섹션 설명을 구체화하는 데 참고하세요.
+
+    # 사용자 요청:
+    {user_query}
+
+    # 조사 관점:
+    {areas}
+
+    # 초기 조사 자료:
+    {research_notes}
+    """
+
+def build_plan_prompt(user_query: str, research_summary: str, section_count: int) -> str:
+    """전체 조사 요약으로 보고서 목차를 만드는 프롬프트. (섹션 구성은 LLM이 결정)"""
+    return f"""
+    당신은 보고서 작성 전문가입니다. 아래 사용자 요청과 시장 조사 요약을 바탕으로 시장 분석 보고서의 제목과 본문 목차를 작성해주세요.
+    - 본문 섹션은 정확히 {section_count}개이며, 서로 겹치지 않는 주제로 나눕니다.
+    - 핵심 요약과 결론 및 제언은 별도로 작성하므로 목차에 넣지 않습니다.
+    - 각 섹션의 설명에는 그 섹션에서 다룰 내용을 한 문장으로 적습니다.
+
+    # 사용자 요청:
+    {user_query}
+
+    # 시장 조사 요약:
+    {research_summary}
+    """
+
+def build_section_prompt(user_query: str, title: str, headings: List[str], heading: str, focus: str, research_notes: str) -> str:
+    """보고서의 한 섹션을 작성하는 프롬프트."""
+    outline = "\n".join(f"- {h}" for h in headings)
+    return f"""
+    당신은 전문 데이터 분석가이자 보고서 작성 전문가입니다.
+    보고서 '{title}'의 전체 목차 중 '{heading}' 섹션 하나만 마크다운으로 작성해주세요.
+    - 섹션 제목은 '## {heading}'으로 시작합니다.
+    - 다룰 내용: {focus}
+    - 아래 조사 자료에 근거하여 수치와 출처를 구체적으로 인용하고, 다른 섹션에서 다룰 내용은 반복하지 않습니다.
+    - 보고서 전체 요약이나 결론은 쓰지 않습니다. (별도 섹션에서 작성)
+
+    # 사용자 요청:
+    {user_query}
+
+    # 전체 목차:
+    {outline}
+
+    # 이 섹션의 조사 자료:
+    {research_notes}
+
+    # 섹션 본문 (마크다운 형식):
+    """
+
+def build_reconcile_prompt(user_query: str, sections: List[str], part: str) -> str:
+    """
+    따로 작성된 섹션들을 함께 검토하는 정합성 검토 프롬프트.
+    - part="summary": 보고서 맨 앞의 핵심 요약 (섹션 간 수치 / 주장이 다르면 차이를 밝히고 정리)
+    - part="conclusion": 보고서 맨 끝의 결론 및 제언
+    """
+    instruction = (
+        "'## 핵심 요약' 섹션을 작성해주세요. 각 섹션의 핵심 내용을 비교하여 요약하고, "
+        "섹션 사이에 수치나 주장이 서로 다르면 그 차이와 더 신뢰할 만한 근거를 명시해주세요."
+        if part == "summary" else
+        "'## 결론 및 제언' 섹션을 작성해주세요. 섹션 내용을 종합한 결론과 실행 가능한 제언을 제시하되, "
+        "본문에 없는 새로운 수치는 만들지 마세요."
+    )
+    body = "\n\n".join(sections)
+    return f"""
+    당신은 보고서 편집장입니다. 아래는 여러 작성자가 동시에 작성한 보고서 본문 섹션들입니다.
+    {instruction}
+
+    # 사용자 요청:
+    {user_query}
+
+    # 보고서 본문 섹션:
+    {body}
+
+    # 작성할 섹션 (마크다운 형식):
+    """
+
+
+### 4. 보고서 생성 함수 정의
+
+async def generate_outline(user_query: str, research_notes: str, focus_areas: List[str]) -> ReportOutline:
+    """보고서 목차를 생성합니다. (섹션 수가 조사 관점 수와 다르면 관점 이름으로 목차를 보정)"""
+    outline = await outline_llm.ainvoke(build_outline_prompt(user_query, research_notes, focus_areas))
+    if len(outline.sections) != len(focus_areas):
+        outline.sections = [OutlineSection(heading=area, focus=area) for area in focus_areas]
+    return outline
+
+async def plan_outline(user_query: str, research_summary: str, section_count: int) -> ReportOutline:
+    """전체 조사 요약으로 보고서 목차를 생성합니다. (섹션이 없으면 오류)"""
+    outline = await outline_llm.ainvoke(build_plan_prompt(user_query, research_summary, section_count))
+    if not outline.sections:
+        raise ValueError("보고서 목차에 섹션이 없습니다.")
+    return outline
+
+async def write_section(user_query: str, title: str, headings: List[str], heading: str, focus: str, research_notes: str) -> str:
+    """섹션 하나를 작성합니다. (여러 섹션을 동시에 작성하므로 진행 알림은 보내지 않음)"""
+    response = await llm.ainvoke(build_section_prompt(user_query, title, headings, heading, focus, research_notes))
+    return response.content.strip()
+
+async def write_sections(user_query: str, outline: ReportOutline, research_notes: List[str]) -> List[str]:
+    """목차의 섹션들을 한 번의 배치 호출로 동시에 작성합니다. (최대 REPORT_SECTION_CONCURRENCY개씩, 목차 순서로 반환)"""
+    headings = [section.heading for section in outline.sections]
+    prompts = [
+        build_section_prompt(user_query, outline.title, headings, section.heading, section.focus, notes)
+        for section, notes in zip(outline.sections, research_notes)
+    ]
+    responses = await llm.abatch(prompts, config={"max_concurrency": REPORT_SECTION_CONCURRENCY})
+    return [response.content.strip() for response in responses]
+
+async def assemble_report(user_query: str, title: str, sections: List[str], ctx: Context | None = None) -> str:
+    """
+    섹션들을 목차 순서로 이어 붙이고, 정합성 검토 결과(핵심 요약 / 결론 및 제언)를 앞뒤에 붙여 최종 보고서를 만듭니다.
+    핵심 요약은 생성되는 즉시 스트리밍하고, 결론은 그동안 동시에 작성해 두었다가 본문 뒤에 이어서 보냅니다.
+    """
+    conclusion_task = asyncio.create_task(llm.ainvoke(build_reconcile_prompt(user_query, sections, "conclusion")))
+    try:
+        header = f"# {title}\n\n"
+        if ctx is not None:
+            await ctx.report_progress(progress=len(header), total=None, message=header)
+        summary = await stream_report(llm, build_reconcile_prompt(user_query, sections, "summary"), ctx)
+        conclusion = (await conclusion_task).content.strip()
+    finally:
+        conclusion_task.cancel()
+    rest = "\n\n" + "\n\n".join(sections) + "\n\n" + conclusion
+    if ctx is not None:
+        await ctx.report_progress(progress=len(header) + len(summary) + len(rest), total=None, message=rest)
+    # 스트리밍한 텍스트와 최종 보고서가 정확히 일치하도록 그대로 이어 붙임
+    return header + summary + rest
+
+async def write_sectioned_report(user_query: str, research_summary: str, ctx: Context | None = None,
+                                 section_count: int = REPORT_SECTIONS) -> str:
+    """
+    sections 방식의 보고서 작성: 목차 생성 -> 섹션 동시 작성 -> 정합성 검토(핵심 요약 / 결론) 후 조립.
+    각 LLM 호출의 출력이 짧아 보고서가 길어져도 지연 시간이 덜 늘어나고, 출력 길이 제한으로 잘리지 않습니다.
+    """
+    outline = await plan_outline(user_query, research_summary, section_count)
+    # 섹션마다 다른 부분을 다루도록 목차로 구분하고, 조사 요약은 모든 섹션이 함께 참고
+    sections = await write_sections(user_query, outline, [research_summary] * len(outline.sections))
+    return await assemble_report(user_query, outline.title, sections, ctx)
+
+
+### 5. 전문가 도구 함수 정의
 
 # 입력 스키마 정의
 class ReportInput(BaseModel):
     user_query: str = Field(description="보고서 생성을 위한 사용자의 원본 요청 문장")
     research_summary: str = Field(description="시장 조사 전문가로부터 전달받은 요약 정보")
+    mode: str | None = Field(default=None, description="보고서 작성 방식: single 또는 sections (기본값: 서버 설정)")
 
 # 전문가 도구 함수 정의
 @mcp_server.tool(
     name="write_final_report",
     description="사용자 요청과 시장 조사 요약을 바탕으로, 최종 분석 보고서를 마크다운 형식으로 생성합니다."
 )
-def write_final_report(input_data: ReportInput) -> Dict[str, Any]:
+async def write_final_report(input_data: ReportInput, ctx: Context) -> Dict[str, Any]:
     """
     LLM을 사용하여 분석 결과와 사용자 의도를 종합한 최종 보고서를 작성하는 전문가 도구.
+    보고서는 생성되는 즉시 MCP 진행 알림으로 클라이언트에 스트리밍됩니다.
     """
-    print("--- [ReportWritingExpert] 최종 보고서 작성을 시작합니다. ---")
-    prompt = f"""
-    당신은 전문 데이터 분석가이자 보고서 작성 전문가입니다.
-    다음은 사용자의 원본 요청과 그에 따라 수집된 데이터 요약입니다.
-    이 요약 정보를 바탕으로, 사용자의 원래 질문 의도에 맞춰 비교, 분석, 요약 및 제언을 포함한 상세한 최종 보고서를 마크다운 형식으로 작성해주세요.
-    데이터를 단순히 나열하지 말고, 비교 분석하여 의미 있는 인사이트를 도출해야 합니다.
+    mode = (input_data.mode or REPORT_MODE).lower()
+    print(f"--- [ReportWritingExpert] 최종 보고서 작성을 시작합니다. (방식: {mode}) ---")
+    try:
+        if mode == "sections":
+            report_text = await write_sectioned_report(input_data.user_query, input_data.research_summary, ctx)
+        else:
+            prompt = build_report_prompt(input_data.user_query, input_data.research_summary)
+            report_text = await stream_report(llm, prompt, ctx)
+        return {"result": {"report_text": report_text}}
+    except Exception as e:
+        error_message = f"보고서 생성 중 LLM 호출 오류 발생: {e}"
+        print(f"[ERROR] {error_message}")
+        return {"error": error_message}
 
-    # 원본 사용자 요청:
-    {input_data.user_query}
 
-    # 수집된 시장 조사 요약:
-    {input_data.research_summary}
+# 조사와 동시에 진행하는(파이프라인) 보고서 작성 도구
+class OutlineInput(BaseModel):
+    user_query: str = Field(description="보고서 생성을 위한 사용자의 원본 요청 문장")
+    research_notes: str = Field(description="지금까지 도착한 초기 시장 조사 자료")
+    focus_areas: List[str] = Field(description="조사 관점 목록 (관점 하나당 섹션 하나)")
 
-    # 최종 보고서 (마크다운 형식):
-    """
+@mcp_server.tool(
+    name="draft_report_outline",
+    description="초기 시장 조사 자료와 조사 관점 목록으로 보고서 제목과 섹션 목차를 생성합니다."
+)
+async def draft_report_outline(input_data: OutlineInput) -> Dict[str, Any]:
+    print("--- [ReportWritingExpert] 보고서 목차를 작성합니다. ---")
+    try:
+        outline = await generate_outline(input_data.user_query, input_data.research_notes, input_data.focus_areas)
+        return {"result": outline.model_dump()}
+    except Exception as e:
+        error_message = f"목차 생성 중 LLM 호출 오류 발생: {e}"
+        print(f"[ERROR] {error_message}")
+        return {"error": error_message}
+
+class SectionInput(BaseModel):
+    user_query: str = Field(description="보고서 생성을 위한 사용자의 원본 요청 문장")
+    title: str = Field(description="보고서 제목")
+    headings: List[str] = Field(description="보고서 전체 섹션 제목 목록")
+    heading: str = Field(description="작성할 섹션 제목")
+    focus: str = Field(description="작성할 섹션에서 다룰 내용")
+    research_notes: str = Field(description="이 섹션에 해당하는 시장 조사 자료")
+
+@mcp_server.tool(
+    name="draft_report_section",
+    description="보고서의 섹션 하나를 해당 조사 자료만으로 작성합니다. (여러 섹션을 동시에 호출 가능)"
+)
+async def draft_report_section(input_data: SectionInput) -> Dict[str, Any]:
+    print(f"--- [ReportWritingExpert] 섹션 '{input_data.heading}'을(를) 작성합니다. ---")
     try:
-        response = llm.invoke(prompt)
-        report_text = response.content
+        section_text = await write_section(
+            input_data.user_query, input_data.title, input_data.headings,
+            input_data.heading, input_data.focus, input_data.research_notes,
+        )
+        return {"result": {"section_text": section_text}}
+    except Exception as e:
+        error_message = f"섹션 작성 중 LLM 호출 오류 발생: {e}"
+        print(f"[ERROR] {error_message}")
+        return {"error": error_message}
+
+class ReconcileInput(BaseModel):
+    user_query: str = Field(description="보고서 생성을 위한 사용자의 원본 요청 문장")
+    title: str = Field(description="보고서 제목")
+    sections: List[str] = Field(description="목차 순서대로 정렬한 섹션 본문 목록")
+
+@mcp_server.tool(
+    name="reconcile_report",
+    description="따로 작성된 섹션들을 검토하여 핵심 요약과 결론을 붙이고, 최종 보고서를 마크다운 형식으로 완성합니다."
+)
+async def reconcile_report(input_data: ReconcileInput, ctx: Context) -> Dict[str, Any]:
+    """최종 보고서는 생성되는 즉시 MCP 진행 알림으로 클라이언트에 스트리밍됩니다."""
+    print("--- [ReportWritingExpert] 섹션 정합성 검토 및 최종 보고서 조립을 시작합니다. ---")
+    try:
+        report_text = await assemble_report(input_data.user_query, input_data.title, input_data.sections, ctx)
         return {"result": {"report_text": report_text}}
     except Exception as e:
-        error_message = f"보고서 생성 중 LLM 호출 오류 발생: {e}"
+        error_message = f"보고서 조립 중 LLM 호출 오류 발생: {e}"
         print(f"[ERROR] {error_message}")
         return {"error": error_message}
 
 
-### 4. 서버 실행
+### 6. 서버 실행
 if __name__ == "__main__":
     print("MCP [ReportWritingExpert] 서버가 시작되었습니다.")
     mcp_server.run()
\ No newline at end of file
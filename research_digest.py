@@ -0,0 +1,207 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import re
+import math
+import zlib
+import random
+from collections import Counter
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from token_count import estimate_tokens
+
+
+### 2. 환경 설정
+
+# 조사 방식: "single"(주제 하나로 검색) 또는 "multi"(세부 질의 여러 개를 동시에 검색한 뒤 병합 / 중복 제거)
+RESEARCH_MODE = os.getenv("RESEARCH_MODE", "single").lower()
+
+# multi 모드에서 주제에 덧붙여 만드는 세부 질의 (앞에서부터 RESEARCH_SUB_QUERIES개 사용, 원래 주제는 항상 포함)
+SUB_QUERY_FACETS = ["규모 및 매출 통계", "최신 트렌드", "주요 기업 경쟁 현황", "소비자 수요 변화", "향후 전망"]
+RESEARCH_SUB_QUERIES = int(os.getenv("RESEARCH_SUB_QUERIES", "4"))
+
+# 내용이 거의 같은 문서로 판단할 추정 자카드 유사도 / MinHash 서명 길이 / shingle 길이(글자 수)
+DEDUPE_SIMILARITY = float(os.getenv("DEDUPE_SIMILARITY", "0.8"))
+MINHASH_PERMUTATIONS = 64
+SHINGLE_SIZE = 5
+
+# URL 비교 시 제거할 추적용 쿼리 파라미터 (이름이 정확히 일치하는 파라미터 / 이 접두어로 시작하는 파라미터)
+# (reference=, sourceId= 같은 실제 파라미터까지 지우지 않도록 접두어 비교는 utm_에만 사용)
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "source"}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+# 조사 결과 압축 사용 여부 / 보고서 작성 전문가에게 전달할 조사 요약의 최대 토큰 수
+# (켜면 주제와 관련도가 낮은 문단이 요약에서 빠지므로 기본값은 꺼짐, RESEARCH_COMPRESSION=on으로 사용)
+RESEARCH_COMPRESSION = os.getenv("RESEARCH_COMPRESSION", "off").lower() in ("1", "on", "true")
+RESEARCH_TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", "1500"))
+
+# 검색 결과를 나눌 문단의 최대 글자 수 / BM25 파라미터
+PASSAGE_MAX_CHARS = int(os.getenv("PASSAGE_MAX_CHARS", "400"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+### 3. 세부 질의 생성 함수 정의
+
+def expand_queries(topic: str, count: int = RESEARCH_SUB_QUERIES) -> List[str]:
+    """
+    주제를 세부 질의 여러 개로 나눕니다. (원래 주제 + 관점별 질의)
+    LLM 호출 없이 만들어 검색 전 추가 지연이 없습니다.
+    """
+    return [topic] + [f"{topic} {facet}" for facet in SUB_QUERY_FACETS[:max(0, count - 1)]]
+
+
+### 4. 중복 제거 함수 정의
+
+def normalize_url(url: str) -> str:
+    """스킴 / www / 끝 슬래시 / 프래그먼트 / 추적용 파라미터 차이를 없앤 URL을 반환합니다."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+def _shingles(text: str) -> set:
+    """공백 / 문장부호를 없앤 텍스트의 글자 단위 shingle 집합. (띄어쓰기가 달라도 같은 문장으로 취급)"""
+    compact = re.sub(r"[\W_]+", "", text.lower())
+    if len(compact) <= SHINGLE_SIZE:
+        return {compact} if compact else set()
+    return {compact[i:i + SHINGLE_SIZE] for i in range(len(compact) - SHINGLE_SIZE + 1)}
+
+# MinHash에 사용할 해시 함수 계수 (실행마다 같은 서명이 나오도록 고정 시드 사용)
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(42)
+_HASH_COEFFICIENTS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(MINHASH_PERMUTATIONS)
+]
+
+def minhash_signature(text: str) -> List[int]:
+    """텍스트의 MinHash 서명. 두 서명에서 값이 같은 위치의 비율이 shingle 집합의 자카드 유사도 추정치입니다."""
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(text)]
+    if not hashes:
+        return [0] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _HASH_COEFFICIENTS]
+
+def estimated_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+def dedupe_results(results: List[Dict[str, Any]], similarity: float = DEDUPE_SIMILARITY) -> tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    여러 검색 결과를 관련도(score) 순으로 합치면서
+    1) 같은 URL(정규화 기준)의 문서와 2) 내용이 거의 같은 문서(MinHash 추정 유사도 >= similarity)를 제거합니다.
+    (남긴 결과 목록, {"input", "duplicate_url", "near_duplicate", "kept"})를 반환합니다.
+    """
+    stats = {"input": len(results), "duplicate_url": 0, "near_duplicate": 0, "kept": 0}
+    kept: List[Dict[str, Any]] = []
+    seen_urls = set()
+    kept_signatures: List[List[int]] = []
+    for result in sorted(results, key=lambda r: r.get("score") or 0, reverse=True):
+        url_key = normalize_url(result.get("url", ""))
+        if url_key and url_key in seen_urls:
+            stats["duplicate_url"] += 1
+            continue
+        signature = minhash_signature(result.get("content") or "")
+        if any(estimated_similarity(signature, other) >= similarity for other in kept_signatures):
+            stats["near_duplicate"] += 1
+            continue
+        seen_urls.add(url_key)
+        kept_signatures.append(signature)
+        kept.append(result)
+    stats["kept"] = len(kept)
+    return kept, stats
+
+
+### 5. 문단 순위 / 압축 함수 정의
+
+def split_passages(results: List[Dict[str, Any]], max_chars: int = PASSAGE_MAX_CHARS) -> List[Dict[str, Any]]:
+    """
+    검색 결과 본문을 문장 단위로 잘라 max_chars 이내의 문단으로 묶습니다.
+    각 문단은 {"url", "doc", "index", "text"} 형식이며, doc / index는 원래 문서 / 문단 순서입니다.
+    """
+    passages = []
+    for doc_index, result in enumerate(results):
+        sentences = re.split(r"(?<=[.!?。])\s+|\n+", (result.get("content") or "").strip())
+        chunks, buffer = [], ""
+        for sentence in filter(None, (sentence.strip() for sentence in sentences)):
+            if buffer and len(buffer) + len(sentence) + 1 > max_chars:
+                chunks.append(buffer)
+                buffer = sentence
+            else:
+                buffer = f"{buffer} {sentence}".strip()
+        if buffer:
+            chunks.append(buffer)
+        passages.extend(
+            {"url": result.get("url"), "doc": doc_index, "index": i, "text": chunk} for i, chunk in enumerate(chunks)
+        )
+    return passages
+
+def _terms(text: str) -> List[str]:
+    """
+    BM25용 검색어 목록. 영문 / 숫자는 단어 그대로, 한글 등은 글자 2-gram으로 나눕니다.
+    (조사가 붙은 어절도 '커피' / '시장' 같은 2-gram으로 질의와 일치)
+    """
+    terms = []
+    for word in re.findall(r"\w+", text.lower()):
+        if word.isascii() or len(word) < 2:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+def bm25_scores(query: str, texts: List[str]) -> List[float]:
+    """질의에 대한 각 텍스트의 BM25 점수를 계산합니다. (텍스트 목록 자체를 문서 집합으로 사용)"""
+    documents = [Counter(_terms(text)) for text in texts]
+    if not documents:
+        return []
+    lengths = [sum(document.values()) for document in documents]
+    average_length = sum(lengths) / len(lengths) or 1
+    document_frequency = Counter(term for document in documents for term in document)
+    scores = []
+    for document, length in zip(documents, lengths):
+        score = 0.0
+        for term in set(_terms(query)):
+            frequency = document.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+        scores.append(score)
+    return scores
+
+def format_research_summary(passages: List[Dict[str, Any]]) -> str:
+    """문단을 출처(문서)별로 묶어 "출처: ... / 내용: ..." 형식의 조사 요약 본문을 만듭니다."""
+    by_source: Dict[int, List[Dict[str, Any]]] = {}
+    for passage in sorted(passages, key=lambda p: (p["doc"], p["index"])):
+        by_source.setdefault(passage["doc"], []).append(passage)
+    return "\n\n---\n\n".join(
+        f"출처: {group[0]['url']}\n내용: {' '.join(passage['text'] for passage in group)}"
+        for group in by_source.values()
+    )
+
+def compress_research(query: str, results: List[Dict[str, Any]],
+                      token_budget: int = RESEARCH_TOKEN_BUDGET) -> tuple[str, Dict[str, int]]:
+    """
+    검색 결과를 문단으로 나누고 질의와의 BM25 점수가 높은 문단부터 token_budget 안에서 골라 조사 요약 본문을 만듭니다.
+    골라진 문단은 원래 문서 / 문단 순서로 출처 URL과 함께 배치합니다. (전체가 예산 안이면 모두 유지)
+    (요약 본문, {"passages", "kept", "input_tokens", "output_tokens"})를 반환합니다.
+    """
+    passages = split_passages(results)
+    full_text = format_research_summary(passages)
+    stats = {"passages": len(passages), "kept": len(passages), "input_tokens": estimate_tokens(full_text)}
+    if stats["input_tokens"] <= token_budget:
+        stats["output_tokens"] = stats["input_tokens"]
+        return full_text, stats
+
+    scores = bm25_scores(query, [passage["text"] for passage in passages])
+    selected: List[Dict[str, Any]] = []
+    for score, passage in sorted(zip(scores, passages), key=lambda item: item[0], reverse=True):
+        # 출처 표시 / 구분선까지 포함한 실제 요약 본문 기준으로 예산 확인
+        if estimate_tokens(format_research_summary(selected + [passage])) <= token_budget:
+            selected.append(passage)
+    if not selected and passages:
+        # 예산보다 긴 문단만 있으면 가장 관련도 높은 문단 하나는 유지
+        selected = [passages[max(range(len(scores)), key=scores.__getitem__)]]
+    summary_text = format_research_summary(selected)
+    stats.update(kept=len(selected), output_tokens=estimate_tokens(summary_text))
+    return summary_text, stats
@@ -0,0 +1,188 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
+# 토큰 수 추정은 pandas 없이 사용할 수 있도록 token_count.py에 정의 (기존 임포트 경로 유지)
+from token_count import estimate_tokens
+
+
+### 2. 환경 설정
+
+# 보고서 프롬프트에 포함할 조회 결과의 최대 토큰 수
+REPORT_TOKEN_BUDGET = int(os.getenv("REPORT_TOKEN_BUDGET", "3000"))
+
+# 상위/하위 행, 그룹 집계 등에서 보여줄 기본 행 수
+COMPACTION_TOP_K = int(os.getenv("COMPACTION_TOP_K", "5"))
+
+# 주요 지표 후보 (앞에 있을수록 우선)
+METRIC_PRIORITY = [
+    "monthly_sales_amount", "monthly_sales_count",
+    "weekend_sales_amount", "weekday_sales_amount", "midweek_sales_amount",
+    "sales_time_11_14", "sales_time_17_21",
+    "male_sales_amount", "female_sales_amount", "sales_by_age_30s",
+]
+
+# 그룹 집계에 사용할 범주형 컬럼 후보 (sub_query: 복합 질문을 나눈 하위 질문별 결과 표시)
+GROUP_COLUMNS = ["district_name", "service_category_name", "district_type", "sub_query"]
+
+# 통계에서 제외할 식별자 성격의 컬럼
+ID_COLUMNS = {"id", "district_code", "service_category_code"}
+
+
+### 3. 표 렌더링 함수 정의
+
+def _format_value(value: Any) -> str:
+    """표에 들어갈 값을 짧은 문자열로 변환합니다."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "-"
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.0f}" if abs(value) >= 100 else f"{value:,.2f}"
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+def render_table(df: pd.DataFrame, fmt: str = "markdown") -> str:
+    """DataFrame을 마크다운 또는 CSV 표 문자열로 변환합니다."""
+    if fmt == "csv":
+        return df.to_csv(index=False, float_format="%.2f").strip()
+    header = "| " + " | ".join(str(c) for c in df.columns) + " |"
+    divider = "|" + "---|" * len(df.columns)
+    rows = ["| " + " | ".join(_format_value(v) for v in row) + " |" for row in df.itertuples(index=False)]
+    return "\n".join([header, divider, *rows])
+
+
+### 4. 요약 섹션 생성 함수 정의
+
+def _numeric_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns if c not in ID_COLUMNS and pd.api.types.is_numeric_dtype(df[c])]
+
+def _primary_metric(df: pd.DataFrame, numeric_cols: List[str]) -> str | None:
+    """보고서의 기준이 될 주요 지표 컬럼을 선택합니다."""
+    for col in METRIC_PRIORITY:
+        if col in numeric_cols:
+            return col
+    if not numeric_cols:
+        return None
+    # 후보가 없으면 합계가 가장 큰 수치 컬럼을 사용
+    sums = df[numeric_cols].abs().sum().to_numpy()
+    return numeric_cols[int(np.argmax(sums))]
+
+def _label_columns(df: pd.DataFrame) -> List[str]:
+    """행을 식별하는 데 쓰일 범주형 컬럼 목록을 반환합니다."""
+    return [c for c in ["year_quarter", *GROUP_COLUMNS] if c in df.columns]
+
+def _stats_section(df: pd.DataFrame, numeric_cols: List[str], fmt: str) -> str:
+    stats = df[numeric_cols].describe().T[["mean", "std", "min", "50%", "max"]]
+    stats.insert(0, "sum", df[numeric_cols].sum())
+    stats = stats.reset_index().rename(columns={"index": "column", "50%": "median"})
+    return "#### 수치 컬럼 요약 통계\n" + render_table(stats, fmt)
+
+def _top_bottom_section(df: pd.DataFrame, metric: str, k: int, fmt: str) -> str:
+    cols = _label_columns(df) + [metric]
+    ordered = df.sort_values(metric, ascending=False)
+    parts = [f"#### {metric} 상위 {k}개 행\n" + render_table(ordered.head(k)[cols], fmt)]
+    if len(df) > k:
+        parts.append(f"#### {metric} 하위 {k}개 행\n" + render_table(ordered.tail(k)[cols].iloc[::-1], fmt))
+    return "\n\n".join(parts)
+
+def _group_sections(df: pd.DataFrame, metric: str, k: int, fmt: str) -> List[str]:
+    sections = []
+    for col in [c for c in GROUP_COLUMNS if c in df.columns][:2]:
+        if df[col].nunique() >= len(df):
+            continue
+        grouped = (
+            df.groupby(col)[metric]
+            .agg(["count", "sum", "mean"])
+            .sort_values("sum", ascending=False)
+        )
+        grouped["share_pct"] = np.round(grouped["sum"].to_numpy() / max(grouped["sum"].sum(), 1) * 100, 2)
+        sections.append(
+            f"#### {col}별 {metric} 집계 (상위 {min(k, len(grouped))}개 / 전체 {len(grouped)}개 그룹)\n"
+            + render_table(grouped.head(k).reset_index(), fmt)
+        )
+    return sections
+
+def _qoq_section(df: pd.DataFrame, metric: str, k: int, fmt: str) -> str | None:
+    if "year_quarter" not in df.columns or df["year_quarter"].nunique() < 2:
+        return None
+    df = df.assign(year_quarter=df["year_quarter"].astype(str))
+    quarters = sorted(df["year_quarter"].unique())
+    totals = df.groupby("year_quarter")[metric].sum().reindex(quarters)
+    values = totals.to_numpy(dtype=float)
+    prev = np.concatenate([[np.nan], values[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(prev > 0, (values - prev) / prev * 100, np.nan)
+    total_table = pd.DataFrame({"year_quarter": quarters, f"{metric}_sum": values, "qoq_pct": np.round(pct, 2)})
+    parts = [f"#### 분기별 {metric} 합계 및 전분기 대비 증감률(%)\n" + render_table(total_table, fmt)]
+
+    # 최근 두 분기 사이의 변화가 가장 큰 그룹
+    key = next((c for c in GROUP_COLUMNS if c in df.columns), None)
+    if key:
+        pivot = df.pivot_table(index=key, columns="year_quarter", values=metric, aggfunc="sum")
+        last, before = quarters[-1], quarters[-2]
+        if last in pivot.columns and before in pivot.columns:
+            cur, old = pivot[last].to_numpy(dtype=float), pivot[before].to_numpy(dtype=float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = np.where(old > 0, (cur - old) / old * 100, np.nan)
+            movers = pd.DataFrame({key: pivot.index, before: old, last: cur, "qoq_pct": np.round(change, 2)})
+            movers = movers.dropna(subset=["qoq_pct"])
+            order = np.argsort(-np.abs(movers["qoq_pct"].to_numpy()))
+            parts.append(
+                f"#### {before} → {last} {key}별 변화 폭 상위 {min(k, len(movers))}개\n"
+                + render_table(movers.iloc[order[:k]], fmt)
+            )
+    return "\n\n".join(parts)
+
+def _summary_sections(df: pd.DataFrame, k: int, fmt: str) -> List[str]:
+    """우선순위 순서로 정렬된 요약 섹션 목록을 생성합니다."""
+    numeric_cols = _numeric_columns(df)
+    metric = _primary_metric(df, numeric_cols)
+    overview = f"#### 개요\n- 전체 {len(df)}개 행, 컬럼: {', '.join(map(str, df.columns))}"
+    if metric is None:
+        return [overview, f"#### 상위 {k}개 행\n" + render_table(df.head(k), fmt)]
+    overview += f"\n- 주요 지표: {metric}"
+
+    sections = [overview, _stats_section(df, numeric_cols, fmt), _top_bottom_section(df, metric, k, fmt)]
+    qoq = _qoq_section(df, metric, k, fmt)
+    if qoq:
+        sections.append(qoq)
+    sections.extend(_group_sections(df, metric, k, fmt))
+    return sections
+
+
+### 5. 결과 압축 함수 정의
+
+def compact_results(results: List[Dict], token_budget: int | None = None,
+                    top_k: int | None = None, fmt: str = "markdown") -> str:
+    """
+    SQL 조회 결과를 보고서 프롬프트용으로 압축합니다.
+    - 원본 표가 토큰 예산 안에 들어가면 그대로 반환합니다.
+    - 그렇지 않으면 요약 통계, 상위/하위 행, 분기별 증감, 그룹 집계를 예산에 맞춰 반환합니다.
+    """
+    if not results:
+        return ""
+    budget = token_budget or REPORT_TOKEN_BUDGET
+    df = pd.DataFrame(results)
+
+    full_table = render_table(df, fmt)
+    if estimate_tokens(full_table) <= budget:
+        return full_table
+
+    # k를 줄여가며 모든 섹션이 예산 안에 들어가는지 확인
+    for k in range(top_k or COMPACTION_TOP_K, 0, -1):
+        sections = _summary_sections(df, k, fmt)
+        text = "\n\n".join(sections)
+        if estimate_tokens(text) <= budget:
+            return text
+
+    # 그래도 넘치면 우선순위가 높은 섹션부터 예산이 허락하는 만큼만 포함
+    included = []
+    for section in sections:
+        if estimate_tokens("\n\n".join([*included, section])) > budget:
+            break
+        included.append(section)
+    if not included:
+        # 개요조차 들어가지 않는 극단적인 예산이면 글자 단위로 자른다
+        return sections[0][: budget * 2]
+    return "\n\n".join(included)
@@ -0,0 +1,252 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List
+from report_cache import normalize_query
+
+
+### 2. 환경 설정
+
+# 실행 파일 폴더 경로 가져오기
+folder_path = os.path.dirname(os.path.abspath(__file__))
+
+# 검색 결과 캐시 DB 파일 경로
+SEARCH_CACHE_DB_PATH = os.getenv("SEARCH_CACHE_DB_PATH", os.path.join(folder_path, "search_cache.db"))
+
+# 캐시 사용 방식
+# - on: TTL 안의 결과는 그대로 사용, TTL이 지났지만 stale 기간 안이면 이전 결과를 바로 반환하고 백그라운드에서 갱신
+# - off: 캐시를 사용하지 않고 매번 검색
+# - replay: 저장된 결과만 사용(기간 무관)하고 검색 백엔드는 호출하지 않음 (오프라인 재현 / 벤치마크용)
+SEARCH_CACHE_MODE = os.getenv("SEARCH_CACHE_MODE", "on").lower()
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(6 * 3600)))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", str(7 * 86400)))
+
+# 검색 백엔드: "tavily"(웹 검색) 또는 "local"(네트워크 없이 동작하는 대체 백엔드)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "tavily").lower()
+
+# local 백엔드: 검색할 문서 파일(JSONL, 줄마다 {"url", "title", "content"}) / 흉내 낼 검색 지연 시간(초)
+# (문서 파일이 없으면 캐시에 저장된 검색 결과를 문서로 사용)
+SEARCH_LOCAL_CORPUS = os.getenv("SEARCH_LOCAL_CORPUS", os.path.join(folder_path, "search_corpus.jsonl"))
+SEARCH_LOCAL_LATENCY = float(os.getenv("SEARCH_LOCAL_LATENCY", "0.8"))
+
+
+### 3. 캐시 DB / 캐시 키 함수 정의
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    """WAL 모드 설정과 테이블 생성은 프로세스에서 처음 연결할 때 한 번만 실행합니다."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_cache (
+            cache_key TEXT PRIMARY KEY,
+            normalized_query TEXT NOT NULL,
+            params TEXT NOT NULL,
+            response TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )""")
+        conn.commit()
+        _schema_ready = True
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """캐시 DB 연결. 블록이 끝나면 커밋(오류 시 롤백)하고 연결을 닫습니다."""
+    with closing(sqlite3.connect(SEARCH_CACHE_DB_PATH, timeout=30)) as conn:
+        _init_schema(conn)
+        with conn:
+            yield conn
+
+def normalize_topic(topic: str) -> str:
+    """문장부호 / 공백 / 대소문자 차이만 있는 주제를 같은 키로 만듭니다."""
+    return normalize_query(re.sub(r"[^\w\s]", " ", topic))
+
+def cache_key(topic: str, params: Dict[str, Any]) -> str:
+    """정규화한 주제와 검색 파라미터(백엔드, 결과 수 등)로 캐시 키를 만듭니다."""
+    payload = json.dumps({"q": normalize_topic(topic), "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_entry(key: str) -> tuple[Dict[str, Any], float] | None:
+    """(검색 결과, 저장 시각)을 반환합니다."""
+    with _connect() as conn:
+        row = conn.execute("SELECT response, fetched_at FROM search_cache WHERE cache_key = ?", (key,)).fetchone()
+    return (json.loads(row[0]), row[1]) if row else None
+
+def store_entry(key: str, topic: str, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+    """검색 결과를 저장하고, stale 기간까지 지난 항목은 삭제합니다."""
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+            (key, normalize_topic(topic), json.dumps(params, sort_keys=True),
+             json.dumps(response, ensure_ascii=False), now),
+        )
+        conn.execute("DELETE FROM search_cache WHERE fetched_at < ?", (now - SEARCH_CACHE_STALE_TTL,))
+
+
+### 4. 대체 검색 백엔드 클래스 정의
+
+class LocalSearchBackend:
+    """
+    네트워크 / API 키 없이 동작하는 검색 백엔드. (Tavily와 같은 {"query", "results": [...]} 형식으로 반환)
+    문서 파일(또는 캐시에 저장된 검색 결과)에서 질의 단어가 많이 겹치는 문서를 찾고,
+    찾지 못하면 주제로부터 항상 같은 결과를 만들어 반환합니다. 웹 검색 지연 시간을 흉내 냅니다.
+    """
+    def __init__(self, max_results: int = 3, latency: float = SEARCH_LOCAL_LATENCY):
+        self.max_results = max_results
+        self.latency = latency
+        self._documents: List[Dict[str, Any]] | None = None
+
+    def _load_documents(self) -> List[Dict[str, Any]]:
+        if os.path.exists(SEARCH_LOCAL_CORPUS):
+            with open(SEARCH_LOCAL_CORPUS, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        if not os.path.exists(SEARCH_CACHE_DB_PATH):
+            return []
+        documents = {}
+        with _connect() as conn:
+            for (response,) in conn.execute("SELECT response FROM search_cache"):
+                for result in json.loads(response).get("results", []):
+                    documents.setdefault(result.get("url"), result)
+        return list(documents.values())
+
+    def _search(self, query: str) -> List[Dict[str, Any]]:
+        if self._documents is None:
+            self._documents = self._load_documents()
+        terms = set(normalize_topic(query).split())
+        scored = []
+        for document in self._documents:
+            words = set(normalize_topic(f"{document.get('title', '')} {document.get('content', '')}").split())
+            overlap = len(terms & words)
+            if overlap:
+                scored.append((overlap / len(terms), document))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        if scored:
+            return [{**document, "score": round(score, 3)} for score, document in scored[:self.max_results]]
+
+        digest = hashlib.sha256(normalize_topic(query).encode("utf-8")).hexdigest()[:12]
+        return [
+            {
+                "url": f"https://local.search/{digest}/{i}",
+                "title": f"{query} ({i + 1})",
+                "content": f"{query}에 대한 로컬 검색 결과 {i + 1}입니다. 네트워크 없이 생성된 대체 문서입니다.",
+                "score": round(1 - i * 0.1, 3),
+            }
+            for i in range(self.max_results)
+        ]
+
+    async def ainvoke(self, query: str) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        return {"query": query, "results": self._search(query)}
+
+def make_search_backend(max_results: int) -> Callable[[str], Awaitable[Dict[str, Any]]]:
+    """SEARCH_BACKEND 설정에 따라 검색 함수(async, 질의 -> Tavily 형식 결과)를 만듭니다."""
+    if SEARCH_BACKEND == "local":
+        return LocalSearchBackend(max_results).ainvoke
+    # Tavily는 생성 시 API 키가 필요하므로 실제로 웹 검색을 할 때만 생성
+    from langchain_tavily import TavilySearch
+    return TavilySearch(max_results=max_results).ainvoke
+
+
+### 5. 캐시 검색 클래스 정의
+
+class CachedSearch:
+    """
+    검색 결과 캐시를 적용한 검색 함수.
+    - 정규화한 주제 + 검색 파라미터가 같으면 같은 캐시 항목을 사용합니다.
+    - TTL이 지난 항목은 stale 기간 동안 바로 반환하고, 같은 키의 갱신은 백그라운드에서 한 번만 실행합니다.
+    - 동시에 들어온 같은 주제의 검색은 백엔드 호출 한 번으로 처리합니다.
+    """
+    def __init__(self, max_results: int = 3, mode: str = SEARCH_CACHE_MODE,
+                 backend: Callable[[str], Awaitable[Dict[str, Any]]] | None = None):
+        self.max_results = max_results
+        self.mode = mode
+        self.params = {"backend": SEARCH_BACKEND, "max_results": max_results}
+        self._backend = backend
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: set = set()
+        self.stats = {"fresh": 0, "stale": 0, "miss": 0, "refresh": 0, "backend_calls": 0, "coalesced": 0}
+
+    def _get_backend(self) -> Callable[[str], Awaitable[Dict[str, Any]]]:
+        if self._backend is None:
+            self._backend = make_search_backend(self.max_results)
+        return self._backend
+
+    async def _fetch_and_store(self, key: str, topic: str) -> Dict[str, Any]:
+        response = await self._get_backend()(topic)
+        if self.mode != "off":
+            await asyncio.to_thread(store_entry, key, topic, self.params, response)
+        return response
+
+    def _fetch_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리는 호출이 모두 취소된 뒤 실패해도 "Task exception was never retrieved" 경고가 나지 않도록 처리
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: str, topic: str) -> Dict[str, Any]:
+        """
+        백엔드로 검색하고 결과를 저장합니다. (같은 키의 검색이 진행 중이면 그 결과를 함께 사용)
+        검색은 호출과 분리된 공유 작업에서 실행하므로, 한 호출이 취소(클라이언트 취소, 마감 시간 초과)되어도
+        그 호출의 대기만 멈추고 같은 주제를 기다리는 다른 요청은 계속 결과를 받습니다.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["backend_calls"] += 1
+            task = asyncio.create_task(self._fetch_and_store(key, topic))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: str, topic: str) -> None:
+        try:
+            await self._fetch(key, topic)
+        except Exception as e:
+            print(f"[SearchCache] '{topic}' 백그라운드 갱신 실패 (이전 결과 유지): {e}")
+
+    async def search(self, topic: str) -> Dict[str, Any]:
+        """주제를 검색합니다. (Tavily와 같은 {"query", "results": [...]} 형식으로 반환)"""
+        if self.mode == "off":
+            self.stats["miss"] += 1
+            return await self._fetch(cache_key(topic, self.params), topic)
+
+        key = cache_key(topic, self.params)
+        entry = await asyncio.to_thread(load_entry, key)
+        if self.mode == "replay":
+            if entry is None:
+                raise LookupError(f"replay 모드: '{topic}'에 대해 저장된 검색 결과가 없습니다.")
+            self.stats["fresh"] += 1
+            return entry[0]
+
+        if entry is not None:
+            response, fetched_at = entry
+            age = time.time() - fetched_at
+            if age <= SEARCH_CACHE_TTL:
+                self.stats["fresh"] += 1
+                return response
+            if age <= SEARCH_CACHE_STALE_TTL:
+                self.stats["stale"] += 1
+                if key not in self._inflight:
+                    self.stats["refresh"] += 1
+                    task = asyncio.create_task(self._refresh(key, topic))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return response
+
+        self.stats["miss"] += 1
+        return await self._fetch(key, topic)
@@ -0,0 +1,103 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+import asyncio
+import sqlite3
+import threading
+from typing import List, Dict, Any, Tuple
+
+
+### 2. 취소 가능한 SQL 실행 함수 정의
+
+class CandidateRun:
+    """후보 SQL 하나의 실행 상태. 다른 후보가 먼저 성공하면 interrupt()로 실행을 중단합니다."""
+    def __init__(self, sql: str):
+        self.sql = sql
+        self._conn: sqlite3.Connection | None = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def interrupt(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self, db_path: str) -> List[Dict]:
+        """EXPLAIN으로 먼저 검증한 뒤 쿼리를 실행합니다. (실패 시 sqlite3.Error 발생)"""
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn = conn
+            if self._cancelled:
+                conn.close()
+                raise sqlite3.OperationalError("interrupted")
+        try:
+            # EXPLAIN은 쿼리를 실행하지 않고 문법과 테이블/컬럼 존재 여부만 빠르게 검증한다
+            conn.execute(f"EXPLAIN {self.sql}").fetchall()
+            return [dict(row) for row in conn.execute(self.sql).fetchall()]
+        finally:
+            with self._lock:
+                self._conn = None
+            conn.close()
+
+
+### 3. 후보 SQL 경쟁 실행 함수 정의
+
+def dedupe_candidates(candidates: List[str]) -> List[str]:
+    """공백 차이만 있는 중복 후보를 제거합니다. (순서 유지)"""
+    seen, unique = set(), []
+    for sql in candidates:
+        key = " ".join(sql.split()).rstrip(";").lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(sql)
+    return unique
+
+async def race_sql_candidates(db_path: str, candidates: List[str]) -> Tuple[str, List[Dict]]:
+    """
+    여러 후보 SQL을 동시에 검증/실행하여 가장 먼저 비어 있지 않은 결과를 낸 후보를 채택합니다.
+    - 채택되면 나머지 후보의 실행은 중단합니다.
+    - 모든 후보가 빈 결과면 가장 먼저 성공한 후보를, 모두 실패하면 첫 번째 오류를 발생시킵니다.
+    - 반환값: (채택된 SQL, 조회 결과)
+    """
+    async def attempt(run: CandidateRun):
+        try:
+            return run, await asyncio.to_thread(run.run, db_path), None
+        except sqlite3.Error as e:
+            return run, None, e
+
+    runs = [CandidateRun(sql) for sql in candidates]
+    tasks = [asyncio.create_task(attempt(run)) for run in runs]
+    first_empty: Tuple[str, List[Dict]] | None = None
+    errors: List[Exception] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            run, rows, error = await next_done
+            if error is not None:
+                errors.append(error)
+            elif rows:
+                return run.sql, rows
+            elif first_empty is None:
+                first_empty = (run.sql, rows)
+    finally:
+        # 채택 여부와 관계없이 남아 있는 후보 실행을 모두 중단
+        for task, run in zip(tasks, runs):
+            if not task.done():
+                run.interrupt()
+                task.cancel()
+    if first_empty is not None:
+        return first_empty
+    raise errors[0] if errors else sqlite3.Error("실행할 SQL 후보가 없습니다.")
+
+
+### 4. 비용 계산 함수 정의
+
+# gpt-4o-mini 1M 토큰당 가격(USD)
+PRICE_PER_1M_TOKENS = {"input": 0.15, "output": 0.60}
+
+def estimate_cost(usage: Dict[str, Any]) -> float:
+    """UsageMetadataCallbackHandler가 모은 모델별 토큰 사용량으로 비용(USD)을 계산합니다."""
+    total = 0.0
+    for model_usage in usage.values():
+        total += model_usage.get("input_tokens", 0) / 1_000_000 * PRICE_PER_1M_TOKENS["input"]
+        total += model_usage.get("output_tokens", 0) / 1_000_000 * PRICE_PER_1M_TOKENS["output"]
+    return total
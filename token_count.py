@@ -0,0 +1,22 @@
+### 1. 필요한 라이브러리 / 모듈 / 함수 임포트
+from functools import lru_cache
+
+
+### 2. 토큰 수 추정 함수 정의
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """tiktoken 인코더를 반환합니다. 사용할 수 없으면 None을 반환합니다."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 추정합니다. (tiktoken이 없으면 글자 수 기반 근사치)"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    # 한글/숫자가 섞인 텍스트는 대략 2글자당 1토큰 정도로 계산된다
+    return len(text) // 2 + 1